@@ -1,8 +1,132 @@
 """
 Admin configuration for attendance app.
+
+The attendance and student tables grow to millions of rows, so their
+changelists avoid per-row queries (`list_select_related`), filter units by
+typed code instead of listing every unit, and use an estimated row count on
+PostgreSQL for unfiltered pages instead of `COUNT(*)` over the whole table.
 """
-from django.contrib import admin
-from .models import Lecturer, Unit, AttendanceSession, Student, Attendance
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import PAGE_VAR
+from django.core.paginator import Paginator
+from django.db import close_old_connections, connections
+from django.utils.functional import cached_property
+
+from .models import Lecturer, Unit, AttendanceSession, Student, Attendance, SyncAttempt
+from .reports import bump_attendance_data_version
+
+logger = logging.getLogger(__name__)
+
+RESYNC_BATCH_SIZE = 200
+
+
+def estimated_row_count(queryset):
+    """
+    Planner row estimate for an unfiltered queryset on PostgreSQL, else None.
+
+    Small tables (below ADMIN_ESTIMATED_COUNT_THRESHOLD rows) return None too:
+    an exact count is cheap there and the estimate lags until the next ANALYZE.
+    """
+    query = getattr(queryset, 'query', None)
+    if query is None or query.where or query.distinct:
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    threshold = getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000)
+    if row is None or row[0] < threshold:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that uses `estimated_row_count` when it can and an exact count otherwise."""
+
+    @cached_property
+    def count(self):
+        estimate = estimated_row_count(self.object_list)
+        if estimate is not None:
+            return estimate
+        return super().count
+
+
+class UnitCodeFilter(admin.SimpleListFilter):
+    """
+    Filter by a typed unit code rather than a link per unit.
+
+    Only the selected unit is ever looked up, so the sidebar costs nothing
+    however many units exist. Subclasses set `field_path` to the unit relation.
+    """
+    title = 'unit'
+    parameter_name = 'unit_code'
+    template = 'admin/attendance/input_filter.html'
+    field_path = 'unit'
+
+    def lookups(self, request, model_admin):
+        value = self.value()
+        return [(value, value)] if value else []
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        value = (self.value() or '').strip()
+        if value:
+            return queryset.filter(**{f'{self.field_path}__code__iexact': value})
+        return queryset
+
+    def choices(self, changelist):
+        # Other active filters/search terms ride along as hidden inputs.
+        hidden = []
+        for key, value in changelist.params.items():
+            if key in (self.parameter_name, PAGE_VAR):
+                continue
+            for v in (value if isinstance(value, list) else [value]):
+                hidden.append((key, v))
+        yield {
+            'parameter_name': self.parameter_name,
+            'value': self.value() or '',
+            'hidden_params': hidden,
+            'clear_query_string': changelist.get_query_string(remove=[self.parameter_name]),
+        }
+
+
+class StudentUnitFilter(UnitCodeFilter):
+    field_path = 'units'
+
+
+def _resync_attendance(ids):
+    """Re-run Firebase/Portal sync for the given attendance ids; runs on a background thread."""
+    from .sync_service import get_dual_sync_service
+    service = get_dual_sync_service()
+    try:
+        for start in range(0, len(ids), RESYNC_BATCH_SIZE):
+            records = Attendance.objects.filter(pk__in=ids[start:start + RESYNC_BATCH_SIZE]).select_related(
+                'student', 'session__unit', 'session__lecturer__user'
+            )
+            for att in records:
+                try:
+                    service.sync_attendance(att.student, att.session)
+                except Exception:
+                    logger.warning('Resync of attendance %s failed', att.pk, exc_info=True)
+    finally:
+        close_old_connections()
+
+
+def _spawn_resync(ids):
+    t = threading.Thread(target=_resync_attendance, args=(ids,), daemon=True)
+    t.start()
+    return t
 
 
 @admin.register(Lecturer)
@@ -10,6 +134,7 @@ class LecturerAdmin(admin.ModelAdmin):
     list_display = ['user', 'staff_id', 'department', 'phone']
     search_fields = ['user__username', 'user__first_name', 'user__last_name', 'staff_id']
     list_filter = ['department']
+    list_select_related = ['user']
 
 
 @admin.register(Unit)
@@ -17,6 +142,7 @@ class UnitAdmin(admin.ModelAdmin):
     list_display = ['code', 'name', 'lecturer']
     search_fields = ['code', 'name']
     list_filter = ['lecturer']
+    list_select_related = ['lecturer__user']
 
 
 @admin.register(AttendanceSession)
@@ -25,23 +151,70 @@ class AttendanceSessionAdmin(admin.ModelAdmin):
     list_filter = ['is_active', 'date', 'lecturer']
     search_fields = ['unit__code', 'unit__name', 'venue']
     date_hierarchy = 'date'
+    list_select_related = ['unit', 'lecturer__user']
+    autocomplete_fields = ['unit']
+
+    def get_queryset(self, request):
+        # __str__ reads the unit; this also covers the attendance autocomplete.
+        return super().get_queryset(request).select_related('unit')
 
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
     list_display = ['name', 'admission_number', 'email', 'phone', 'created_at']
     search_fields = ['name', 'admission_number', 'email']
-    list_filter = ['created_at', 'units']
+    list_filter = ['created_at', StudentUnitFilter]
     filter_horizontal = ['units']
     readonly_fields = ['created_at', 'updated_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Attendance)
 class AttendanceAdmin(admin.ModelAdmin):
-    list_display = ['student', 'session', 'timestamp', 'synced_to_firebase', 'synced_to_portal']
-    list_filter = ['timestamp', 'synced_to_firebase', 'synced_to_portal', 'session__unit']
+    list_display = ['student', 'session', 'timestamp', 'firebase_status', 'portal_status', 'sync_attempts']
+    list_filter = ['timestamp', 'firebase_status', 'portal_status', UnitCodeFilter]
     search_fields = ['student__name', 'student__admission_number', 'session__unit__code']
-    readonly_fields = ['timestamp', 'firebase_doc_id', 'portal_response']
-    date_hierarchy = 'timestamp'
+    readonly_fields = ['timestamp', 'firebase_status', 'portal_status', 'sync_attempts', 'last_sync_at']
+    list_select_related = ['student', 'session__unit']
+    autocomplete_fields = ['student', 'session']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['resync_selected']
+
+    @admin.action(description='Resync selected attendance to Firebase and Portal')
+    def resync_selected(self, request, queryset):
+        limit = getattr(settings, 'ADMIN_RESYNC_MAX', 5000)
+        ids = list(queryset.order_by().values_list('pk', flat=True)[:limit + 1])
+        if len(ids) > limit:
+            self.message_user(
+                request,
+                f'Select at most {limit} records to resync at once; narrow the filter and try again.',
+                messages.ERROR,
+            )
+            return
+        _spawn_resync(ids)
+        self.message_user(request, f'Resync of {len(ids)} attendance record(s) started in the background.')
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_attendance_data_version(obj.unit_id, obj.semester)
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        bump_attendance_data_version()
+
+
+@admin.register(SyncAttempt)
+class SyncAttemptAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'target', 'status', 'attendance_id', 'error']
+    list_filter = ['target', 'status']
+    search_fields = ['=attendance_id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
+    def has_add_permission(self, request):
+        return False
 
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,78 @@
+"""
+Token-bucket admission control for attendance submissions.
+
+Each session gets a bucket that refills at ATTEND_ADMISSION_RATE tokens per
+second up to ATTEND_ADMISSION_BURST. A submission takes one token; when the
+bucket is empty the view answers 429 with `Retry-After` instead of queueing
+the request behind the worker, and the attend page retries on its own.
+
+Buckets live in process memory (the app runs a single gunicorn worker), are
+kept for the most recently used sessions only, and cost one lock per check.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+MAX_TRACKED_SESSIONS = 1024
+
+
+class AdmissionController:
+    """Per-key token buckets with LRU eviction."""
+
+    def __init__(self, rate, burst, max_keys=MAX_TRACKED_SESSIONS, clock=time.monotonic):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> [tokens, last refill time]
+        self._buckets = OrderedDict()
+
+    @property
+    def enabled(self):
+        return self.rate > 0 and self.burst > 0
+
+    def acquire(self, key):
+        """Take a token for `key`. Returns 0 if admitted, else whole seconds until one is available."""
+        if not self.enabled:
+            return 0
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [self.burst, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return max(1, math.ceil((1 - bucket[0]) / self.rate))
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller():
+    """Shared controller built from ATTEND_ADMISSION_RATE / ATTEND_ADMISSION_BURST."""
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController(
+                    getattr(settings, 'ATTEND_ADMISSION_RATE', 10),
+                    getattr(settings, 'ATTEND_ADMISSION_BURST', 30),
+                )
+    return _controller
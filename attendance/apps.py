@@ -15,4 +15,7 @@ class AttendanceConfig(AppConfig):
             from . import signals  # noqa: F401
         except Exception:
             pass
+        # Resolve the public base URL once, before the first QR code needs it.
+        from .site_url import configured_base_url
+        configured_base_url()
 
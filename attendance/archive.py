@@ -0,0 +1,230 @@
+"""
+Archival of closed semesters' attendance to compressed JSONL files.
+
+Archived records are removed from the hot `Attendance` table. A small
+`manifest.json` in the archive directory lists every archive file with the
+units and semesters it covers, so readers can skip files that cannot match.
+Exports and reports read archived records through `iter_archived_records`.
+"""
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .jsonl import JsonlWriter, iter_jsonl
+from .models import Attendance
+
+ARCHIVE_BATCH_SIZE = 2000
+MANIFEST_NAME = 'manifest.json'
+
+ARCHIVE_FIELDS = (
+    'id',
+    'student_id',
+    'student__admission_number',
+    'student__name',
+    'unit_id',
+    'unit__code',
+    'semester',
+    'session_id',
+    'session__session_number',
+    'session__date',
+    'session__start_time',
+    'session__venue',
+    'timestamp',
+    'firebase_status',
+    'portal_status',
+)
+
+# Short keys keep each archived line small.
+ARCHIVE_KEYS = (
+    'id',
+    'student_id',
+    'admission_number',
+    'student_name',
+    'unit_id',
+    'unit_code',
+    'semester',
+    'session_id',
+    'session_number',
+    'date',
+    'start_time',
+    'venue',
+    'timestamp',
+    'firebase_status',
+    'portal_status',
+)
+
+
+def archive_root():
+    return Path(getattr(settings, 'ATTENDANCE_ARCHIVE_ROOT', Path(settings.BASE_DIR) / 'backups' / 'archive'))
+
+
+def read_manifest(root=None):
+    path = (root or archive_root()) / MANIFEST_NAME
+    if not path.exists():
+        return {'files': []}
+    return json.loads(path.read_text())
+
+
+def _write_manifest(manifest, root):
+    path = root / MANIFEST_NAME
+    tmp = path.with_name(MANIFEST_NAME + '.partial')
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, path)
+
+
+def archivable_queryset(semester, before, unit=None):
+    """Attendance of closed sessions in `semester` dated before `before`."""
+    qs = Attendance.objects.filter(semester=semester, session__date__lt=before, session__is_active=False)
+    if unit is not None:
+        qs = qs.filter(unit=unit)
+    return qs
+
+
+def archive_filename(semester, before, unit=None):
+    suffix = f'_{unit.code}' if unit is not None else ''
+    return f'attendance_S{semester}_before_{before.isoformat()}{suffix}.jsonl.gz'
+
+
+def write_archive(queryset, path, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Stream `queryset` into a compressed JSONL archive at `path`.
+
+    Returns (row_count, units, semesters) for the manifest, `units` mapping
+    unit id to unit code.
+    """
+    units, semesters = {}, set()
+    rows = queryset.order_by('pk').values_list(*ARCHIVE_FIELDS).iterator(chunk_size=batch_size)
+    with JsonlWriter(path) as writer:
+        for row in rows:
+            record = dict(zip(ARCHIVE_KEYS, row))
+            units[record['unit_id']] = record['unit_code']
+            semesters.add(record['semester'])
+            writer.write(record)
+    return writer.count, units, semesters
+
+
+def summarize_archive(path):
+    """(row_count, units, semesters) of an existing archive file, as returned by `write_archive`."""
+    count, units, semesters = 0, {}, set()
+    for record in iter_jsonl(path):
+        count += 1
+        units[record['unit_id']] = record['unit_code']
+        semesters.add(record['semester'])
+    return count, units, semesters
+
+
+def register_archive(path, rows, units, semesters, root=None):
+    """
+    List archive `path` in the manifest, making its records visible to readers.
+
+    Only call this once its records are gone from the hot table (see
+    `delete_archived`), or readers would count them twice.
+    """
+    root = root or archive_root()
+    manifest = read_manifest(root)
+    manifest['files'] = [f for f in manifest['files'] if f['file'] != path.name]
+    manifest['files'].append({
+        'file': path.name,
+        'rows': rows,
+        'units': sorted(units.values()),
+        'unit_ids': sorted(units),
+        'semesters': sorted(semesters),
+        'created_at': timezone.now().isoformat(),
+    })
+    _write_manifest(manifest, root)
+    from .reports import bump_attendance_data_version
+    bump_attendance_data_version()
+
+
+def delete_archived(path, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Remove the records listed in archive `path` from the hot table.
+
+    Safe to re-run: ids already gone are simply not matched, which is how an
+    interrupted archival run is resumed.
+    """
+    deleted = 0
+    batch = []
+    for record in iter_jsonl(path):
+        batch.append(record['id'])
+        if len(batch) >= batch_size:
+            deleted += Attendance.objects.filter(pk__in=batch).delete()[0]
+            batch = []
+    if batch:
+        deleted += Attendance.objects.filter(pk__in=batch).delete()[0]
+    if deleted:
+        from .reports import bump_attendance_data_version
+        bump_attendance_data_version()
+    return deleted
+
+
+def _manifest_entry_matches(entry, unit_ids, semester):
+    # Manifests written before `unit_ids` was recorded cannot rule a file out by unit.
+    if unit_ids is not None and 'unit_ids' in entry and unit_ids.isdisjoint(entry['unit_ids']):
+        return False
+    if semester is not None and semester not in entry['semesters']:
+        return False
+    return True
+
+
+def _unit_filter(unit_id, unit_ids):
+    if unit_id is not None:
+        return {unit_id}
+    return set(unit_ids) if unit_ids is not None else None
+
+
+def iter_archived_records(unit_id=None, semester=None, root=None, unit_ids=None):
+    """Yield archived attendance records, optionally filtered by unit id(s) and semester."""
+    root = root or archive_root()
+    unit_ids = _unit_filter(unit_id, unit_ids)
+    for entry in read_manifest(root)['files']:
+        if not _manifest_entry_matches(entry, unit_ids, semester):
+            continue
+        path = root / entry['file']
+        if not path.exists():
+            continue
+        for record in iter_jsonl(path):
+            if unit_ids is not None and record['unit_id'] not in unit_ids:
+                continue
+            if semester is not None and record['semester'] != semester:
+                continue
+            yield record
+
+
+def has_archived(unit_id=None, semester=None, root=None, unit_ids=None):
+    """Cheap manifest-only check for archived data matching the filters."""
+    unit_ids = _unit_filter(unit_id, unit_ids)
+    return any(
+        _manifest_entry_matches(entry, unit_ids, semester)
+        for entry in read_manifest(root or archive_root())['files']
+    )
+
+
+def archived_export_rows(unit, semester):
+    """Archived records of `unit`/`semester` in the same tuple layout as `exports.attendance_rows`."""
+    for r in iter_archived_records(unit_id=unit.pk, semester=semester):
+        ts = datetime.fromisoformat(r['timestamp']) if r['timestamp'] else None
+        yield (
+            r['admission_number'],
+            r['student_name'],
+            r['unit_code'],
+            r['semester'],
+            r['session_number'] if r['session_number'] is not None else '',
+            r['date'] or '',
+            (r['start_time'] or '')[:5],
+            r['venue'],
+            timezone.localtime(ts).strftime('%Y-%m-%d %H:%M:%S') if ts else '',
+        )
+
+
+def archived_counts(semester=None, unit_ids=None):
+    """Attended counts per (student_id, unit_id, semester) from archived records."""
+    counts = {}
+    for r in iter_archived_records(semester=semester, unit_ids=unit_ids):
+        key = (r['student_id'], r['unit_id'], r['semester'])
+        counts[key] = counts.get(key, 0) + 1
+    return counts
@@ -0,0 +1,211 @@
+"""
+Streaming backup and restore of the attendance database to compressed JSONL.
+
+A backup starts with one header record, followed by one block per table: a
+`{"model": ..., "fields": [...]}` record naming the columns, then one JSON
+list per row. Rows are read with `.iterator()` and restored with
+`bulk_create`, so a semester moves between databases (e.g. SQLite and
+Postgres) without going through `dumpdata`/`loaddata`. Sessions and
+students are upserted by primary key, so a restored row replaces an older
+copy of itself; other rows that already exist are skipped.
+
+Password hashes are left out unless asked for (`include_passwords=True`);
+users restored from such a backup get an unusable password and must have
+it reset.
+
+Incremental backups (`since=`) only include sessions and students created
+or edited, and attendance recorded, after that moment; restoring one on top
+of a full backup applies those edits. Users, lecturers, units
+and enrollments are small and always included in full, since their changes
+are not timestamped.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .jsonl import JsonlWriter, iter_jsonl
+from .models import Attendance, AttendanceSession, Lecturer, Student, SyncStatus, Unit
+from .reports import bump_attendance_data_version
+
+BACKUP_FORMAT = 'attendance-backup'
+BACKUP_VERSION = 1
+BACKUP_CHUNK_SIZE = 2000
+RESTORE_BATCH_SIZE = 2000
+
+Enrollment = Student.units.through
+
+# Parents before children, so foreign keys resolve during restore.
+BACKUP_MODELS = (User, Lecturer, Unit, AttendanceSession, Student, Enrollment, Attendance)
+
+# Rows that can be edited after they are created (and so appear again in
+# incremental backups) replace the existing row instead of being skipped.
+UPSERT_MODELS = (AttendanceSession, Student)
+
+# Attendance columns of backups taken before sync status became one small
+# integer per target: the flags map onto the statuses, the rest is dropped.
+LEGACY_SYNC_FLAGS = {'synced_to_firebase': 'firebase_status', 'synced_to_portal': 'portal_status'}
+LEGACY_DROPPED_COLUMNS = {'firebase_doc_id', 'portal_response'}
+
+
+def backup_root():
+    return Path(getattr(settings, 'ATTENDANCE_BACKUP_ROOT', Path(settings.BASE_DIR) / 'backups'))
+
+
+def backup_filename(since=None):
+    stamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+    kind = 'incremental' if since is not None else 'full'
+    return f'attendance_{kind}_{stamp}.jsonl.gz'
+
+
+def _columns(model, include_passwords=False):
+    columns = [f.attname for f in model._meta.concrete_fields]
+    if model is User and not include_passwords:
+        columns.remove('password')
+    return columns
+
+
+def backup_querysets(since=None):
+    """(model, queryset) pairs in restore order."""
+    users = User.objects.filter(Q(lecturer__isnull=False) | Q(is_staff=True)).distinct()
+    sessions = AttendanceSession.objects.all()
+    students = Student.objects.all()
+    attendance = Attendance.objects.all()
+    if since is not None:
+        sessions = sessions.filter(updated_at__gte=since)
+        students = students.filter(updated_at__gte=since)
+        attendance = attendance.filter(timestamp__gte=since)
+    return (
+        (User, users),
+        (Lecturer, Lecturer.objects.all()),
+        (Unit, Unit.objects.all()),
+        (AttendanceSession, sessions),
+        (Student, students),
+        (Enrollment, Enrollment.objects.all()),
+        (Attendance, attendance),
+    )
+
+
+def write_backup(path, since=None, chunk_size=BACKUP_CHUNK_SIZE, include_passwords=False):
+    """Stream every backed-up table into `path`. Returns {model label: row count}."""
+    counts = {}
+    with JsonlWriter(path) as writer:
+        writer.write({
+            'format': BACKUP_FORMAT,
+            'version': BACKUP_VERSION,
+            'created_at': timezone.now().isoformat(),
+            'since': since.isoformat() if since is not None else None,
+            'passwords': include_passwords,
+        })
+        for model, qs in backup_querysets(since):
+            label = model._meta.label_lower
+            columns = _columns(model, include_passwords)
+            writer.write({'model': label, 'fields': columns})
+            n = 0
+            for row in qs.order_by('pk').values_list(*columns).iterator(chunk_size=chunk_size):
+                writer.write(row)
+                n += 1
+            counts[label] = n
+    return counts
+
+
+@contextmanager
+def _keep_timestamps(model):
+    """Stop auto_now/auto_now_add from overwriting restored timestamps."""
+    fields = [f for f in model._meta.concrete_fields if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)]
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+def _upgrade_row(model, values):
+    """Fill in columns a backup may lack: legacy sync flags and left-out password hashes."""
+    if model is User and 'password' not in values:
+        values['password'] = make_password(None)
+    if model is Attendance:
+        for old, new in LEGACY_SYNC_FLAGS.items():
+            if old in values:
+                values[new] = SyncStatus.SYNCED if values.pop(old) else SyncStatus.PENDING
+        for name in LEGACY_DROPPED_COLUMNS:
+            values.pop(name, None)
+    return values
+
+
+def _insert(model, columns, rows):
+    objs = [model(**_upgrade_row(model, dict(zip(columns, row)))) for row in rows]
+    if model in UPSERT_MODELS:
+        restored = set(columns)
+        pk = model._meta.pk
+        options = {
+            'update_conflicts': True,
+            'unique_fields': [pk.name],
+            'update_fields': [f.name for f in model._meta.concrete_fields
+                              if f.attname in restored and f is not pk],
+        }
+    else:
+        options = {'ignore_conflicts': True}
+    with _keep_timestamps(model):
+        model.objects.bulk_create(objs, **options)
+
+
+def restore_backup(path, batch_size=RESTORE_BATCH_SIZE):
+    """
+    Load a backup written by `write_backup` in one transaction.
+
+    Sessions and students already present (same primary key) are updated
+    from the backup; other rows that already exist are skipped. Restoring
+    an incremental backup on top of a full one, or re-running a restore, is
+    therefore safe. Returns {model label: rows read}.
+    """
+    allowed = {m._meta.label_lower: m for m in BACKUP_MODELS}
+    records = iter_jsonl(path)
+    header = next(records, None)
+    if not isinstance(header, dict) or header.get('format') != BACKUP_FORMAT:
+        raise ValueError(f'{path} is not an attendance backup.')
+    if header.get('version') != BACKUP_VERSION:
+        raise ValueError(f"Unsupported backup version {header.get('version')}.")
+
+    counts = {}
+    restored = []
+    with transaction.atomic():
+        model, columns, batch = None, None, []
+        for record in records:
+            if isinstance(record, dict):
+                if batch:
+                    _insert(model, columns, batch)
+                    batch = []
+                model = allowed.get(record['model'])
+                if model is None:
+                    raise ValueError(f"Unexpected model {record['model']} in backup.")
+                columns = record['fields']
+                counts[record['model']] = 0
+                restored.append(model)
+                continue
+            batch.append(record)
+            counts[model._meta.label_lower] += 1
+            if len(batch) >= batch_size:
+                _insert(model, columns, batch)
+                batch = []
+        if batch:
+            _insert(model, columns, batch)
+
+        # Explicit primary keys leave Postgres sequences behind; loaddata does the same reset.
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), restored)
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+
+    bump_attendance_data_version()
+    return counts
@@ -0,0 +1,87 @@
+"""
+Set-based cleanup of duplicate attendance sessions.
+
+Sessions that share (unit, semester, date, start_time) are duplicates; the
+newest one in each group is kept. One window-function query maps every
+duplicate to its keeper. Attendance is then moved across in batches: records
+are re-pointed to the keeper with `bulk_update`, or dropped when the student
+already has a record there, and the emptied duplicates are deleted.
+"""
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import FirstValue, RowNumber
+
+from .models import Attendance, AttendanceSession
+from .reports import bump_attendance_data_version
+
+DEDUPE_BATCH_SIZE = 500
+
+
+@dataclass
+class DedupeResult:
+    groups: int = 0
+    sessions: int = 0
+    # Attendance moved to the kept session.
+    repointed: int = 0
+    # Attendance dropped because the student was already recorded on the kept session.
+    merged: int = 0
+
+
+def duplicate_sessions():
+    """{duplicate session id: kept session id}, keeping the newest session of each group."""
+    partition = [F('unit_id'), F('semester'), F('date'), F('start_time')]
+    order = [F('created_at').desc(), F('id').desc()]
+    rows = (
+        AttendanceSession.objects.annotate(
+            position=Window(RowNumber(), partition_by=partition, order_by=order),
+            keeper=Window(FirstValue('id'), partition_by=partition, order_by=order),
+        )
+        .filter(position__gt=1)
+        .order_by()
+        .values_list('id', 'keeper')
+    )
+    return dict(rows)
+
+
+def _merge_attendance(keepers, duplicate_ids, result, dry_run):
+    rows = (
+        Attendance.objects.filter(session_id__in=duplicate_ids)
+        .order_by('timestamp')
+        .values_list('id', 'session_id', 'student_id')
+    )
+    rows = list(rows)
+    taken = set(
+        Attendance.objects.filter(session_id__in={keepers[s] for _, s, _ in rows})
+        .order_by().values_list('session_id', 'student_id')
+    )
+    moved, dropped = [], []
+    for pk, session_id, student_id in rows:
+        target = (keepers[session_id], student_id)
+        if target in taken:
+            dropped.append(pk)
+        else:
+            taken.add(target)
+            moved.append(Attendance(pk=pk, session_id=target[0]))
+    result.repointed += len(moved)
+    result.merged += len(dropped)
+    if not dry_run:
+        Attendance.objects.bulk_update(moved, ['session'], batch_size=DEDUPE_BATCH_SIZE)
+        Attendance.objects.filter(pk__in=dropped).delete()
+
+
+def cleanup_duplicate_sessions(batch_size=DEDUPE_BATCH_SIZE, dry_run=False):
+    """Merge and delete duplicate sessions. With `dry_run`, only count what would change."""
+    keepers = duplicate_sessions()
+    result = DedupeResult(groups=len(set(keepers.values())), sessions=len(keepers))
+    duplicate_ids = list(keepers)
+    for start in range(0, len(duplicate_ids), batch_size):
+        batch = duplicate_ids[start:start + batch_size]
+        with transaction.atomic():
+            _merge_attendance(keepers, batch, result, dry_run)
+            if not dry_run:
+                AttendanceSession.objects.filter(pk__in=batch).delete()
+    if not dry_run and keepers:
+        bump_attendance_data_version()
+    return result
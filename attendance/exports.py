@@ -0,0 +1,218 @@
+"""
+Streaming attendance exports (CSV and XLSX).
+
+Rows are read with `.iterator(chunk_size=...)` and written out as they arrive,
+so a full semester export runs in constant memory and the first bytes reach the
+client before the query has finished.
+"""
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+from .archive import archived_export_rows
+from .models import Attendance
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_HEADER = (
+    'Admission Number',
+    'Student Name',
+    'Unit Code',
+    'Semester',
+    'Session Number',
+    'Date',
+    'Start Time',
+    'Venue',
+    'Checked In At',
+)
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+
+
+def attendance_rows(unit, semester, chunk_size=EXPORT_CHUNK_SIZE, include_archived=True):
+    """
+    Yield one export row (tuple matching EXPORT_HEADER) per attendance record.
+
+    Archived records for the unit/semester, if any, come first.
+    """
+    if include_archived:
+        yield from archived_export_rows(unit, semester)
+    qs = Attendance.objects.filter(
+        unit=unit,
+        semester=semester,
+    ).order_by(
+        'session__session_number', 'session__date', 'session__start_time', 'student__admission_number'
+    ).values_list(
+        'student__admission_number',
+        'student__name',
+        'unit__code',
+        'semester',
+        'session__session_number',
+        'session__date',
+        'session__start_time',
+        'session__venue',
+        'timestamp',
+    )
+    for row in qs.iterator(chunk_size=chunk_size):
+        yield _format_row(row)
+
+
+def _format_row(row):
+    admission, name, code, semester, number, date, start, venue, ts = row
+    return (
+        admission,
+        name,
+        code,
+        semester,
+        number if number is not None else '',
+        date.isoformat() if date else '',
+        start.strftime('%H:%M') if start else '',
+        venue,
+        timezone.localtime(ts).strftime('%Y-%m-%d %H:%M:%S') if ts else '',
+    )
+
+
+class _Echo:
+    """Pseudo-buffer for csv.writer: `write` returns the line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, header=EXPORT_HEADER):
+    """Yield CSV text, one line per row, header first."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+# --- Minimal streaming XLSX writer -------------------------------------------
+#
+# An .xlsx file is a zip of XML parts. zipfile supports writing to a
+# non-seekable stream (it falls back to data descriptors), so the worksheet is
+# deflated row by row and the compressed bytes are yielded as they are produced.
+
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+# Control characters are not allowed in XML 1.0 text nodes.
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class _ChunkBuffer:
+    """Write-only, non-seekable file object that collects bytes until drained."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _xlsx_cell(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = _ILLEGAL_XML_CHARS.sub('', str(value))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return '<row>' + ''.join(_xlsx_cell(v) for v in values) + '</row>'
+
+
+def stream_xlsx(rows, sheet_name='Attendance', flush_every=500):
+    """Yield the bytes of a single-sheet XLSX workbook containing the header and rows."""
+    buf = _ChunkBuffer()
+    zf = zipfile.ZipFile(buf, mode='w', compression=zipfile.ZIP_DEFLATED)
+    zf.writestr('[Content_Types].xml', _CONTENT_TYPES_XML)
+    zf.writestr('_rels/.rels', _ROOT_RELS_XML)
+    zf.writestr('xl/workbook.xml', _WORKBOOK_XML.format(name=escape(sheet_name[:31], {'"': '&quot;'})))
+    zf.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS_XML)
+    yield buf.drain()
+
+    with zf.open('xl/worksheets/sheet1.xml', mode='w') as sheet:
+        sheet.write((_SHEET_HEAD + _xlsx_row(EXPORT_HEADER)).encode('utf-8'))
+        pending = []
+        for row in rows:
+            pending.append(_xlsx_row(row))
+            if len(pending) >= flush_every:
+                sheet.write(''.join(pending).encode('utf-8'))
+                pending.clear()
+                data = buf.drain()
+                if data:
+                    yield data
+        if pending:
+            sheet.write(''.join(pending).encode('utf-8'))
+        sheet.write(_SHEET_TAIL.encode('utf-8'))
+
+    zf.close()
+    yield buf.drain()
+
+
+def stream_export(rows, fmt):
+    """Return an iterator of chunks for `rows` in the given export format."""
+    if fmt == 'xlsx':
+        return stream_xlsx(rows)
+    return stream_csv(rows)
+
+
+def export_filename(unit, semester, fmt):
+    code = re.sub(r'[^A-Za-z0-9_-]+', '_', unit.code)
+    return f"attendance_{code}_S{semester}.{EXPORT_FORMATS[fmt][1]}"
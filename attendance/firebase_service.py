@@ -5,27 +5,57 @@ Features:
 - Lazy initialization of Firebase
 - Reads credentials from `FIREBASE_CREDENTIALS_JSON` (env) or `FIREBASE_CREDENTIALS_PATH`
 """
+import base64
+import importlib.util
 import os
 import json
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-FIREBASE_AVAILABLE = False
+# Importing firebase_admin pulls in google-cloud-firestore and grpc, which costs
+# a few hundred milliseconds. Only check that it is installed here; the modules
+# are imported by `_load_firebase()` on first use so cold starts stay cheap.
+FIREBASE_AVAILABLE = importlib.util.find_spec("firebase_admin") is not None
 firebase_admin = None
 credentials = None
 firestore = None
 
-try:
-    import firebase_admin as _firebase_admin
-    from firebase_admin import credentials as _credentials
-    from firebase_admin import firestore as _firestore
+
+def _load_firebase():
+    """Import the firebase_admin stack once; returns False if it cannot be imported."""
+    global firebase_admin, credentials, firestore, FIREBASE_AVAILABLE
+    if firestore is not None:
+        return True
+    if not FIREBASE_AVAILABLE:
+        return False
+    try:
+        import firebase_admin as _firebase_admin
+        from firebase_admin import credentials as _credentials
+        from firebase_admin import firestore as _firestore
+    except Exception:
+        FIREBASE_AVAILABLE = False
+        return False
     firebase_admin = _firebase_admin
     credentials = _credentials
     firestore = _firestore
-    FIREBASE_AVAILABLE = True
-except Exception:
-    FIREBASE_AVAILABLE = False
+    return True
+
+
+def _credentials_from_env():
+    """Service account dict from FIREBASE_CREDENTIALS_JSON or FIREBASE_CREDENTIALS_JSON_BASE64.
+
+    Either variable may hold plain or base64-encoded JSON.
+    """
+    for value in (os.getenv("FIREBASE_CREDENTIALS_JSON"), os.getenv("FIREBASE_CREDENTIALS_JSON_BASE64")):
+        if not value:
+            continue
+        for decode in (lambda v: v, lambda v: base64.b64decode(v).decode("utf-8")):
+            try:
+                return json.loads(decode(value))
+            except Exception:
+                continue
+    return None
 
 
 class FirebaseService:
@@ -38,49 +68,64 @@ class FirebaseService:
             cls._instance = super().__new__(cls)
             cls._instance._db = None
             cls._instance._initialized = False
+            cls._instance._fs = None
         return cls._instance
 
+    def use_client(self, client):
+        """Use `client` (e.g. a FakeFirestoreClient) instead of connecting.
+
+        Passing None drops any injected client; the next access reconnects lazily.
+        """
+        from . import firestore_fake
+        if client is None:
+            self._db = None
+            self._initialized = False
+            self._fs = None
+            return
+        self._db = client
+        self._initialized = True
+        if isinstance(client, firestore_fake.FakeFirestoreClient):
+            self._fs = firestore_fake
+        else:
+            _load_firebase()
+            self._fs = firestore
+
+    @property
+    def firestore(self):
+        """Module providing `SERVER_TIMESTAMP` and `Increment` for the active client."""
+        if not getattr(self, "_initialized", False):
+            self._initialize_firebase()
+        return self._fs
+
     def _initialize_firebase(self):
-        if not FIREBASE_AVAILABLE:
+        if os.getenv("FIREBASE_FAKE") == "1":
+            from .firestore_fake import FakeFirestoreClient
+            self.use_client(FakeFirestoreClient.from_env())
+            return
+
+        if not _load_firebase():
             self._db = None
             self._initialized = True
             return
 
-        # Try to get credentials from env var
-        cred_path = None
-        cred_json = os.getenv("FIREBASE_CREDENTIALS_JSON")
-        if cred_json:
-            # Accept plain JSON or base64-encoded JSON
-            try:
-                # if it's base64 encoded, this will fail and we'll try decode
-                json.loads(cred_json)
-                tmp = Path("/tmp/firebase-credentials.json")
-                tmp.write_text(cred_json)
-                cred_path = str(tmp)
-            except Exception:
-                try:
-                    import base64
-                    decoded = base64.b64decode(cred_json).decode("utf-8")
-                    json.loads(decoded)
-                    tmp = Path("/tmp/firebase-credentials.json")
-                    tmp.write_text(decoded)
-                    cred_path = str(tmp)
-                except Exception:
-                    cred_path = None
+        # Prefer a service account from the environment, loaded straight into
+        # memory; serverless hosts only allow writes under /tmp, and the file
+        # round trip buys nothing.
+        cred_source = _credentials_from_env()
 
         # If not provided via JSON, check path env var
-        if not cred_path:
+        if cred_source is None:
             env_path = os.getenv("FIREBASE_CREDENTIALS_PATH")
-            if env_path:
-                cred_path = env_path
+            if env_path and Path(env_path).exists():
+                cred_source = env_path
 
         # Fall back to project file
-        if not cred_path:
+        if cred_source is None:
             default = Path(__file__).resolve().parents[1] / "firebase-credentials.json"
             if default.exists():
-                cred_path = str(default)
+                cred_source = str(default)
 
-        if not cred_path or not Path(cred_path).exists():
+        if cred_source is None:
             # credentials not found; do not raise on serverless, operate in local fallback mode
             self._db = None
             self._initialized = True
@@ -88,9 +133,10 @@ class FirebaseService:
 
         try:
             if not firebase_admin._apps:
-                cred = credentials.Certificate(str(cred_path))
+                cred = credentials.Certificate(cred_source)
                 firebase_admin.initialize_app(cred)
             self._db = firestore.client()
+            self._fs = firestore
             self._initialized = True
         except Exception:
             self._db = None
@@ -132,12 +178,12 @@ class FirebaseService:
             lecturer_ref = self._db.collection("lecturer_usage").document(lecturer_id)
             lecturer_ref.set({
                 "lecturer_name": lecturer_name,
-                "last_active": firestore.SERVER_TIMESTAMP,
+                "last_active": self._fs.SERVER_TIMESTAMP,
             }, merge=True)
 
             # atomically increment usage_count
             try:
-                lecturer_ref.update({"usage_count": firestore.Increment(1)})
+                lecturer_ref.update({"usage_count": self._fs.Increment(1)})
             except Exception:
                 # If update failed (e.g., doc did not exist in some older Firestore SDKs), set the field
                 lecturer_ref.set({"usage_count": 1}, merge=True)
@@ -193,10 +239,13 @@ class FirebaseService:
 # Lazy singleton accessor
 _firebase_service_singleton: Optional[FirebaseService] = None
 
-def get_firebase_service() -> FirebaseService:
+def get_firebase_service(client=None) -> FirebaseService:
+    """Return the shared FirebaseService, optionally injecting a Firestore `client`."""
     global _firebase_service_singleton
     if _firebase_service_singleton is None:
         _firebase_service_singleton = FirebaseService()
+    if client is not None:
+        _firebase_service_singleton.use_client(client)
     return _firebase_service_singleton
 
 
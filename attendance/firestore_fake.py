@@ -0,0 +1,329 @@
+"""
+In-memory stand-in for the Firestore client, for tests and load benchmarks.
+
+Implements the subset of the google-cloud-firestore API this project uses:
+collection/document/set(merge)/update/get/delete/stream/collections/batch,
+order_by/limit/start_after queries and the `SERVER_TIMESTAMP` / `Increment`
+transforms. Every call that would be a
+network round trip can be given an artificial latency and a probability of
+failing with a contention error, so the sync path can be exercised offline
+with realistic costs.
+
+Inject it with `get_firebase_service(client=FakeFirestoreClient(...))`, or set
+`FIREBASE_FAKE=1` (optionally `FIREBASE_FAKE_LATENCY_MS` and
+`FIREBASE_FAKE_CONTENTION`) to have the service create one on first use.
+"""
+import copy
+import os
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.utils import timezone
+
+
+class _Sentinel:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+SERVER_TIMESTAMP = _Sentinel('SERVER_TIMESTAMP')
+DELETE_FIELD = _Sentinel('DELETE_FIELD')
+
+
+class Increment:
+    """Numeric increment transform, like `firestore.Increment`."""
+
+    def __init__(self, value):
+        self.value = value
+
+
+class FakeContentionError(Exception):
+    """Raised for simulated write contention (Firestore's ABORTED)."""
+
+
+class FakeNotFound(Exception):
+    """Raised when updating a document that does not exist (Firestore's NOT_FOUND)."""
+
+
+MAX_BATCH_WRITES = 500
+
+
+class FakeFirestoreClient:
+    """
+    Thread-safe in-memory Firestore client.
+
+    Args:
+        latency: seconds slept per round trip (get/set/update/delete/stream/commit).
+        jitter: extra random latency, up to this many seconds.
+        contention_rate: probability (0-1) that a write raises FakeContentionError.
+        seed: seed for the latency/contention random generator.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, contention_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.contention_rate = contention_rate
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        # collection path -> {document id -> data}
+        self._store = {}
+        self.round_trips = Counter()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            latency=float(os.getenv('FIREBASE_FAKE_LATENCY_MS', '0')) / 1000.0,
+            contention_rate=float(os.getenv('FIREBASE_FAKE_CONTENTION', '0')),
+        )
+
+    # --- client API -----------------------------------------------------------
+
+    def collection(self, name):
+        return FakeCollectionReference(self, name)
+
+    def collections(self):
+        self._round_trip('collections')
+        with self._lock:
+            names = sorted(p for p, docs in self._store.items() if '/' not in p and docs)
+        return [FakeCollectionReference(self, name) for name in names]
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+    # --- internals ------------------------------------------------------------
+
+    def _round_trip(self, op, write=False):
+        self.round_trips[op] += 1
+        delay = self.latency
+        if self.jitter:
+            delay += self._random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        if write and self.contention_rate and self._random.random() < self.contention_rate:
+            raise FakeContentionError('409 Too much contention on these documents. Please try again.')
+
+    def _get(self, coll_path, doc_id):
+        with self._lock:
+            data = self._store.get(coll_path, {}).get(doc_id)
+            return copy.deepcopy(data) if data is not None else None
+
+    def _set(self, coll_path, doc_id, data, merge=False):
+        with self._lock:
+            docs = self._store.setdefault(coll_path, {})
+            current = docs.get(doc_id) if merge else None
+            docs[doc_id] = _apply(dict(current or {}), data)
+
+    def _update(self, coll_path, doc_id, data):
+        with self._lock:
+            docs = self._store.get(coll_path, {})
+            if doc_id not in docs:
+                raise FakeNotFound(f'404 No document to update: {coll_path}/{doc_id}')
+            docs[doc_id] = _apply(docs[doc_id], data)
+
+    def _delete(self, coll_path, doc_id):
+        with self._lock:
+            self._store.get(coll_path, {}).pop(doc_id, None)
+
+    def _list(self, coll_path):
+        with self._lock:
+            return [(doc_id, copy.deepcopy(data)) for doc_id, data in sorted(self._store.get(coll_path, {}).items())]
+
+
+def _apply(target, data):
+    """Apply `data` to `target` resolving transforms; nested dicts are merged."""
+    for key, value in data.items():
+        if value is SERVER_TIMESTAMP:
+            target[key] = timezone.now()
+        elif value is DELETE_FIELD:
+            target.pop(key, None)
+        elif isinstance(value, Increment):
+            target[key] = (target.get(key) or 0) + value.value
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            target[key] = _apply(dict(target[key]), value)
+        else:
+            target[key] = copy.deepcopy(value)
+    return target
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+
+class FakeDocumentReference:
+    def __init__(self, client, coll_path, doc_id):
+        self._client = client
+        self._coll_path = coll_path
+        self.id = doc_id
+
+    @property
+    def path(self):
+        return f'{self._coll_path}/{self.id}'
+
+    def collection(self, name):
+        return FakeCollectionReference(self._client, f'{self.path}/{name}')
+
+    def get(self):
+        self._client._round_trip('get')
+        return FakeDocumentSnapshot(self, self._client._get(self._coll_path, self.id))
+
+    def set(self, data, merge=False):
+        self._client._round_trip('set', write=True)
+        self._client._set(self._coll_path, self.id, data, merge=merge)
+
+    def update(self, data):
+        self._client._round_trip('update', write=True)
+        self._client._update(self._coll_path, self.id, data)
+
+    def delete(self):
+        self._client._round_trip('delete', write=True)
+        self._client._delete(self._coll_path, self.id)
+
+
+class FakeCollectionReference:
+    def __init__(self, client, path):
+        self._client = client
+        self._path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    def document(self, document_id=None):
+        return FakeDocumentReference(self._client, self._path, document_id or uuid.uuid4().hex[:20])
+
+    def stream(self):
+        self._client._round_trip('stream')
+        for doc_id, data in self._client._list(self._path):
+            yield FakeDocumentSnapshot(self.document(doc_id), data)
+
+    def get(self):
+        return list(self.stream())
+
+    def order_by(self, field, direction='ASCENDING'):
+        return FakeQuery(self).order_by(field, direction)
+
+    def limit(self, count):
+        return FakeQuery(self).limit(count)
+
+
+# Field path Firestore uses for ordering by document id.
+DOCUMENT_ID = '__name__'
+
+
+class FakeQuery:
+    """Immutable query over one collection: order_by, limit and start_after."""
+
+    ASCENDING = 'ASCENDING'
+    DESCENDING = 'DESCENDING'
+
+    def __init__(self, collection, orders=(), count=None, cursor=None):
+        self._collection = collection
+        self._orders = orders
+        self._count = count
+        self._cursor = cursor
+
+    def _copy(self, **changes):
+        state = {'orders': self._orders, 'count': self._count, 'cursor': self._cursor}
+        state.update(changes)
+        return FakeQuery(self._collection, **state)
+
+    def order_by(self, field, direction=ASCENDING):
+        return self._copy(orders=self._orders + ((field, direction),))
+
+    def limit(self, count):
+        return self._copy(count=count)
+
+    def start_after(self, snapshot):
+        return self._copy(cursor=snapshot)
+
+    def stream(self):
+        client = self._collection._client
+        client._round_trip('stream')
+        # Like Firestore, documents missing an ordered field are left out.
+        docs = [
+            (doc_id, data) for doc_id, data in client._list(self._collection._path)
+            if all(field == DOCUMENT_ID or field in data for field, _ in self._orders)
+        ]
+        # Stable multi-key sort: apply keys from last to first.
+        for index in reversed(range(len(self._orders))):
+            field, direction = self._orders[index]
+            docs.sort(
+                key=lambda item: item[0] if field == DOCUMENT_ID else item[1][field],
+                reverse=direction == self.DESCENDING,
+            )
+        if self._cursor is not None:
+            ids = [doc_id for doc_id, _ in docs]
+            if self._cursor.id in ids:
+                docs = docs[ids.index(self._cursor.id) + 1:]
+        if self._count is not None:
+            docs = docs[:self._count]
+        for doc_id, data in docs:
+            yield FakeDocumentSnapshot(self._collection.document(doc_id), data)
+
+    def get(self):
+        return list(self.stream())
+
+
+class FakeWriteBatch:
+    """Collects up to 500 writes and applies them in one round trip on commit()."""
+
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def __len__(self):
+        return len(self._writes)
+
+    def _add(self, op, reference, data=None, merge=False):
+        if len(self._writes) >= MAX_BATCH_WRITES:
+            raise ValueError(f'A write batch cannot contain more than {MAX_BATCH_WRITES} writes.')
+        self._writes.append((op, reference, data, merge))
+
+    def set(self, reference, data, merge=False):
+        self._add('set', reference, data, merge)
+
+    def update(self, reference, data):
+        self._add('update', reference, data)
+
+    def delete(self, reference):
+        self._add('delete', reference)
+
+    def commit(self):
+        self._client._round_trip('commit', write=True)
+        with self._client._lock:
+            # Batches are atomic: reject the whole batch if any update target is missing.
+            pending = set()
+            for op, ref, _, _ in self._writes:
+                key = (ref._coll_path, ref.id)
+                if op == 'set':
+                    pending.add(key)
+                elif op == 'delete':
+                    pending.discard(key)
+                elif key not in pending and self._client._get(*key) is None:
+                    raise FakeNotFound(f'404 No document to update: {ref.path}')
+            for op, ref, data, merge in self._writes:
+                if op == 'set':
+                    self._client._set(ref._coll_path, ref.id, data, merge=merge)
+                elif op == 'update':
+                    self._client._update(ref._coll_path, ref.id, data)
+                else:
+                    self._client._delete(ref._coll_path, ref.id)
+        committed = len(self._writes)
+        self._writes = []
+        return committed
@@ -1,8 +1,11 @@
 """
 Forms for Digital Attendance System.
 """
+import uuid
+
 from django import forms
 from .models import AttendanceSession, Unit, Lecturer
+from .schedule import WEEKDAY_CHOICES
 
 
 class AttendanceSessionForm(forms.ModelForm):
@@ -44,6 +47,37 @@ class AttendanceSessionForm(forms.ModelForm):
         }
 
 
+class SessionScheduleForm(forms.Form):
+    """Form for creating a semester's sessions from a weekly pattern."""
+
+    unit = forms.ModelChoiceField(queryset=Unit.objects.none(), widget=forms.Select(attrs={'class': 'form-input'}))
+    lecturer_name = forms.CharField(max_length=100, required=False, widget=forms.TextInput(attrs={
+        'class': 'form-input',
+        'placeholder': 'Enter lecturer name (e.g., Dr. Anthony Motongori)'
+    }))
+    class_year = forms.ChoiceField(choices=AttendanceSession.CLASS_YEAR_CHOICES, initial='Year 1',
+                                   widget=forms.Select(attrs={'class': 'form-input'}))
+    semester = forms.TypedChoiceField(choices=AttendanceSession.SEMESTER_CHOICES, coerce=int, initial=1,
+                                      widget=forms.Select(attrs={'class': 'form-input'}))
+    start_date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-input'}))
+    end_date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-input'}))
+    weekdays = forms.TypedMultipleChoiceField(choices=WEEKDAY_CHOICES, coerce=int,
+                                              widget=forms.CheckboxSelectMultiple)
+    start_time = forms.TimeField(widget=forms.TimeInput(attrs={'type': 'time', 'class': 'form-input'}))
+    end_time = forms.TimeField(widget=forms.TimeInput(attrs={'type': 'time', 'class': 'form-input'}))
+    venue = forms.CharField(max_length=100, widget=forms.TextInput(attrs={
+        'class': 'form-input',
+        'placeholder': 'e.g., Room 101, Lab A'
+    }))
+
+    def clean(self):
+        cleaned = super().clean()
+        start, end = cleaned.get('start_date'), cleaned.get('end_date')
+        if start and end and end < start:
+            self.add_error('end_date', 'End date must be on or after the start date.')
+        return cleaned
+
+
 class StudentAttendanceForm(forms.Form):
     """Form for students to mark attendance."""
     
@@ -65,6 +99,13 @@ class StudentAttendanceForm(forms.Form):
         })
     )
     
+    # Random per rendered form; lets the server replay a retried submission.
+    idempotency_key = forms.CharField(max_length=64, required=False, widget=forms.HiddenInput)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['idempotency_key'].initial = uuid.uuid4().hex
+
     def clean_admission_number(self):
         """Validate admission number format."""
         admission = self.cleaned_data.get('admission_number')
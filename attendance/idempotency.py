@@ -0,0 +1,57 @@
+"""
+Replay of completed attendance submissions.
+
+Every attend form carries a random idempotency key. When a submission
+succeeds, its rendered success page is kept in the cache under that key and
+the submitted admission number for ATTEND_IDEMPOTENCY_SECONDS. A retry of
+the same submission (a flaky mobile connection re-POSTing, a double tap)
+gets the stored page back before any admission check, query, write or sync
+job. A different student submitting from the same rendered form (a shared
+phone, a page restored by back-navigation) does not match and goes through
+the normal path.
+"""
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+REPLAY_HEADER = 'Idempotent-Replay'
+_KEY_RE = re.compile(r'^[0-9A-Za-z-]{16,64}$')
+
+
+def clean_idempotency_key(value):
+    """The submitted key if it looks like one we issued, else None."""
+    value = (value or '').strip()
+    return value if _KEY_RE.match(value) else None
+
+
+def _cache_key(session_id, key, admission_number):
+    # Normalised as StudentAttendanceForm does; hashed to keep the cache key plain.
+    student = hashlib.blake2s((admission_number or '').strip().upper().encode(), digest_size=8).hexdigest()
+    return f'attend_done:{session_id}:{key}:{student}'
+
+
+def replay_response(session_id, key, admission_number):
+    """The stored response for a completed submission by `admission_number`, or None."""
+    if key is None:
+        return None
+    stored = cache.get(_cache_key(session_id, key, admission_number))
+    if stored is None:
+        return None
+    content, content_type = stored
+    response = HttpResponse(content, content_type=content_type)
+    response[REPLAY_HEADER] = 'true'
+    return response
+
+
+def remember_response(session_id, key, admission_number, response):
+    """Keep a completed submission's response so retries with the same key and student can replay it."""
+    if key is None:
+        return
+    cache.set(
+        _cache_key(session_id, key, admission_number),
+        (response.content, response['Content-Type']),
+        getattr(settings, 'ATTEND_IDEMPOTENCY_SECONDS', 600),
+    )
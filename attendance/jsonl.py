@@ -0,0 +1,59 @@
+"""
+Gzip-compressed JSON Lines helpers used by archives and backups.
+
+Records are written one per line as they are produced and read back lazily,
+so neither side has to hold a whole dataset in memory.
+"""
+import gzip
+import json
+import os
+from pathlib import Path
+
+
+class JsonlWriter:
+    """
+    Append records to `<path>` via a `<path>.partial` temp file.
+
+    The file only appears under its final name once `close()` succeeds, so a
+    crashed run never leaves a truncated file that looks complete.
+    """
+
+    def __init__(self, path, compresslevel=6):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tmp_path = self.path.with_name(self.path.name + '.partial')
+        self._fh = gzip.open(self.tmp_path, 'wt', encoding='utf-8', compresslevel=compresslevel)
+        self.count = 0
+
+    def write(self, record):
+        self._fh.write(json.dumps(record, separators=(',', ':'), default=str))
+        self._fh.write('\n')
+        self.count += 1
+
+    def close(self):
+        self._fh.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        self._fh.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def iter_jsonl(path):
+    """Yield the records of a (gzip-compressed) JSONL file one at a time."""
+    path = Path(path)
+    opener = gzip.open if path.suffix == '.gz' else open
+    with opener(path, 'rt', encoding='utf-8') as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
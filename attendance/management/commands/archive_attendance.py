@@ -0,0 +1,69 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.archive import (
+    ARCHIVE_BATCH_SIZE, archivable_queryset, archive_filename, archive_root, delete_archived,
+    register_archive, summarize_archive, write_archive,
+)
+from attendance.models import Unit
+
+
+class Command(BaseCommand):
+    help = (
+        'Move attendance of a closed semester into a compressed JSONL archive and remove it from the database. '
+        'Only sessions that are closed and dated before --before are archived. Archived records remain visible '
+        'to exports and reports.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semester', type=int, required=True, choices=[1, 2], help='Semester to archive')
+        parser.add_argument('--before', type=str, required=True, help='Archive sessions dated before this day (YYYY-MM-DD)')
+        parser.add_argument('--unit', type=str, help='Only archive this unit code')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='Rows read and deleted per round trip')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many records would be archived')
+        parser.add_argument('--resume', action='store_true', help='Finish deleting rows listed in an existing archive file')
+
+    def handle(self, *args, **options):
+        try:
+            before = date.fromisoformat(options['before'])
+        except ValueError:
+            raise CommandError('--before must be a date in YYYY-MM-DD format.')
+
+        unit = None
+        if options.get('unit'):
+            try:
+                unit = Unit.objects.get(code=options['unit'])
+            except Unit.DoesNotExist:
+                raise CommandError(f"Unit {options['unit']} not found.")
+
+        semester = options['semester']
+        batch_size = options['batch_size']
+        qs = archivable_queryset(semester, before, unit=unit)
+        path = archive_root() / archive_filename(semester, before, unit=unit)
+
+        if options.get('dry_run'):
+            self.stdout.write(f'{qs.count()} records would be archived to {path}')
+            return
+
+        if path.exists():
+            if not options.get('resume'):
+                raise CommandError(f'{path} already exists. Rerun with --resume to finish removing its records.')
+            deleted = delete_archived(path, batch_size=batch_size)
+            register_archive(path, *summarize_archive(path))
+            self.stdout.write(self.style.SUCCESS(f'Resumed {path.name}: removed {deleted} remaining records.'))
+            return
+
+        rows, units, semesters = write_archive(qs, path, batch_size=batch_size)
+        if rows == 0:
+            path.unlink(missing_ok=True)
+            self.stdout.write(self.style.WARNING('No closed sessions matched; nothing archived.'))
+            return
+
+        self.stdout.write(f'Wrote {rows} records to {path}')
+        # The archive is only listed in the manifest once its rows are out of the
+        # table, so readers never see a record in both places. An interrupted run
+        # leaves it unlisted until --resume finishes the deletes.
+        deleted = delete_archived(path, batch_size=batch_size)
+        register_archive(path, rows, units, semesters)
+        self.stdout.write(self.style.SUCCESS(f'Archived {rows} records; removed {deleted} from the database.'))
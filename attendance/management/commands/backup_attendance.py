@@ -0,0 +1,46 @@
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from attendance.backup import BACKUP_CHUNK_SIZE, backup_filename, backup_root, write_backup
+
+
+def parse_since(value):
+    """Accept an ISO date or datetime; naive values are in the project timezone."""
+    since = parse_datetime(value)
+    if since is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError('--since must be an ISO date or datetime, e.g. 2025-03-01 or 2025-03-01T08:00.')
+        since = datetime.combine(day, time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+class Command(BaseCommand):
+    help = (
+        'Back up lecturers, units, sessions, students, enrollments and attendance to compressed JSONL. '
+        'Rows are streamed in chunks; use --since for an incremental backup. Restore with restore_attendance.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=str, help='Output file. Defaults to backups/attendance_<full|incremental>_<timestamp>.jsonl.gz')
+        parser.add_argument('--since', type=str, help='Only include sessions, students and attendance changed since this date/datetime')
+        parser.add_argument('--chunk-size', type=int, default=BACKUP_CHUNK_SIZE, help='Rows fetched per database round trip')
+        parser.add_argument('--include-passwords', action='store_true',
+                            help='Also back up user password hashes (keep the file somewhere private)')
+
+    def handle(self, *args, **options):
+        since = parse_since(options['since']) if options.get('since') else None
+        path = options.get('output') or backup_root() / backup_filename(since)
+
+        include_passwords = options.get('include_passwords', False)
+        if include_passwords:
+            self.stdout.write(self.style.WARNING('Backup includes password hashes; store it outside the repository.'))
+        counts = write_backup(path, since=since, chunk_size=options['chunk_size'], include_passwords=include_passwords)
+        for label, n in counts.items():
+            self.stdout.write(f'  {label}: {n}')
+        self.stdout.write(self.style.SUCCESS(f'Backup written to {path} ({sum(counts.values())} rows)'))
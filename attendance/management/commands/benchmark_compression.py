@@ -0,0 +1,79 @@
+import gzip
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory
+
+from attendance import views
+from attendance.middleware import BROTLI_AVAILABLE, CompressionMiddleware, brotli, minify_html
+from attendance.models import AttendanceSession
+
+
+def streamed_size(body, content_type, encoding):
+    """Bytes CompressionMiddleware sends for `body` streamed one line per chunk, as exports are."""
+    response = StreamingHttpResponse(iter(body.splitlines(keepends=True)), content_type=content_type)
+    request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=encoding)
+    response = CompressionMiddleware(lambda r: response)(request)
+    return len(b''.join(response.streaming_content))
+
+
+def _time_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = fn()
+    return (time.perf_counter() - start) / iterations * 1e6, result
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure bytes saved versus CPU time for HTML minification, gzip and brotli on the student '
+        'attend page and the api_status JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--session-id', type=str, help='Session to render (defaults to the most recent one)')
+        parser.add_argument('--iterations', type=int, default=200, help='Repetitions per measurement')
+
+    def handle(self, *args, **options):
+        qs = AttendanceSession.objects.all()
+        if options.get('session_id'):
+            qs = qs.filter(id=options['session_id'])
+        session = qs.order_by('-created_at').first()
+        if session is None:
+            raise CommandError('No attendance session found to render; create one or pass --session-id.')
+
+        factory = RequestFactory()
+        samples = {
+            'attend page (HTML)': views.student_attend(factory.get(f'/attend/{session.id}/'), session_id=session.id).content,
+            'api_status (JSON)': views.api_status(factory.get('/api/status/', {'session_id': str(session.id)})).content,
+        }
+        n = options['iterations']
+        for label, body in samples.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{label}: {len(body)} bytes'))
+            stages = []
+            if b'<html' in body[:500].lower() or b'<!doctype' in body[:100].lower():
+                stages.append(('minify', lambda b=body: minify_html(b.decode('utf-8')).encode('utf-8')))
+            for level in (1, 6, 9):
+                stages.append((f'gzip -{level}', lambda b=body, lv=level: gzip.compress(b, compresslevel=lv)))
+            if BROTLI_AVAILABLE:
+                for quality in (4, 5, 11):
+                    stages.append((f'brotli q{quality}', lambda b=body, q=quality: brotli.compress(b, quality=q, mode=brotli.MODE_TEXT)))
+            else:
+                self.stdout.write('  (brotli not installed; skipping brotli rows)')
+
+            minified = None
+            for name, fn in stages:
+                us, out = _time_us(fn, n)
+                if name == 'minify':
+                    minified = out
+                self.stdout.write(f'  {name:<12} {len(out):>8} bytes  {100 * len(out) / len(body):5.1f}%  {us:9.1f} us')
+            if minified is not None:
+                us, out = _time_us(lambda: gzip.compress(minified, compresslevel=6), n)
+                self.stdout.write(f"  {'minify+gzip':<12} {len(out):>8} bytes  {100 * len(out) / len(body):5.1f}%  {us:9.1f} us")
+
+            # Streamed through the middleware, line by line, versus the one-shot ratios above.
+            content_type = 'text/html' if minified is not None else 'application/json'
+            for encoding in (['br'] if BROTLI_AVAILABLE else []) + ['gzip']:
+                size = streamed_size(body, content_type, encoding)
+                self.stdout.write(f"  {'stream ' + encoding:<12} {size:>8} bytes  {100 * size / len(body):5.1f}%")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from attendance.dedupe import DEDUPE_BATCH_SIZE, cleanup_duplicate_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        'Remove duplicate attendance sessions (same unit, semester, date and start time), keeping the newest of '
+        'each group. Attendance on the duplicates is moved to the kept session, or dropped if the student is '
+        'already recorded there.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEDUPE_BATCH_SIZE, help='Duplicate sessions handled per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+
+    def handle(self, *args, **options):
+        dry_run = options.get('dry_run')
+        result = cleanup_duplicate_sessions(batch_size=options['batch_size'], dry_run=dry_run)
+        if not result.sessions:
+            self.stdout.write(self.style.SUCCESS('No duplicate sessions found.'))
+            return
+        verb = 'would be' if dry_run else 'were'
+        summary = (
+            f'{result.groups} duplicate group(s): {result.sessions} session(s) {verb} deleted, '
+            f'{result.repointed} attendance record(s) {verb} moved to the kept session and '
+            f'{result.merged} {verb} merged into existing records.'
+        )
+        self.stdout.write(summary if dry_run else self.style.SUCCESS(summary))
@@ -0,0 +1,34 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from attendance.exports import stream_csv
+from attendance.reports import ELIGIBILITY_HEADER, build_eligibility_report, default_threshold, eligibility_csv_row
+
+
+class Command(BaseCommand):
+    help = 'Report students below the attendance threshold for every unit and semester (exam eligibility).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semester', type=int, choices=[1, 2], help='Only report this semester (default: all)')
+        parser.add_argument('--threshold', type=int, help='Minimum attendance percentage (default: ATTENDANCE_ELIGIBILITY_THRESHOLD)')
+        parser.add_argument('--all', action='store_true', help='Include eligible students, not only those at risk')
+        parser.add_argument('--output', type=str, help='Write CSV to this path instead of stdout')
+
+    def handle(self, *args, **options):
+        threshold = options.get('threshold')
+        if threshold is None:
+            threshold = default_threshold()
+        report = build_eligibility_report(semester=options.get('semester'), threshold=threshold)
+        rows = (eligibility_csv_row(r) for r in report.rows(at_risk_only=not options.get('all')))
+        lines = stream_csv(rows, header=ELIGIBILITY_HEADER)
+
+        output = options.get('output')
+        if output:
+            with open(output, 'w', newline='', encoding='utf-8') as fh:
+                fh.writelines(lines)
+            self.stdout.write(self.style.SUCCESS(
+                f'{report.at_risk_count} of {len(report)} student-unit entries below {threshold}%. Report written to {output}'
+            ))
+        else:
+            sys.stdout.writelines(lines)
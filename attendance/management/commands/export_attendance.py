@@ -0,0 +1,46 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, attendance_rows, export_filename, stream_export
+from attendance.models import Unit
+
+
+class Command(BaseCommand):
+    help = 'Export attendance for a unit and semester to CSV or XLSX. Rows are streamed, so memory use stays flat for large semesters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('unit_code', type=str, help='Unit code, e.g. CS101')
+        parser.add_argument('--semester', type=int, default=1, choices=[1, 2], help='Semester number (default 1)')
+        parser.add_argument('--format', dest='fmt', default='csv', choices=sorted(EXPORT_FORMATS), help='Output format (default csv)')
+        parser.add_argument('--output', type=str, help='Output file path. Defaults to attendance_<unit>_S<semester>.<ext>; use "-" for stdout (CSV only)')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help='Rows fetched per database round trip')
+
+    def handle(self, *args, **options):
+        fmt = options['fmt']
+        semester = options['semester']
+        try:
+            unit = Unit.objects.get(code=options['unit_code'])
+        except Unit.DoesNotExist:
+            raise CommandError(f"Unit {options['unit_code']} not found.")
+
+        output = options.get('output') or export_filename(unit, semester, fmt)
+        rows = attendance_rows(unit, semester, chunk_size=options['chunk_size'])
+        chunks = stream_export(rows, fmt)
+
+        if output == '-':
+            if fmt != 'csv':
+                raise CommandError('Only CSV can be written to stdout.')
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            return
+
+        written = 0
+        with open(output, 'wb') as fh:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                fh.write(chunk)
+                written += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f'Export written to {output} ({written} bytes)'))
@@ -1,74 +1,78 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
 import json
+import os
+import threading
 import time
 from pathlib import Path
 
 from attendance.firebase_service import get_firebase_service
+from attendance.jsonl import JsonlWriter, iter_jsonl
+
+# Firestore rejects batches with more than 500 writes.
+MAX_BATCH_WRITES = 500
+CHECKPOINT_NAME = 'firebase_cleanup_checkpoint.json'
+COMMIT_RETRIES = 3
 
 
 class Command(BaseCommand):
-    help = 'Backup and optionally delete attendance data from Firebase. Use --dry-run to only preview, --session-id to target a session, --all to delete everything, and --confirm to actually delete.'
+    help = (
+        'Backup and optionally delete attendance data from Firebase. Use --dry-run to only preview, '
+        '--session-id to target a session, --all to delete everything, and --confirm to actually delete. '
+        'The backup is streamed to compressed JSONL; deletes are batched and run on a worker pool, with a '
+        'checkpoint file so an interrupted run can continue with --resume.'
+    )
 
     def add_arguments(self, parser):
         parser.add_argument('--dry-run', action='store_true', help='Do not delete; only backup and report')
         parser.add_argument('--session-id', type=str, help='Only target a specific session id')
         parser.add_argument('--all', action='store_true', help='Target all sessions and attendance_records')
         parser.add_argument('--confirm', action='store_true', help='Confirm deletion')
+        parser.add_argument('--workers', type=int, default=8, help='Parallel workers for subcollection reads and deletes')
+        parser.add_argument('--batch-size', type=int, default=MAX_BATCH_WRITES, help='Writes per batch (max 500)')
+        parser.add_argument('--resume', action='store_true', help='Continue an interrupted deletion from its checkpoint')
 
     def handle(self, *args, **options):
         dry_run = options.get('dry_run')
         session_id = options.get('session_id')
         delete_all = options.get('all')
         confirm = options.get('confirm')
+        self.workers = max(1, options.get('workers') or 1)
+        self.batch_size = min(max(1, options.get('batch_size') or MAX_BATCH_WRITES), MAX_BATCH_WRITES)
+        # Guards the checkpoint state and deletion counters, which worker
+        # callbacks update alongside the main thread. Re-entrant so
+        # `_save_checkpoint` can be called with it already held.
+        self.state_lock = threading.RLock()
 
         fb = get_firebase_service()
         if not fb.is_connected:
             raise CommandError('Firebase is not connected from this environment.')
+        self.db = fb.db
 
-        out = {}
-        timestamp = int(time.time())
-        out_path = Path(settings.BASE_DIR) / f'firebase_backup_{timestamp}.json'
-
-        # Backup sessions -> students
-        collections = {}
-
-        if delete_all:
-            # iterate all documents under 'sessions' and 'attendance_records'
+        checkpoint_path = Path(settings.BASE_DIR) / CHECKPOINT_NAME
+        state = None
+        if options.get('resume'):
+            if not checkpoint_path.exists():
+                raise CommandError(f'No checkpoint found at {checkpoint_path}.')
+            state = json.loads(checkpoint_path.read_text())
+            self.stdout.write(f"Resuming cleanup from {state['backup']} "
+                              f"({len(state['deleted_sessions'])} sessions already deleted)")
+        else:
+            if not delete_all and not session_id:
+                raise CommandError('Specify --session-id or --all')
+            timestamp = int(time.time())
+            out_path = Path(settings.BASE_DIR) / f'firebase_backup_{timestamp}.jsonl.gz'
             try:
-                sessions = fb.db.collection('sessions').stream()
-                collections['sessions'] = {}
-                for doc in sessions:
-                    doc_id = doc.id
-                    data = doc.to_dict()
-                    # dump children students
-                    students = fb.db.collection('sessions').document(doc_id).collection('students').stream()
-                    collections['sessions'][doc_id] = {'meta': data, 'students': {}}
-                    for s in students:
-                        collections['sessions'][doc_id]['students'][s.id] = s.to_dict()
-                # attendance_records top-level collection
-                ar_docs = fb.db.collection('attendance_records').stream()
-                collections['attendance_records'] = {d.id: d.to_dict() for d in ar_docs}
+                counts = self._write_backup(out_path, session_id=None if delete_all else session_id)
             except Exception as e:
                 raise CommandError(f'Error reading Firebase data: {e}')
-
-        elif session_id:
-            try:
-                doc = fb.db.collection('sessions').document(session_id).get()
-                if not doc.exists:
-                    self.stdout.write(self.style.WARNING(f'Session {session_id} not found in Firebase.'))
-                collections['sessions'] = {session_id: {'meta': doc.to_dict(), 'students': {}}}
-                students = fb.db.collection('sessions').document(session_id).collection('students').stream()
-                for s in students:
-                    collections['sessions'][session_id]['students'][s.id] = s.to_dict()
-            except Exception as e:
-                raise CommandError(f'Error reading session data: {e}')
-        else:
-            raise CommandError('Specify --session-id or --all')
-
-        # write backup
-        out_path.write_text(json.dumps(collections, indent=2, default=str))
-        self.stdout.write(self.style.SUCCESS(f'Backup written to {out_path}'))
+            self.stdout.write(self.style.SUCCESS(
+                f"Backup written to {out_path} ({counts['sessions']} sessions, {counts['students']} students, "
+                f"{counts['attendance_records']} attendance_records)"
+            ))
+            state = {'backup': str(out_path), 'deleted_sessions': [], 'attendance_records_done': False}
 
         if dry_run:
             self.stdout.write(self.style.WARNING('Dry run - no deletion performed.'))
@@ -78,29 +82,161 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('Deletion not confirmed. Rerun with --confirm to delete.'))
             return
 
-        # proceed with deletion
-        deleted = {'sessions': [], 'attendance_records': []}
+        self._save_checkpoint(checkpoint_path, state)
         try:
-            if delete_all:
-                # delete students subcollections then session docs
-                for sess_id in collections.get('sessions', {}):
-                    students = fb.db.collection('sessions').document(sess_id).collection('students').stream()
-                    for s in students:
-                        fb.db.collection('sessions').document(sess_id).collection('students').document(s.id).delete()
-                    fb.db.collection('sessions').document(sess_id).delete()
-                    deleted['sessions'].append(sess_id)
-                for ar_id in collections.get('attendance_records', {}):
-                    fb.db.collection('attendance_records').document(ar_id).delete()
-                    deleted['attendance_records'].append(ar_id)
-            else:
-                # session_id deletion
-                for sess_id in collections.get('sessions', {}):
-                    students = fb.db.collection('sessions').document(sess_id).collection('students').stream()
-                    for s in students:
-                        fb.db.collection('sessions').document(sess_id).collection('students').document(s.id).delete()
-                    fb.db.collection('sessions').document(sess_id).delete()
-                    deleted['sessions'].append(sess_id)
+            deleted = self._delete_from_backup(Path(state['backup']), state, checkpoint_path)
         except Exception as e:
-            raise CommandError(f'Error deleting data: {e}')
+            self._save_checkpoint(checkpoint_path, state)
+            raise CommandError(f'Error deleting data: {e}. Rerun with --resume to continue.')
+
+        checkpoint_path.unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS(
+            f"Deletion complete. Deleted {deleted['sessions']} sessions, {deleted['documents']} documents in "
+            f"{deleted['batches']} batches."
+        ))
+
+    # --- backup -----------------------------------------------------------------
+
+    def _read_students(self, sess_id):
+        students = self.db.collection('sessions').document(sess_id).collection('students').stream()
+        return [(s.id, s.to_dict()) for s in students]
+
+    def _write_backup(self, out_path, session_id=None):
+        """Stream sessions, their students and attendance_records into `out_path`.
+
+        Student subcollections are fetched on the worker pool; at most a few
+        sessions per worker are held in memory while waiting to be written.
+        """
+        counts = {'sessions': 0, 'students': 0, 'attendance_records': 0}
+        with JsonlWriter(out_path) as writer, ThreadPoolExecutor(max_workers=self.workers) as pool:
+            if session_id:
+                doc = self.db.collection('sessions').document(session_id).get()
+                if not doc.exists:
+                    self.stdout.write(self.style.WARNING(f'Session {session_id} not found in Firebase.'))
+                sessions = [(session_id, doc.to_dict())]
+            else:
+                sessions = ((d.id, d.to_dict()) for d in self.db.collection('sessions').stream())
+
+            window = deque()
+
+            def flush_one():
+                sess_id, meta, future = window.popleft()
+                writer.write({'collection': 'sessions', 'id': sess_id, 'data': meta})
+                counts['sessions'] += 1
+                for student_id, data in future.result():
+                    writer.write({'collection': f'sessions/{sess_id}/students', 'id': student_id, 'data': data})
+                    counts['students'] += 1
+
+            for sess_id, meta in sessions:
+                window.append((sess_id, meta, pool.submit(self._read_students, sess_id)))
+                if len(window) >= self.workers * 2:
+                    flush_one()
+            while window:
+                flush_one()
+
+            if not session_id:
+                for d in self.db.collection('attendance_records').stream():
+                    writer.write({'collection': 'attendance_records', 'id': d.id, 'data': d.to_dict()})
+                    counts['attendance_records'] += 1
+        return counts
+
+    # --- delete -----------------------------------------------------------------
+
+    def _commit(self, refs):
+        """Delete `refs` in one batched write, retrying on transient contention."""
+        for attempt in range(COMMIT_RETRIES):
+            batch = self.db.batch()
+            for ref in refs:
+                batch.delete(ref)
+            try:
+                batch.commit()
+                return
+            except Exception:
+                if attempt == COMMIT_RETRIES - 1:
+                    raise
+                time.sleep(0.2 * (2 ** attempt))
+
+    def _delete_session(self, sess_id, student_ids):
+        """Delete a session's students subcollection and then the session doc. Returns batch count."""
+        session_ref = self.db.collection('sessions').document(sess_id)
+        students = session_ref.collection('students')
+        refs = [students.document(sid) for sid in student_ids] + [session_ref]
+        batches = 0
+        for start in range(0, len(refs), self.batch_size):
+            self._commit(refs[start:start + self.batch_size])
+            batches += 1
+        return batches
+
+    def _delete_from_backup(self, backup_path, state, checkpoint_path):
+        """Delete exactly the documents recorded in the backup file."""
+        done = set(state['deleted_sessions'])
+        lock = self.state_lock
+        deleted = {'sessions': 0, 'documents': 0, 'batches': 0}
+
+        def on_done(sess_id, n_docs, future):
+            # Failures surface from `.result()` in the submitting thread.
+            if future.exception() is not None:
+                return
+            batches = future.result()
+            with lock:
+                state['deleted_sessions'].append(sess_id)
+                deleted['sessions'] += 1
+                deleted['documents'] += n_docs
+                deleted['batches'] += batches
+                if deleted['sessions'] % 25 == 0:
+                    self._save_checkpoint(checkpoint_path, state)
+                    self.stdout.write(f"  ... {len(state['deleted_sessions'])} sessions deleted")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+
+            def submit(sess_id, student_ids):
+                if sess_id in done:
+                    return
+                future = pool.submit(self._delete_session, sess_id, student_ids)
+                future.add_done_callback(lambda f, s=sess_id, n=len(student_ids) + 1: on_done(s, n, f))
+                pending.append(future)
+                # Bound queued work so memory stays flat for large backups.
+                while len(pending) > self.workers * 4:
+                    pending.popleft().result()
+
+            records = self.db.collection('attendance_records')
+            record_ids = []
+
+            def delete_records():
+                self._commit([records.document(i) for i in record_ids])
+                with lock:
+                    deleted['documents'] += len(record_ids)
+                    deleted['batches'] += 1
+                record_ids.clear()
+
+            current, student_ids = None, []
+            for record in iter_jsonl(backup_path):
+                collection = record['collection']
+                if collection == 'sessions':
+                    if current is not None:
+                        submit(current, student_ids)
+                    current, student_ids = record['id'], []
+                elif collection.startswith('sessions/'):
+                    student_ids.append(record['id'])
+                elif collection == 'attendance_records' and not state['attendance_records_done']:
+                    record_ids.append(record['id'])
+                    if len(record_ids) >= self.batch_size:
+                        delete_records()
+            if current is not None:
+                submit(current, student_ids)
+            if record_ids:
+                delete_records()
+            for future in pending:
+                future.result()
+
+        with lock:
+            state['attendance_records_done'] = True
+            self._save_checkpoint(checkpoint_path, state)
+        return deleted
 
-        self.stdout.write(self.style.SUCCESS(f'Deletion complete. Deleted: {deleted}'))
+    def _save_checkpoint(self, checkpoint_path, state):
+        with self.state_lock:
+            tmp = checkpoint_path.with_name(checkpoint_path.name + '.partial')
+            tmp.write_text(json.dumps(state))
+            os.replace(tmp, checkpoint_path)
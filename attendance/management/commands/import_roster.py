@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.models import Unit
+from attendance.roster import ROSTER_BATCH_SIZE, RosterError, import_roster, read_roster
+
+
+class Command(BaseCommand):
+    help = (
+        'Import a student roster CSV (admission_number, name, email, phone, unit_code). Students are upserted '
+        'and enrolled in bulk, then pushed to the lecturer portal in chunks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='Roster CSV file')
+        parser.add_argument('--unit', type=str, help='Enroll every student in this unit code (ignores the unit_code column)')
+        parser.add_argument('--batch-size', type=int, default=ROSTER_BATCH_SIZE, help='Students upserted per query')
+        parser.add_argument('--no-portal', action='store_true', help='Do not push students to the lecturer portal')
+
+    def handle(self, *args, **options):
+        unit = None
+        if options.get('unit'):
+            try:
+                unit = Unit.objects.get(code=options['unit'])
+            except Unit.DoesNotExist:
+                raise CommandError(f"Unit {options['unit']} not found.")
+
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as fh:
+                result = import_roster(
+                    read_roster(fh), unit=unit, batch_size=options['batch_size'],
+                    push_to_portal=not options.get('no_portal'),
+                )
+        except FileNotFoundError:
+            raise CommandError(f"{options['path']} not found.")
+        except RosterError as e:
+            raise CommandError(str(e))
+
+        for line, message in result.errors:
+            self.stdout.write(self.style.WARNING(f"  line {line}: {message}" if line else f"  {message}"))
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.students} students, {result.enrollments} enrollments; '
+            f'{result.portal_synced} pushed to the portal.'
+        ))
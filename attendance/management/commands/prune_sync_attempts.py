@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from attendance.sync_status import prune_sync_attempts
+
+
+class Command(BaseCommand):
+    help = 'Delete logged sync failures older than the retention window or beyond the row cap.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=settings.SYNC_ATTEMPT_RETENTION_DAYS,
+                            help='Keep attempts logged within this many days')
+        parser.add_argument('--max-rows', type=int, default=settings.SYNC_ATTEMPT_MAX_ROWS,
+                            help='Keep at most this many of the newest attempts')
+
+    def handle(self, *args, **options):
+        deleted = prune_sync_attempts(retention_days=options['retention_days'], max_rows=options['max_rows'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} sync attempt(s).'))
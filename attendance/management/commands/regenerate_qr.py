@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand, CommandError
 from attendance.models import AttendanceSession
 from attendance.qr_generator import generate_session_qr
-from django.conf import settings
+from attendance.site_url import public_base_url
 
 
 class Command(BaseCommand):
@@ -29,9 +29,9 @@ class Command(BaseCommand):
 
         self.stdout.write(f'Processing {count} sessions...')
         processed = 0
+        base_url = public_base_url()
         for session in qs:
             try:
-                base_url = getattr(settings, 'SITE_BASE_URL', None) or 'https://{host}'.format(host=settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'localhost')
                 qr_file = generate_session_qr(session, base_url=base_url)
                 session.qr_code.save(qr_file.name, qr_file, save=True)
                 processed += 1
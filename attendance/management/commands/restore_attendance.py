@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.backup import RESTORE_BATCH_SIZE, restore_backup
+
+
+class Command(BaseCommand):
+    help = (
+        'Restore a backup written by backup_attendance. Rows are bulk-inserted in batches inside one transaction; '
+        'rows that already exist are skipped, so incremental backups can be applied on top of a full one.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='Backup file (.jsonl.gz)')
+        parser.add_argument('--batch-size', type=int, default=RESTORE_BATCH_SIZE, help='Rows per INSERT')
+
+    def handle(self, *args, **options):
+        try:
+            counts = restore_backup(options['path'], batch_size=options['batch_size'])
+        except FileNotFoundError:
+            raise CommandError(f"{options['path']} not found.")
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for label, n in counts.items():
+            self.stdout.write(f'  {label}: {n}')
+        self.stdout.write(self.style.SUCCESS(f"Restored {sum(counts.values())} rows from {options['path']}"))
@@ -0,0 +1,184 @@
+"""
+Session, compression and HTML minification middleware.
+"""
+import re
+import time
+
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+# Brotli is optional: without it responses are gzip-compressed only.
+BROTLI_AVAILABLE = False
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+
+REFRESHED_AT_KEY = '_session_refreshed_at'
+
+
+class ThrottledSessionMiddleware(SessionMiddleware):
+    """
+    Drop-in replacement for SessionMiddleware with a cheaper rolling expiry.
+
+    With SESSION_SAVE_EVERY_REQUEST every request rewrites the session row just
+    to push the expiry forward. Here the session is saved (and its cookie
+    reissued) only when modified, or when less than SESSION_REFRESH_THRESHOLD
+    seconds of its lifetime remain, so polling endpoints stop writing to
+    `django_session` while active users still never get logged out.
+    """
+
+    def process_response(self, request, response):
+        session = getattr(request, 'session', None)
+        # Only look at sessions the request already loaded; reading one here would add a query.
+        if session is not None and session.accessed and not settings.SESSION_SAVE_EVERY_REQUEST:
+            now = int(time.time())
+            if session.modified:
+                session[REFRESHED_AT_KEY] = now
+            elif not session.is_empty() and response.status_code < 500:
+                refreshed_at = session.get(REFRESHED_AT_KEY, 0)
+                remaining = refreshed_at + settings.SESSION_COOKIE_AGE - now
+                if remaining < getattr(settings, 'SESSION_REFRESH_THRESHOLD', settings.SESSION_COOKIE_AGE):
+                    session[REFRESHED_AT_KEY] = now
+        return super().process_response(request, response)
+
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+_ACCEPTS_BR = re.compile(r'\bbr\b')
+_ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+# Input bytes fed to the brotli compressor between flushes of a streamed
+# response. Flushing every chunk (one CSV row) would defeat compression;
+# this still gets exports moving to the client as they are produced.
+BROTLI_STREAM_FLUSH_BYTES = 32 * 1024
+
+
+def _brotli_stream(chunks, quality, flush_bytes=BROTLI_STREAM_FLUSH_BYTES):
+    compressor = brotli.Compressor(quality=quality, mode=brotli.MODE_TEXT)
+    pending = 0
+    for chunk in chunks:
+        data = compressor.process(chunk)
+        if data:
+            yield data
+        pending += len(chunk)
+        if pending >= flush_bytes:
+            pending = 0
+            data = compressor.flush()
+            if data:
+                yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Brotli or gzip compression for text responses, including streaming ones.
+
+    Brotli is used when the client accepts it and the `Brotli` package is
+    installed, gzip otherwise (via Django's GZipMiddleware, with its BREACH
+    padding). Responses shorter than RESPONSE_COMPRESSION_MIN_SIZE bytes, or
+    with non-text content types (zips, images, QR PNGs), are left alone.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < getattr(settings, 'RESPONSE_COMPRESSION_MIN_SIZE', 512):
+            return response
+
+        ae = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if not (BROTLI_AVAILABLE and _ACCEPTS_BR.search(ae)) or getattr(response, 'is_async', False):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        quality = getattr(settings, 'RESPONSE_BROTLI_QUALITY', 5)
+        if response.streaming:
+            response.streaming_content = _brotli_stream(response.streaming_content, quality)
+            del response.headers['Content-Length']
+        else:
+            compressed = brotli.compress(response.content, quality=quality, mode=brotli.MODE_TEXT)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+
+# Whitespace inside these elements is significant (or is code), so it is kept.
+_PRESERVED = re.compile(r'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.S | re.I)
+# Tags are copied as-is too, so attribute values such as
+# title, value, placeholder or data-* keep their exact whitespace. Quoted
+# values may hold '>' but not '<' (autoescaping turns it into &lt;), which
+# keeps a stray quote from making the scan run to the end of the page.
+_TAG = re.compile(r'(</?[A-Za-z](?:[^<>"\']|"[^"<]*"|\'[^\'<]*\')*>)', re.S)
+_NEWLINE_RUN = re.compile(r'\s*\n\s*')
+_SPACE_RUN = re.compile(r'[ \t]{2,}')
+
+
+def _collapse_text(html):
+    """Collapse whitespace runs in the text between tags of `html`."""
+    pieces = _TAG.split(html)
+    # split() alternates: text, tag, text, ...
+    for index in range(0, len(pieces), 2):
+        pieces[index] = _SPACE_RUN.sub(' ', _NEWLINE_RUN.sub('\n', pieces[index]))
+    return ''.join(pieces)
+
+
+def minify_html(html):
+    """
+    Collapse indentation and blank lines in rendered HTML.
+
+    Browsers render any run of whitespace between inline content as a single
+    space, so runs are reduced to one newline or space rather than removed,
+    which keeps layout identical. Only text between tags is touched: tags
+    themselves, and <pre>, <textarea>, <script> and <style> blocks, are
+    copied through untouched.
+    """
+    parts = _PRESERVED.split(html)
+    out = []
+    # split() yields: text, whole preserved block, tag name, text, ...
+    for index in range(0, len(parts), 3):
+        out.append(_collapse_text(parts[index]))
+        if index + 1 < len(parts):
+            out.append(parts[index + 1])
+    return ''.join(out).strip() + '\n'
+
+
+class HtmlMinifyMiddleware:
+    """Minify whitespace of rendered, non-streaming text/html responses."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.streaming
+            or getattr(response, 'minified', False)
+            or response.has_header('Content-Encoding')
+            or not response.get('Content-Type', '').startswith('text/html')
+            or not getattr(settings, 'HTML_MINIFY', True)
+        ):
+            return response
+        charset = response.charset or 'utf-8'
+        response.content = minify_html(response.content.decode(charset)).encode(charset)
+        if response.has_header('Content-Length'):
+            response.headers['Content-Length'] = str(len(response.content))
+        return response
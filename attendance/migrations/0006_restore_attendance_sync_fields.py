@@ -0,0 +1,28 @@
+# Generated by Django 4.2.27 on 2026-10-19 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_remove_attendance_firebase_doc_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='firebase_doc_id',
+            field=models.CharField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='synced_to_firebase',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='synced_to_portal',
+            field=models.BooleanField(default=False),
+        ),
+    ]
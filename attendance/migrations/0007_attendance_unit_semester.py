@@ -0,0 +1,53 @@
+# Generated by Django 4.2.27 on 2026-10-19 12:46
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def fill_unit_semester(apps, schema_editor):
+    """Copy unit and semester from each record's session in one UPDATE."""
+    Attendance = apps.get_model('attendance', 'Attendance')
+    AttendanceSession = apps.get_model('attendance', 'AttendanceSession')
+    session = AttendanceSession.objects.filter(pk=OuterRef('session_id'))
+    Attendance.objects.filter(unit__isnull=True).update(
+        unit_id=Subquery(session.values('unit_id')[:1]),
+        semester=Subquery(session.values('semester')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0006_restore_attendance_sync_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='semester',
+            field=models.PositiveSmallIntegerField(blank=True, choices=[(1, 'Semester 1'), (2, 'Semester 2')], editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='unit',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_records', to='attendance.unit'),
+        ),
+        migrations.RunPython(fill_unit_semester, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['student', 'unit', 'semester'], name='att_student_unit_sem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['unit', 'semester', 'session'], name='att_unit_sem_session_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['session', 'timestamp'], name='att_session_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(condition=models.Q(('synced_to_firebase', False), ('synced_to_portal', False), _connector='OR'), fields=['synced_to_firebase', 'synced_to_portal'], name='att_unsynced_idx'),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.2.27 on 2026-10-19 13:18
+
+from django.db import migrations, models
+
+STATUS_CHOICES = [(0, 'Pending'), (1, 'Synced'), (2, 'Failed'), (3, 'Skipped')]
+SYNCED = 1
+
+
+def copy_sync_flags(apps, schema_editor):
+    """Synced flags become SYNCED statuses; everything else stays PENDING (one UPDATE per target)."""
+    Attendance = apps.get_model('attendance', 'Attendance')
+    Attendance.objects.filter(synced_to_firebase=True).update(firebase_status=SYNCED)
+    Attendance.objects.filter(synced_to_portal=True).update(portal_status=SYNCED)
+
+
+def copy_sync_statuses(apps, schema_editor):
+    Attendance = apps.get_model('attendance', 'Attendance')
+    Attendance.objects.filter(firebase_status=SYNCED).update(synced_to_firebase=True)
+    Attendance.objects.filter(portal_status=SYNCED).update(synced_to_portal=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0007_attendance_unit_semester'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='firebase_status',
+            field=models.PositiveSmallIntegerField(choices=STATUS_CHOICES, default=0),
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='portal_status',
+            field=models.PositiveSmallIntegerField(choices=STATUS_CHOICES, default=0),
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='sync_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='last_sync_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(copy_sync_flags, copy_sync_statuses),
+        migrations.RemoveIndex(
+            model_name='attendance',
+            name='att_unsynced_idx',
+        ),
+        migrations.RemoveField(
+            model_name='attendance',
+            name='firebase_doc_id',
+        ),
+        migrations.RemoveField(
+            model_name='attendance',
+            name='portal_response',
+        ),
+        migrations.RemoveField(
+            model_name='attendance',
+            name='synced_to_firebase',
+        ),
+        migrations.RemoveField(
+            model_name='attendance',
+            name='synced_to_portal',
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(condition=models.Q(('firebase_status__in', [0, 2]), ('portal_status__in', [0, 2]), _connector='OR'), fields=['firebase_status', 'portal_status'], name='att_sync_pending_idx'),
+        ),
+        migrations.CreateModel(
+            name='SyncAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attendance_id', models.BigIntegerField(db_index=True)),
+                ('target', models.CharField(choices=[('firebase', 'Firebase'), ('portal', 'Portal')], max_length=10)),
+                ('status', models.PositiveSmallIntegerField(choices=STATUS_CHOICES)),
+                ('error', models.CharField(blank=True, max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
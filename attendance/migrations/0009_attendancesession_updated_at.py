@@ -0,0 +1,18 @@
+# Generated by Django 4.2.27 on 2026-10-19 13:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0008_compact_sync_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancesession',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -52,6 +52,7 @@ class AttendanceSession(models.Model):
     class_year = models.CharField(max_length=20, choices=CLASS_YEAR_CHOICES, default="Year 1")
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     qr_code = models.FileField(upload_to='qr_codes/', blank=True, null=True)
     semester = models.PositiveSmallIntegerField(choices=SEMESTER_CHOICES, default=1)
     session_number = models.PositiveSmallIntegerField(blank=True, null=True, validators=[MinValueValidator(1), MaxValueValidator(13)])
@@ -106,7 +107,7 @@ class Student(models.Model):
         if unit:
             attendance = Attendance.objects.filter(
                 student=self, 
-                session__unit=unit
+                unit=unit
             ).count()
             return Decimal(attendance) / Decimal(max_lessons) * 100 if max_lessons > 0 else 0
         else:
@@ -116,25 +117,90 @@ class Student(models.Model):
             return Decimal(attendance) / Decimal(total_sessions) * 100 if total_sessions > 0 else 0
 
 
+class SyncStatus(models.IntegerChoices):
+    """Per-target sync state of an attendance record."""
+    PENDING = 0, 'Pending'
+    SYNCED = 1, 'Synced'
+    FAILED = 2, 'Failed'
+    # The target is not configured (no Firebase client / portal URL).
+    SKIPPED = 3, 'Skipped'
+
+
 class Attendance(models.Model):
     """Attendance record - links student to attendance session."""
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_records')
     session = models.ForeignKey(AttendanceSession, on_delete=models.CASCADE, related_name='attendance_records')
+    # Copied from `session` on save so unit/semester queries skip the session join.
+    unit = models.ForeignKey(Unit, on_delete=models.CASCADE, related_name='attendance_records', null=True, blank=True, editable=False)
+    semester = models.PositiveSmallIntegerField(choices=AttendanceSession.SEMESTER_CHOICES, null=True, blank=True, editable=False)
     timestamp = models.DateTimeField(auto_now_add=True)
-    synced_to_firebase = models.BooleanField(default=False)
-    synced_to_portal = models.BooleanField(default=False)
-    firebase_doc_id = models.CharField(max_length=200, blank=True, null=True)
-    portal_response = models.JSONField(default=dict, blank=True)
+    # Compact sync state; error details of failed attempts go to SyncAttempt.
+    firebase_status = models.PositiveSmallIntegerField(choices=SyncStatus.choices, default=SyncStatus.PENDING)
+    portal_status = models.PositiveSmallIntegerField(choices=SyncStatus.choices, default=SyncStatus.PENDING)
+    sync_attempts = models.PositiveSmallIntegerField(default=0)
+    last_sync_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         unique_together = ('student', 'session')
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['student', 'unit', 'semester'], name='att_student_unit_sem_idx'),
+            models.Index(fields=['unit', 'semester', 'session'], name='att_unit_sem_session_idx'),
+            models.Index(fields=['session', 'timestamp'], name='att_session_ts_idx'),
+            models.Index(
+                fields=['firebase_status', 'portal_status'],
+                name='att_sync_pending_idx',
+                condition=(
+                    models.Q(firebase_status__in=[SyncStatus.PENDING, SyncStatus.FAILED])
+                    | models.Q(portal_status__in=[SyncStatus.PENDING, SyncStatus.FAILED])
+                ),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.student.name} - {self.session.unit.code} ({self.session.date})"
+
+    def save(self, *args, **kwargs):
+        if self.session_id and (self.unit_id is None or self.semester is None):
+            self.unit_id = self.session.unit_id
+            self.semester = self.session.semester
+        super().save(*args, **kwargs)
     
     def get_attendance_percentage(self, max_lessons=12):
         """Get attendance percentage for the student in this session's unit."""
         return self.student.get_attendance_percentage(unit=self.session.unit, max_lessons=max_lessons)
 
+    @property
+    def synced_to_firebase(self):
+        return self.firebase_status == SyncStatus.SYNCED
+
+    @property
+    def synced_to_portal(self):
+        return self.portal_status == SyncStatus.SYNCED
+
+
+class SyncAttempt(models.Model):
+    """
+    Error details of a failed sync, kept out of the attendance table.
+
+    A bounded log: rows older than SYNC_ATTEMPT_RETENTION_DAYS, or beyond the
+    newest SYNC_ATTEMPT_MAX_ROWS, are pruned. `attendance_id` is deliberately
+    not a foreign key, so bulk deletes of attendance never cascade into it.
+    """
+    TARGET_FIREBASE = 'firebase'
+    TARGET_PORTAL = 'portal'
+    TARGET_CHOICES = [(TARGET_FIREBASE, 'Firebase'), (TARGET_PORTAL, 'Portal')]
+
+    attendance_id = models.BigIntegerField(db_index=True)
+    target = models.CharField(max_length=10, choices=TARGET_CHOICES)
+    status = models.PositiveSmallIntegerField(choices=SyncStatus.choices)
+    error = models.CharField(max_length=500, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_target_display()} sync of attendance {self.attendance_id}: {self.get_status_display()}"
+
 
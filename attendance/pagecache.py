@@ -0,0 +1,99 @@
+"""
+In-process cache of rendered public pages.
+
+`home` and the "session closed" page look the same to every anonymous
+visitor, so they are rendered once, kept here as minified bytes and served
+with `Cache-Control: public` so browsers and edge caches can reuse them too.
+Requests carrying a session or messages cookie may see a personalised page
+(navbar, flash messages) and always get a fresh render.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .middleware import minify_html
+
+MAX_CACHED_PAGES = 512
+
+
+class RenderedPageCache:
+    """Thread-safe LRU of rendered page bytes with per-entry expiry."""
+
+    def __init__(self, max_entries=MAX_CACHED_PAGES, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, content = entry
+            if expires <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return content
+
+    def set(self, key, content, ttl):
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, content)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+page_cache = RenderedPageCache()
+
+
+def closed_session_key(session_id):
+    return f'closed-session:{session_id}'
+
+
+def is_public_request(request):
+    """True for GET/HEAD requests without cookies that could personalise the page."""
+    return (
+        request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and 'messages' not in request.COOKIES
+    )
+
+
+def public_response(content, max_age):
+    response = HttpResponse(content)
+    # Already minified when cached; HtmlMinifyMiddleware skips it.
+    response.minified = True
+    patch_cache_control(response, public=True, max_age=max_age)
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def cached_public_page(request, key, max_age):
+    """Serve `key` from the page cache, or None when it is not cached."""
+    content = page_cache.get(key)
+    return public_response(content, max_age) if content is not None else None
+
+
+def render_public_page(request, key, template_name, context, max_age):
+    """Render `template_name` for an anonymous visitor, cache it under `key` and return it."""
+    html = render_to_string(template_name, context, request=request)
+    if getattr(settings, 'HTML_MINIFY', True):
+        html = minify_html(html)
+    content = html.encode('utf-8')
+    page_cache.set(key, content, max_age)
+    return public_response(content, max_age)
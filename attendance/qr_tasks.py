@@ -0,0 +1,80 @@
+"""
+Background QR rendering for attendance sessions.
+
+Rendering the styled QR code and writing it to media storage (GCS in
+production) is slow, so views hand the new session ids to
+`render_session_qrs_async` and return straight away. The codes are rendered
+on a small thread pool, a few sessions at a time.
+
+Rendered PNGs are also kept in the cache for a while, so the QR view can
+serve a session's code before the storage upload has finished, and renders
+it at most once if a lecturer opens the page first.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection
+
+from .models import AttendanceSession
+
+logger = logging.getLogger(__name__)
+
+
+def qr_render_workers():
+    return getattr(settings, 'QR_RENDER_WORKERS', 4)
+
+
+def qr_cache_key(session_id):
+    return f'session_qr_png:{session_id}'
+
+
+def session_qr_png(session, base_url):
+    """PNG bytes of a session's QR code, from the render cache or freshly rendered."""
+    key = qr_cache_key(session.pk)
+    png = cache.get(key)
+    if png is None:
+        from .qr_generator import generate_session_qr
+        png = generate_session_qr(session, base_url).read()
+        cache.set(key, png, getattr(settings, 'QR_RENDER_CACHE_SECONDS', 3600))
+    return png
+
+
+def render_session_qr(session_id, base_url):
+    """Render one session's QR code and save it to `qr_code`."""
+    session = AttendanceSession.objects.get(pk=session_id)
+    png = session_qr_png(session, base_url)
+    session.qr_code.save(f'qr_{session.pk}.png', ContentFile(png), save=False)
+    session.save(update_fields=['qr_code'])
+    return session
+
+
+def _render_in_worker(session_id, base_url):
+    try:
+        return render_session_qr(session_id, base_url)
+    finally:
+        # Pool threads each open their own connection; don't leave them behind.
+        connection.close()
+
+
+def render_session_qrs(session_ids, base_url, workers=None):
+    """Render QR codes for `session_ids` in parallel. Returns how many were saved."""
+    rendered = 0
+    with ThreadPoolExecutor(max_workers=workers or qr_render_workers()) as pool:
+        futures = {pool.submit(_render_in_worker, sid, base_url): sid for sid in session_ids}
+        for future in as_completed(futures):
+            if future.exception() is not None:
+                logger.warning('QR rendering failed for session %s', futures[future], exc_info=future.exception())
+            else:
+                rendered += 1
+    return rendered
+
+
+def render_session_qrs_async(session_ids, base_url):
+    """Start `render_session_qrs` on a background thread and return the thread."""
+    t = threading.Thread(target=render_session_qrs, args=(list(session_ids), base_url), daemon=True)
+    t.start()
+    return t
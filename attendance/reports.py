@@ -0,0 +1,428 @@
+"""
+Set-based attendance reports.
+
+These build their numbers from a handful of grouped queries instead of calling
+`Student.get_attendance_percentage` once per student, which does not scale to
+full units or whole semesters.
+"""
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .archive import archived_counts, iter_archived_records
+from .models import Attendance, AttendanceSession, Student
+
+MAX_SESSIONS = 13
+SESSION_NUMBERS = tuple(range(1, MAX_SESSIONS + 1))
+
+
+class AttendanceMatrix:
+    """
+    Students x session_number (1-13) grid for one unit and semester.
+
+    Each student's row is a 13-bit mask stored in a compact `array('H')`:
+    bit `n - 1` is set when the student attended session number `n`.
+    `held_mask` marks which session numbers exist for the unit/semester.
+    """
+
+    def __init__(self, unit, semester, students, masks, held_mask):
+        self.unit = unit
+        self.semester = semester
+        self.students = students  # list of (id, admission_number, name)
+        self.masks = masks
+        self.held_mask = held_mask
+
+    @property
+    def held_count(self):
+        return self.held_mask.bit_count()
+
+    @property
+    def held_sessions(self):
+        return [n for n in SESSION_NUMBERS if self.held_mask >> (n - 1) & 1]
+
+    def __len__(self):
+        return len(self.students)
+
+    def attended(self, index):
+        return (self.masks[index] & self.held_mask).bit_count()
+
+    def percentage(self, index):
+        held = self.held_count
+        return round(self.attended(index) * 100.0 / held, 1) if held else 0.0
+
+    def session_totals(self):
+        """Number of students present for each session number."""
+        totals = [0] * MAX_SESSIONS
+        for mask in self.masks:
+            while mask:
+                low = mask & -mask
+                totals[low.bit_length() - 1] += 1
+                mask ^= low
+        return totals
+
+    def rows(self):
+        """
+        Yield one dict per student, ready for rendering.
+
+        `cells` holds 'P' (present), 'A' (absent from a held session) or ''
+        (session number not held) for session numbers 1-13.
+        """
+        held = self.held_mask
+        held_count = self.held_count
+        for index, (student_id, admission_number, name) in enumerate(self.students):
+            mask = self.masks[index]
+            attended = (mask & held).bit_count()
+            yield {
+                'student_id': student_id,
+                'admission_number': admission_number,
+                'name': name,
+                'cells': [
+                    'P' if mask >> (n - 1) & 1 else ('A' if held >> (n - 1) & 1 else '')
+                    for n in SESSION_NUMBERS
+                ],
+                'attended': attended,
+                'percentage': round(attended * 100.0 / held_count, 1) if held_count else 0.0,
+            }
+
+
+def build_attendance_matrix(unit, semester):
+    """
+    Build the attendance grid for `unit` and `semester`.
+
+    One grouped pivot query returns, for every enrolled student, a 0/1 column
+    per session number; a second tiny query lists which session numbers were held.
+    """
+    pivot = {
+        f's{n}': Count(
+            'attendance_records',
+            filter=Q(
+                attendance_records__unit=unit,
+                attendance_records__semester=semester,
+                attendance_records__session__session_number=n,
+            ),
+        )
+        for n in SESSION_NUMBERS
+    }
+    columns = [f's{n}' for n in SESSION_NUMBERS]
+    qs = (
+        Student.objects.filter(units=unit)
+        .order_by('name', 'admission_number')
+        .values('id', 'admission_number', 'name')
+        .annotate(**pivot)
+        .values_list('id', 'admission_number', 'name', *columns)
+    )
+
+    students = []
+    masks = array('H')
+    for row in qs:
+        students.append(row[:3])
+        mask = 0
+        for bit, present in enumerate(row[3:]):
+            if present:
+                mask |= 1 << bit
+        masks.append(mask)
+
+    position = None
+    for record in iter_archived_records(unit_id=unit.pk, semester=semester):
+        if position is None:
+            position = {student[0]: i for i, student in enumerate(students)}
+        i = position.get(record['student_id'])
+        if i is not None and record['session_number']:
+            masks[i] |= 1 << (record['session_number'] - 1)
+
+    held_mask = 0
+    held_numbers = AttendanceSession.objects.filter(
+        unit=unit, semester=semester, session_number__isnull=False
+    ).values_list('session_number', flat=True)
+    for n in held_numbers:
+        held_mask |= 1 << (n - 1)
+
+    return AttendanceMatrix(unit, semester, students, masks, held_mask)
+
+
+# --- Exam eligibility ---------------------------------------------------------
+
+ATTENDANCE_VERSION_KEY = 'attendance_data_version'
+ELIGIBILITY_CACHE_TIMEOUT = 60 * 60
+SEMESTERS = tuple(value for value, _ in AttendanceSession.SEMESTER_CHOICES)
+
+# Report caches are keyed by a global data version plus one version per
+# (unit, semester). A check-in bumps only its own unit and semester, so the
+# cached figures of every other unit stay valid during class hours; bulk
+# writes whose scope is not known bump the global version.
+
+
+def _version_key(unit_id=None, semester=None):
+    if unit_id is None:
+        return ATTENDANCE_VERSION_KEY
+    return f'{ATTENDANCE_VERSION_KEY}:{unit_id}:{semester}'
+
+
+def attendance_data_version(unit_id=None, semester=None):
+    """Current attendance data version, globally or for one unit and semester."""
+    key = _version_key(unit_id, semester)
+    version = cache.get(key)
+    if version is None:
+        version = 1
+        cache.add(key, version, None)
+    return version
+
+
+def _unit_versions(unit_ids, semesters):
+    """{unit_id: (version per semester, ...)} with one cache round trip."""
+    keys = {(u, s): _version_key(u, s) for u in unit_ids for s in semesters}
+    found = cache.get_many(keys.values())
+    for key in keys.values():
+        if key not in found:
+            cache.add(key, 1, None)
+    return {u: tuple(found.get(keys[u, s], 1) for s in semesters) for u in unit_ids}
+
+
+def bump_attendance_data_version(unit_id=None, semester=None):
+    """
+    Invalidate cached reports. Call after any write to Attendance, sessions or enrollments.
+
+    With `unit_id`, only that unit's reports are invalidated (for `semester`,
+    or both semesters); without it, every cached report is.
+    """
+    if unit_id is None:
+        keys = [ATTENDANCE_VERSION_KEY]
+    else:
+        keys = [_version_key(unit_id, s) for s in ((semester,) if semester else SEMESTERS)]
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
+
+
+def default_threshold():
+    return getattr(settings, 'ATTENDANCE_ELIGIBILITY_THRESHOLD', 75)
+
+
+class EligibilityReport:
+    """
+    Attended/held ratios for every (student, unit, semester) an enrolled
+    student could have attended.
+
+    Entries are stored column-wise in parallel arrays; `eligible` is a
+    bytearray of 0/1 flags computed in one pass over the count columns.
+    """
+
+    def __init__(self, semester, threshold, students, units, student_idx, unit_idx,
+                 semesters, attended, held):
+        self.semester = semester
+        self.threshold = threshold
+        self.students = students  # list of (id, admission_number, name)
+        self.units = units  # list of (id, code, name, lecturer_id)
+        self.student_idx = student_idx
+        self.unit_idx = unit_idx
+        self.semesters = semesters
+        self.attended = attended
+        self.held = held
+        # attended / held >= threshold%, in integer arithmetic
+        self.eligible = bytearray(
+            a * 100 >= threshold * h for a, h in zip(attended, held)
+        )
+
+    def __len__(self):
+        return len(self.attended)
+
+    @property
+    def at_risk_count(self):
+        return len(self.eligible) - sum(self.eligible)
+
+    def rows(self, at_risk_only=False, lecturer_id=None):
+        """Yield one dict per entry, optionally only those below the threshold."""
+        for i, ok in enumerate(self.eligible):
+            if at_risk_only and ok:
+                continue
+            unit_id, code, unit_name, unit_lecturer = self.units[self.unit_idx[i]]
+            if lecturer_id is not None and unit_lecturer != lecturer_id:
+                continue
+            student_id, admission_number, name = self.students[self.student_idx[i]]
+            attended, held = self.attended[i], self.held[i]
+            yield {
+                'student_id': student_id,
+                'admission_number': admission_number,
+                'name': name,
+                'unit_id': unit_id,
+                'unit_code': code,
+                'unit_name': unit_name,
+                'semester': self.semesters[i],
+                'attended': attended,
+                'held': held,
+                'percentage': round(attended * 100.0 / held, 1),
+                'eligible': bool(ok),
+            }
+
+
+ELIGIBILITY_HEADER = (
+    'Admission Number',
+    'Student Name',
+    'Unit Code',
+    'Unit Name',
+    'Semester',
+    'Attended',
+    'Held',
+    'Percentage',
+    'Eligible',
+)
+
+
+def eligibility_csv_row(row):
+    return (
+        row['admission_number'], row['name'], row['unit_code'], row['unit_name'], row['semester'],
+        row['attended'], row['held'], row['percentage'], 'yes' if row['eligible'] else 'no',
+    )
+
+
+def build_eligibility_report(semester=None, threshold=None, unit_ids=None):
+    """
+    Compute attendance ratios for all students, units and semesters.
+
+    Uses four set-based queries: sessions held per (unit, semester), attendance
+    per (student, unit, semester), enrollments, and student names. Counts from
+    archived semesters are added from the archive files. `unit_ids` limits the
+    report to those units.
+    """
+    threshold = default_threshold() if threshold is None else threshold
+
+    sessions = AttendanceSession.objects.all()
+    attendance = Attendance.objects.all()
+    if semester is not None:
+        sessions = sessions.filter(semester=semester)
+        attendance = attendance.filter(semester=semester)
+    if unit_ids is not None:
+        unit_ids = set(unit_ids)
+        sessions = sessions.filter(unit_id__in=unit_ids)
+        attendance = attendance.filter(unit_id__in=unit_ids)
+
+    units = []
+    unit_pos = {}
+    held_by_unit = {}  # unit_id -> [(semester, held), ...]
+    held_rows = sessions.order_by().values_list(
+        'unit_id', 'unit__code', 'unit__name', 'unit__lecturer_id', 'semester'
+    ).annotate(held=Count('id'))
+    for unit_id, code, name, lecturer_id, sem, held in held_rows:
+        if unit_id not in unit_pos:
+            unit_pos[unit_id] = len(units)
+            units.append((unit_id, code, name, lecturer_id))
+        held_by_unit.setdefault(unit_id, []).append((sem, held))
+
+    attended_counts = {
+        (student_id, unit_id, sem): count
+        for student_id, unit_id, sem, count in attendance.order_by().values_list(
+            'student_id', 'unit_id', 'semester'
+        ).annotate(count=Count('*')).iterator()
+    }
+
+    for key, count in archived_counts(semester=semester, unit_ids=unit_ids).items():
+        attended_counts[key] = attended_counts.get(key, 0) + count
+
+    keys = set(attended_counts)
+    enrollments = Student.units.through.objects.filter(unit_id__in=held_by_unit).values_list('student_id', 'unit_id')
+    for student_id, unit_id in enrollments.iterator():
+        for sem, _ in held_by_unit[unit_id]:
+            keys.add((student_id, unit_id, sem))
+
+    student_ids = {k[0] for k in keys}
+    students = []
+    student_pos = {}
+    for row in Student.objects.filter(id__in=student_ids).order_by('name', 'admission_number').values_list(
+        'id', 'admission_number', 'name'
+    ).iterator():
+        student_pos[row[0]] = len(students)
+        students.append(row)
+
+    held_lookup = {(u, s): h for u, pairs in held_by_unit.items() for s, h in pairs}
+    student_idx, unit_idx = array('I'), array('I')
+    semesters, attended, held = array('B'), array('I'), array('I')
+    for key in sorted(keys, key=lambda k: (unit_pos.get(k[1], 0), k[2], student_pos.get(k[0], 0))):
+        student_id, unit_id, sem = key
+        h = held_lookup.get((unit_id, sem))
+        if not h or student_id not in student_pos:
+            continue
+        student_idx.append(student_pos[student_id])
+        unit_idx.append(unit_pos[unit_id])
+        semesters.append(sem)
+        attended.append(min(attended_counts.get(key, 0), h))
+        held.append(h)
+
+    return EligibilityReport(semester, threshold, students, units, student_idx, unit_idx,
+                             semesters, attended, held)
+
+
+def _split_by_unit(report, unit_ids):
+    """{unit_id: EligibilityReport} holding each unit's entries of `report`."""
+    entries = {unit_id: [] for unit_id in unit_ids}
+    for i, u in enumerate(report.unit_idx):
+        entries[report.units[u][0]].append(i)
+    parts = {}
+    for unit_id, indexes in entries.items():
+        students, student_pos = [], {}
+        student_idx, semesters, attended, held = array('I'), array('B'), array('I'), array('I')
+        for i in indexes:
+            s = report.student_idx[i]
+            if s not in student_pos:
+                student_pos[s] = len(students)
+                students.append(report.students[s])
+            student_idx.append(student_pos[s])
+            semesters.append(report.semesters[i])
+            attended.append(report.attended[i])
+            held.append(report.held[i])
+        units = [report.units[report.unit_idx[indexes[0]]]] if indexes else []
+        parts[unit_id] = EligibilityReport(report.semester, report.threshold, students, units,
+                                           student_idx, array('I', [0] * len(indexes)),
+                                           semesters, attended, held)
+    return parts
+
+
+def _combine(parts, semester, threshold):
+    """One EligibilityReport from per-unit parts, in the order given."""
+    students = sorted({s for part in parts for s in part.students}, key=lambda s: (s[2], s[1]))
+    student_pos = {s[0]: i for i, s in enumerate(students)}
+    units = []
+    student_idx, unit_idx = array('I'), array('I')
+    semesters, attended, held = array('B'), array('I'), array('I')
+    for part in parts:
+        if not len(part):
+            continue
+        unit_idx.extend([len(units)] * len(part))
+        units.extend(part.units)
+        student_idx.extend(student_pos[part.students[s][0]] for s in part.student_idx)
+        semesters.extend(part.semesters)
+        attended.extend(part.attended)
+        held.extend(part.held)
+    return EligibilityReport(semester, threshold, students, units, student_idx, unit_idx,
+                             semesters, attended, held)
+
+
+def get_eligibility_report(semester=None, threshold=None):
+    """
+    Cached `build_eligibility_report`, stored per unit.
+
+    Each unit's part is cached under its own data versions, so new
+    attendance only recomputes the units it touched.
+    """
+    threshold = default_threshold() if threshold is None else threshold
+    sessions = AttendanceSession.objects.all()
+    if semester is not None:
+        sessions = sessions.filter(semester=semester)
+    unit_ids = list(dict.fromkeys(sessions.order_by('unit__code').values_list('unit_id', flat=True).distinct()))
+
+    prefix = f'eligibility_report:{attendance_data_version()}:{semester or "all"}:{threshold}'
+    versions = _unit_versions(unit_ids, (semester,) if semester else SEMESTERS)
+    keys = {u: f'{prefix}:{u}:{"-".join(map(str, versions[u]))}' for u in unit_ids}
+    found = cache.get_many(keys.values())
+    parts = {u: found[keys[u]] for u in unit_ids if keys[u] in found}
+
+    missing = [u for u in unit_ids if u not in parts]
+    if missing:
+        built = _split_by_unit(build_eligibility_report(semester=semester, threshold=threshold, unit_ids=missing),
+                               missing)
+        cache.set_many({keys[u]: part for u, part in built.items()}, ELIGIBILITY_CACHE_TIMEOUT)
+        parts.update(built)
+    return _combine([parts[u] for u in unit_ids], semester, threshold)
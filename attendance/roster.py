@@ -0,0 +1,154 @@
+"""
+Bulk roster import: upsert students, enroll them and push them to the portal.
+
+A roster is a CSV with an `admission_number` column and optional `name`,
+`email`, `phone` and `unit_code` columns. Rows are processed in batches:
+students are upserted with one `bulk_create(update_conflicts=True)`,
+enrollments are inserted directly into the M2M through table with
+`ignore_conflicts`, and the batch is pushed to the lecturer portal with
+`PortalSyncService.sync_student_bulk`. Students who then scan a QR code hit
+an existing row instead of creating one mid-lecture.
+"""
+import csv
+import io
+from dataclasses import dataclass, field
+
+from .models import Student, Unit
+from .reports import bump_attendance_data_version
+
+ROSTER_BATCH_SIZE = 1000
+PORTAL_CHUNK_SIZE = 500
+ROSTER_COLUMNS = ('admission_number', 'name', 'email', 'phone', 'unit_code')
+
+Enrollment = Student.units.through
+
+
+class RosterError(ValueError):
+    """Raised when a roster file cannot be read at all."""
+
+
+@dataclass
+class RosterResult:
+    students: int = 0
+    enrollments: int = 0
+    portal_synced: int = 0
+    admission_numbers: list = field(default_factory=list)
+    # (line number, message) for rows that were skipped or only partly imported
+    errors: list = field(default_factory=list)
+
+
+def read_roster(fh):
+    """
+    Yield (line number, row dict) from a CSV roster file object (text or bytes).
+
+    Admission numbers and names are normalised the same way the attend form does.
+    """
+    if isinstance(fh.read(0), bytes):
+        fh = io.TextIOWrapper(fh, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(fh)
+    headers = [(h or '').strip().lower() for h in (reader.fieldnames or [])]
+    if 'admission_number' not in headers:
+        raise RosterError('Roster must have an admission_number column.')
+    reader.fieldnames = headers
+    present = [c for c in ROSTER_COLUMNS if c in headers]
+    for row in reader:
+        record = {c: (row.get(c) or '').strip() for c in present}
+        record['admission_number'] = record['admission_number'].upper()
+        if 'name' in record:
+            record['name'] = ' '.join(record['name'].split())
+        yield reader.line_num, record
+
+
+def _portal():
+    from .sync_service import PortalSyncService
+    return PortalSyncService()
+
+
+def _import_batch(batch, unit, unit_cache, result, portal):
+    students = {}
+    for line, record in batch:
+        students[record['admission_number']] = (line, record)
+
+    # The roster is authoritative for the columns it has; other columns are left alone.
+    columns = [c for c in ('name', 'email', 'phone') if c in batch[0][1]]
+    objs = [
+        Student(admission_number=number, **{c: record[c] for c in columns})
+        for number, (_, record) in students.items()
+    ]
+    Student.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        unique_fields=['admission_number'],
+        update_fields=columns + ['updated_at'],
+    )
+    result.students += len(objs)
+    result.admission_numbers.extend(students)
+
+    # bulk_create does not return ids for upserts on every backend; read them back.
+    ids = dict(Student.objects.filter(admission_number__in=students).order_by().values_list('admission_number', 'id'))
+
+    wanted_codes = {r['unit_code'] for _, r in students.values() if r.get('unit_code')} - set(unit_cache)
+    if wanted_codes:
+        unit_cache.update(Unit.objects.filter(code__in=wanted_codes).values_list('code', 'id'))
+
+    links = []
+    for number, (line, record) in students.items():
+        unit_id = unit.id if unit is not None else None
+        if unit_id is None and record.get('unit_code'):
+            unit_id = unit_cache.get(record['unit_code'])
+            if unit_id is None:
+                result.errors.append((line, f"Unknown unit {record['unit_code']}; student imported without enrollment."))
+                continue
+        if unit_id is not None:
+            links.append(Enrollment(student_id=ids[number], unit_id=unit_id))
+    Enrollment.objects.bulk_create(links, ignore_conflicts=True)
+    result.enrollments += len(links)
+
+    if portal is not None:
+        _push_chunks(portal, objs, result)
+
+
+def _push_chunks(portal, students, result):
+    if not portal.enabled:
+        return
+    for start in range(0, len(students), PORTAL_CHUNK_SIZE):
+        response = portal.sync_student_bulk(students[start:start + PORTAL_CHUNK_SIZE])
+        result.portal_synced += response.get('synced_count', 0)
+        if not response.get('success') and not response.get('skipped'):
+            result.errors.append((None, f"Portal sync failed: {response.get('error', 'unknown error')}"))
+
+
+def push_roster_to_portal(admission_numbers, chunk_size=PORTAL_CHUNK_SIZE):
+    """Push already-imported students to the portal in chunks; for running after the request returns."""
+    result = RosterResult()
+    portal = _portal()
+    for start in range(0, len(admission_numbers), chunk_size):
+        students = list(Student.objects.filter(admission_number__in=admission_numbers[start:start + chunk_size]))
+        _push_chunks(portal, students, result)
+    return result
+
+
+def import_roster(rows, unit=None, batch_size=ROSTER_BATCH_SIZE, push_to_portal=True):
+    """
+    Import (line number, record) pairs from `read_roster`.
+
+    With `unit`, every student is enrolled in it and any `unit_code` column is
+    ignored; otherwise each row's `unit_code` (if any) decides the enrollment.
+    """
+    result = RosterResult()
+    portal = _portal() if push_to_portal else None
+    unit_cache = {}
+    batch = []
+    for line, record in rows:
+        if not record['admission_number']:
+            result.errors.append((line, 'Missing admission number; row skipped.'))
+            continue
+        batch.append((line, record))
+        if len(batch) >= batch_size:
+            _import_batch(batch, unit, unit_cache, result, portal)
+            batch = []
+    if batch:
+        _import_batch(batch, unit, unit_cache, result, portal)
+    if result.enrollments:
+        bump_attendance_data_version()
+    return result
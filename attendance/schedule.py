@@ -0,0 +1,191 @@
+"""
+Semester schedule builder: create a unit's sessions from a weekly pattern.
+
+A lecturer picks the weekdays, a date range and one time slot; every matching
+date becomes a session. Existing sessions for the unit and semester are read
+once, session numbers are handed out in a single pass (filling gaps first,
+up to MAX_SESSIONS_PER_SEMESTER) and the new rows are written with one
+`bulk_create` inside a transaction. QR codes are rendered afterwards, off the
+request thread (see `qr_tasks`).
+
+Numbers are allocated optimistically: the `unique_unit_semester_session`
+constraint is the arbiter, and a create that loses a race with another one
+waits a short, jittered moment, re-reads the free numbers and tries again
+(`save_numbered_session`, `build_schedule`) instead of failing the request.
+Every lost race means a competitor committed one of the semester's numbers,
+so the retries end once the create succeeds or the semester is full.
+"""
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .models import AttendanceSession
+from .reports import bump_attendance_data_version
+
+logger = logging.getLogger(__name__)
+
+MAX_SESSIONS_PER_SEMESTER = 13
+# Upper bound, in seconds, of the jittered wait before retrying a lost race.
+RETRY_BACKOFF_SECONDS = 0.02
+RETRY_BACKOFF_MAX_SECONDS = 0.5
+
+WEEKDAY_CHOICES = [
+    (0, 'Mon'), (1, 'Tue'), (2, 'Wed'), (3, 'Thu'), (4, 'Fri'), (5, 'Sat'), (6, 'Sun'),
+]
+
+
+class DuplicateSessionError(ValueError):
+    """The unit already has a session in that semester at the same date and start time."""
+
+
+class SemesterFullError(ValueError):
+    """Every session number for the unit and semester is taken."""
+
+
+@dataclass
+class ScheduleResult:
+    sessions: list = field(default_factory=list)
+    # Dates skipped because the unit already has a session at that date and time.
+    existing: list = field(default_factory=list)
+    # Dates left out because every session number for the semester is taken.
+    overflow: list = field(default_factory=list)
+
+
+def schedule_dates(start_date, end_date, weekdays):
+    """Yield every date from `start_date` to `end_date` (inclusive) falling on one of `weekdays` (0=Monday)."""
+    weekdays = {int(d) for d in weekdays}
+    day = start_date
+    while day <= end_date:
+        if day.weekday() in weekdays:
+            yield day
+        day += timedelta(days=1)
+
+
+def plan_schedule(unit, lecturer, semester, dates, start_time, end_time, **fields):
+    """
+    Build unsaved sessions for `dates`, numbered around the unit's existing sessions.
+
+    `fields` are passed to every session (venue, lecturer_name, class_year, ...).
+    """
+    result = ScheduleResult()
+    used_numbers = set()
+    taken_dates = set()
+    rows = AttendanceSession.objects.filter(unit=unit, semester=semester).values_list(
+        'session_number', 'date', 'start_time'
+    )
+    for number, day, start in rows:
+        if number:
+            used_numbers.add(number)
+        if start == start_time:
+            taken_dates.add(day)
+
+    free_numbers = (n for n in range(1, MAX_SESSIONS_PER_SEMESTER + 1) if n not in used_numbers)
+    for day in dates:
+        if day in taken_dates:
+            result.existing.append(day)
+            continue
+        number = next(free_numbers, None)
+        if number is None:
+            result.overflow.append(day)
+            continue
+        result.sessions.append(AttendanceSession(
+            unit=unit, lecturer=lecturer, semester=semester, session_number=number,
+            date=day, start_time=start_time, end_time=end_time, **fields,
+        ))
+    return result
+
+
+def next_session_number(unit_id, semester):
+    """Lowest free session number for the unit and semester, or None when all are taken."""
+    used = set(
+        AttendanceSession.objects.filter(unit_id=unit_id, semester=semester)
+        .exclude(session_number__isnull=True).values_list('session_number', flat=True)
+    )
+    return next((n for n in range(1, MAX_SESSIONS_PER_SEMESTER + 1) if n not in used), None)
+
+
+def _same_slot_exists(session):
+    return AttendanceSession.objects.filter(
+        unit_id=session.unit_id, semester=session.semester, date=session.date, start_time=session.start_time,
+    ).exists()
+
+
+def _lost_race(sessions):
+    """Whether another create now holds one of the numbers or slots `sessions` tried to take."""
+    if not sessions:
+        return False
+    first = sessions[0]
+    return AttendanceSession.objects.filter(unit_id=first.unit_id, semester=first.semester).filter(
+        Q(session_number__in=[s.session_number for s in sessions])
+        | Q(date__in=[s.date for s in sessions], start_time=first.start_time)
+    ).exists()
+
+
+def _backoff(attempt):
+    """Sleep a random moment that grows with `attempt`, so racing creates spread out."""
+    time.sleep(random.uniform(0, min(RETRY_BACKOFF_MAX_SECONDS, RETRY_BACKOFF_SECONDS * 2 ** attempt)))
+
+
+def save_numbered_session(session):
+    """
+    Give an unsaved session the next free number and insert it.
+
+    If a concurrent create takes the same number first, the insert hits the
+    unique constraint and the number is re-read and retried after a short
+    backoff. Raises `DuplicateSessionError` or `SemesterFullError` when the
+    session cannot be created at all.
+    """
+    attempt = 0
+    while True:
+        if _same_slot_exists(session):
+            raise DuplicateSessionError('A session for this unit and semester at the same date/time already exists.')
+        number = next_session_number(session.unit_id, session.semester)
+        if number is None:
+            raise SemesterFullError(
+                f'This unit already has {MAX_SESSIONS_PER_SEMESTER} sessions for Semester {session.semester}.'
+            )
+        session.session_number = number
+        try:
+            with transaction.atomic():
+                session.save(force_insert=True)
+            return session
+        except IntegrityError:
+            # Anything but a lost race (a bad foreign key, ...) would fail again.
+            if not _lost_race([session]):
+                raise
+            attempt += 1
+            logger.info('Session number %s for unit %s was taken concurrently (attempt %d)',
+                        number, session.unit_id, attempt)
+            _backoff(attempt)
+
+
+def build_schedule(unit, lecturer, semester, dates, start_time, end_time, **fields):
+    """
+    Plan and save a schedule in one transaction. Returns the `ScheduleResult`.
+
+    A concurrent create that takes one of the planned numbers or slots rolls
+    the whole batch back; it is then re-planned around the new session, which
+    eventually leaves nothing to insert (dates become `existing`/`overflow`).
+    """
+    dates = list(dates)
+    attempt = 0
+    while True:
+        try:
+            with transaction.atomic():
+                result = plan_schedule(unit, lecturer, semester, dates, start_time, end_time, **fields)
+                AttendanceSession.objects.bulk_create(result.sessions)
+            if result.sessions:
+                # bulk_create sends no post_save, so held-session counts are refreshed here.
+                bump_attendance_data_version(unit.pk, semester)
+            return result
+        except IntegrityError:
+            if not _lost_race(result.sessions):
+                raise
+            attempt += 1
+            logger.info('Schedule for unit %s collided with a concurrent create (attempt %d)', unit.pk, attempt)
+            _backoff(attempt)
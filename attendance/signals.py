@@ -1,8 +1,11 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 import threading
 
-from .models import Attendance
+from .models import Attendance, AttendanceSession, Student, Unit
+from .pagecache import closed_session_key, page_cache
+from .reports import bump_attendance_data_version
+from .sync_payload import forget_session_snapshots
 
 
 @receiver(post_save, sender=Attendance)
@@ -28,3 +31,58 @@ def attendance_post_save(sender, instance, created, **kwargs):
 
     t = threading.Thread(target=_sync, args=(instance.id,), daemon=True)
     t.start()
+
+
+@receiver(post_save, sender=Attendance)
+def attendance_changed(sender, instance, created, **kwargs):
+    """Invalidate cached reports of the record's unit and semester when a record is added."""
+    if created:
+        bump_attendance_data_version(instance.unit_id, instance.semester)
+
+
+# No delete receiver on Attendance itself: that would force Django to load and
+# signal every row on bulk deletes. Cascades from sessions and students are
+# covered here; direct bulk deletes bump the version explicitly.
+@receiver(post_delete, sender=AttendanceSession)
+def session_deleted(sender, instance, **kwargs):
+    bump_attendance_data_version(instance.unit_id, instance.semester)
+
+
+@receiver(post_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    bump_attendance_data_version()
+
+
+@receiver(post_save, sender=AttendanceSession)
+def session_changed(sender, instance, created, **kwargs):
+    """Keep the unit/semester copied onto Attendance in step with an edited session."""
+    if created:
+        # One more session held for the unit and semester.
+        bump_attendance_data_version(instance.unit_id, instance.semester)
+        return
+    update_fields = kwargs.get('update_fields')
+    if update_fields and not {'unit', 'semester'} & set(update_fields):
+        return
+    stale = Attendance.objects.filter(session=instance).exclude(unit_id=instance.unit_id, semester=instance.semester)
+    if stale.update(unit_id=instance.unit_id, semester=instance.semester):
+        bump_attendance_data_version()
+
+
+@receiver(post_save, sender=AttendanceSession)
+@receiver(post_delete, sender=AttendanceSession)
+def session_page_changed(sender, instance, **kwargs):
+    """Drop the cached "session closed" page so a reopened or edited session shows at once."""
+    page_cache.delete(closed_session_key(instance.pk))
+
+
+@receiver(post_save, sender=AttendanceSession)
+@receiver(post_delete, sender=AttendanceSession)
+def session_snapshot_changed(sender, instance, **kwargs):
+    """Drop the cached sync payload snapshot of an edited or deleted session."""
+    forget_session_snapshots(instance.pk)
+
+
+@receiver(post_save, sender=Unit)
+def unit_snapshot_changed(sender, instance, created, **kwargs):
+    if not created:
+        forget_session_snapshots(*instance.sessions.values_list('pk', flat=True))
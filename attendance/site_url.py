@@ -0,0 +1,75 @@
+"""
+The externally reachable base URL that QR codes and attend links point at.
+
+Resolved once per process (warmed in `AttendanceConfig.ready`) and cached;
+the cache is dropped when SITE_BASE_URL or DEBUG change:
+
+1. SITE_BASE_URL, unless it names a loopback host (the settings default);
+2. in DEBUG with a loopback SITE_BASE_URL, the same URL on this machine's LAN
+   address, so phones on the same network can scan codes during development;
+3. otherwise nothing is configured and `public_base_url` falls back to the
+   current request's host, or to SITE_BASE_URL as is outside a request.
+
+The LAN address comes from a connected UDP socket, which sends no packets;
+no external process is ever started.
+"""
+import functools
+import socket
+from urllib.parse import urlsplit, urlunsplit
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+LOOPBACK_HOSTS = {'127.0.0.1', 'localhost', '0.0.0.0', '::1'}
+DEFAULT_BASE_URL = 'http://127.0.0.1:8000'
+
+
+def _lan_ip():
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect(('1.1.1.1', 80))
+        ip = s.getsockname()[0]
+    except OSError:
+        return None
+    finally:
+        s.close()
+    return None if ip.startswith('127.') else ip
+
+
+def _site_base_url():
+    return (getattr(settings, 'SITE_BASE_URL', '') or '').strip().rstrip('/')
+
+
+@functools.lru_cache(maxsize=1)
+def configured_base_url():
+    """The resolved base URL, or '' when only a loopback address is configured outside DEBUG."""
+    base = _site_base_url()
+    if not base:
+        return ''
+    parts = urlsplit(base)
+    if parts.hostname not in LOOPBACK_HOSTS:
+        return base
+    if not settings.DEBUG:
+        return ''
+    ip = _lan_ip()
+    if ip is None:
+        return base
+    netloc = f'{ip}:{parts.port}' if parts.port else ip
+    return urlunsplit(parts._replace(netloc=netloc)).rstrip('/')
+
+
+def public_base_url(request=None):
+    """Base URL (no trailing slash) for links that leave this server, such as QR codes."""
+    base = configured_base_url()
+    if base:
+        return base
+    if request is not None:
+        return request.build_absolute_uri('/')[:-1]
+    return _site_base_url() or DEFAULT_BASE_URL
+
+
+@receiver(setting_changed)
+def _reset_base_url(setting, **kwargs):
+    if setting in ('SITE_BASE_URL', 'DEBUG'):
+        configured_base_url.cache_clear()
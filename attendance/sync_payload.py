@@ -0,0 +1,58 @@
+"""
+Per-session sync payload snapshots.
+
+Every attendance record synced to Firebase and the lecturer portal carries
+the same session fields: unit, lecturer, date, time slot and venue. Those
+are read once per session with a single query, cached, and handed out as a
+read-only mapping. Per-record sync only adds the student's own fields.
+
+Snapshots are dropped when the session, or its unit, is saved or deleted;
+anything else (a lecturer renaming themselves) is picked up when the entry
+expires after SYNC_SNAPSHOT_SECONDS.
+"""
+from types import MappingProxyType
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import AttendanceSession
+
+SNAPSHOT_FIELDS = (
+    'unit__code', 'unit__name', 'lecturer__staff_id', 'lecturer__user__first_name',
+    'lecturer__user__last_name', 'date', 'start_time', 'end_time', 'venue',
+)
+
+
+def snapshot_cache_key(session_id):
+    return f'sync_snapshot:{session_id}'
+
+
+def _build_snapshot(session_id):
+    row = AttendanceSession.objects.filter(pk=session_id).values(*SNAPSHOT_FIELDS).first()
+    if row is None:
+        raise AttendanceSession.DoesNotExist(f'Session {session_id} does not exist.')
+    return {
+        'session_id': str(session_id),
+        'unit_code': row['unit__code'],
+        'unit_name': row['unit__name'],
+        # Same as User.get_full_name().
+        'lecturer_name': f"{row['lecturer__user__first_name']} {row['lecturer__user__last_name']}".strip(),
+        'lecturer_id': row['lecturer__staff_id'],
+        'date': str(row['date']),
+        'time_slot': f"{row['start_time']} - {row['end_time']}",
+        'venue': row['venue'],
+    }
+
+
+def session_snapshot(session_id):
+    """Read-only mapping of a session's sync fields, from the cache when possible."""
+    key = snapshot_cache_key(session_id)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = _build_snapshot(session_id)
+        cache.set(key, snapshot, getattr(settings, 'SYNC_SNAPSHOT_SECONDS', 3600))
+    return MappingProxyType(snapshot)
+
+
+def forget_session_snapshots(*session_ids):
+    cache.delete_many([snapshot_cache_key(pk) for pk in session_ids])
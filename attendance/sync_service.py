@@ -7,10 +7,12 @@ import requests
 import logging
 from typing import Optional, Dict, Any
 from datetime import datetime
-from decimal import Decimal
 
 logger = logging.getLogger(__name__)
 
+# Session fields the portal expects in each attendance record, taken from the session snapshot.
+PORTAL_SESSION_FIELDS = ('unit_code', 'unit_name', 'date', 'time_slot', 'venue', 'lecturer_name')
+
 
 class PortalSyncService:
     """Handles synchronization with Lecturer Portal API."""
@@ -21,7 +23,8 @@ class PortalSyncService:
         self.timeout = int(os.getenv('PORTAL_SYNC_TIMEOUT', '10'))
         self.enabled = bool(self.portal_url)
     
-    def sync_attendance(self, attendance_record: 'Attendance', student: 'Student', session: 'AttendanceSession') -> Dict[str, Any]:
+    def sync_attendance(self, attendance_record: 'Attendance', student: 'Student', session: 'AttendanceSession',
+                        snapshot=None, attendance_percentage=None) -> Dict[str, Any]:
         """
         Sync a single attendance record to the lecturer portal.
         
@@ -29,6 +32,8 @@ class PortalSyncService:
             attendance_record: Attendance model instance
             student: Student model instance
             session: AttendanceSession model instance
+            snapshot: the session's sync snapshot, if the caller already has it
+            attendance_percentage: the student's percentage, if already computed
         
         Returns:
             {
@@ -48,8 +53,12 @@ class PortalSyncService:
             }
         
         try:
-            attendance_percentage = Decimal(attendance_record.get_attendance_percentage()) if attendance_record else Decimal(0)
-            
+            from .sync_payload import session_snapshot
+            if snapshot is None:
+                snapshot = session_snapshot(session.pk)
+            if attendance_percentage is None:
+                attendance_percentage = student.get_attendance_percentage(unit=session.unit_id) if attendance_record else 0
+
             payload = {
                 'action': 'record_attendance',
                 'student': {
@@ -59,12 +68,7 @@ class PortalSyncService:
                     'phone': student.phone,
                 },
                 'attendance': {
-                    'unit_code': session.unit.code,
-                    'unit_name': session.unit.name,
-                    'date': str(session.date),
-                    'time_slot': f"{session.start_time} - {session.end_time}",
-                    'venue': session.venue,
-                    'lecturer_name': session.lecturer.user.get_full_name(),
+                    **{field: snapshot[field] for field in PORTAL_SESSION_FIELDS},
                     'timestamp': datetime.now().isoformat(),
                     'attendance_percentage': float(attendance_percentage),
                 },
@@ -195,6 +199,8 @@ class DualSyncService:
             }
         """
         from .models import Attendance
+        from .sync_payload import session_snapshot
+        from .sync_status import record_sync_result
         
         try:
             # Create or get attendance record
@@ -203,43 +209,26 @@ class DualSyncService:
                 session=session,
             )
             
-            attendance_percentage = attendance.get_attendance_percentage()
+            # Session fields come from the cached per-session snapshot, so only
+            # the student's own fields are looked up per record.
+            snapshot = session_snapshot(session.pk)
+            attendance_percentage = student.get_attendance_percentage(unit=session.unit_id)
             
             # Build attendance payload
             attendance_data = {
+                **snapshot,
                 'student_name': student.name,
                 'admission_number': student.admission_number,
-                'unit_code': session.unit.code,
-                'unit_name': session.unit.name,
-                'lecturer_name': session.lecturer.user.get_full_name(),
-                'lecturer_id': getattr(session.lecturer, 'staff_id', None),
-                'date': str(session.date),
-                'time_slot': f"{session.start_time} - {session.end_time}",
-                'venue': session.venue,
                 'attendance_percentage': float(attendance_percentage),
             }
             
-            # Sync to Firebase
+            # Sync to Firebase and the portal, then record both outcomes in one UPDATE
+            # (error details go to the bounded SyncAttempt log, not the attendance row).
             firebase_result = self.firebase.save_attendance(str(session.id), attendance_data)
-            if firebase_result.get('success') and firebase_result.get('document_id'):
-                attendance.synced_to_firebase = True
-                attendance.firebase_doc_id = firebase_result.get('document_id', '')
-                attendance.save(update_fields=['synced_to_firebase', 'firebase_doc_id'])
-            else:
-                # store any returned id/message for troubleshooting but don't mark as synced
-                attendance.firebase_doc_id = firebase_result.get('document_id', '') or attendance.firebase_doc_id
-                attendance.save(update_fields=['firebase_doc_id'])
-            
-            # Sync to Portal
-            portal_result = self.portal.sync_attendance(attendance, student, session)
-            if portal_result.get('success') and portal_result.get('document_id'):
-                attendance.synced_to_portal = True
-                attendance.portal_response = portal_result
-                attendance.save(update_fields=['synced_to_portal', 'portal_response'])
-            else:
-                # Save portal response for debugging (do not flip synced flag)
-                attendance.portal_response = portal_result
-                attendance.save(update_fields=['portal_response'])
+            portal_result = self.portal.sync_attendance(
+                attendance, student, session, snapshot=snapshot, attendance_percentage=attendance_percentage,
+            )
+            record_sync_result(attendance.pk, firebase_result, portal_result)
             
             result = {
                 'success': firebase_result.get('success') or portal_result.get('success'),
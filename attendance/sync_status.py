@@ -0,0 +1,78 @@
+"""
+Compact sync status for attendance records.
+
+Each record keeps one small integer status per target (see `SyncStatus`),
+an attempt counter and the time of the last attempt, all written with a
+single UPDATE. Error details of failed attempts go to `SyncAttempt`, a
+bounded log: rows older than SYNC_ATTEMPT_RETENTION_DAYS or beyond the
+newest SYNC_ATTEMPT_MAX_ROWS are pruned, at most once an hour as failures
+are logged, or on demand with `manage.py prune_sync_attempts`.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Attendance, SyncAttempt, SyncStatus
+
+PRUNE_LOCK_KEY = 'sync_attempts:pruned'
+PRUNE_INTERVAL_SECONDS = 60 * 60
+ERROR_MAX_LENGTH = SyncAttempt._meta.get_field('error').max_length
+
+
+def status_from_result(result):
+    """Map a Firebase/portal sync result dict to a `SyncStatus`."""
+    if result.get('success') and result.get('document_id'):
+        return SyncStatus.SYNCED
+    if result.get('skipped'):
+        return SyncStatus.SKIPPED
+    return SyncStatus.FAILED
+
+
+def _error_text(result):
+    return str(result.get('error') or result.get('message') or 'unknown error')[:ERROR_MAX_LENGTH]
+
+
+def record_sync_result(attendance_id, firebase_result, portal_result):
+    """Store the outcome of one sync attempt; returns (firebase status, portal status)."""
+    statuses = {
+        SyncAttempt.TARGET_FIREBASE: status_from_result(firebase_result),
+        SyncAttempt.TARGET_PORTAL: status_from_result(portal_result),
+    }
+    # Only sync columns change, which no report reads, so the report data
+    # version (see `reports.bump_attendance_data_version`) is left alone.
+    Attendance.objects.filter(pk=attendance_id).update(
+        firebase_status=statuses[SyncAttempt.TARGET_FIREBASE],
+        portal_status=statuses[SyncAttempt.TARGET_PORTAL],
+        sync_attempts=F('sync_attempts') + 1,
+        last_sync_at=timezone.now(),
+    )
+    results = {SyncAttempt.TARGET_FIREBASE: firebase_result, SyncAttempt.TARGET_PORTAL: portal_result}
+    failures = [
+        SyncAttempt(attendance_id=attendance_id, target=target, status=status, error=_error_text(results[target]))
+        for target, status in statuses.items()
+        if status == SyncStatus.FAILED
+    ]
+    if failures:
+        SyncAttempt.objects.bulk_create(failures)
+        if cache.add(PRUNE_LOCK_KEY, True, PRUNE_INTERVAL_SECONDS):
+            prune_sync_attempts()
+    return statuses[SyncAttempt.TARGET_FIREBASE], statuses[SyncAttempt.TARGET_PORTAL]
+
+
+def prune_sync_attempts(retention_days=None, max_rows=None):
+    """Delete log rows past the retention window or beyond the row cap. Returns rows deleted."""
+    if retention_days is None:
+        retention_days = getattr(settings, 'SYNC_ATTEMPT_RETENTION_DAYS', 14)
+    if max_rows is None:
+        max_rows = getattr(settings, 'SYNC_ATTEMPT_MAX_ROWS', 50000)
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted = SyncAttempt.objects.filter(created_at__lt=cutoff).delete()[0]
+    oldest_kept = None
+    if max_rows > 0:
+        oldest_kept = SyncAttempt.objects.order_by('-id').values_list('id', flat=True)[max_rows - 1:max_rows].first()
+    if oldest_kept is not None:
+        deleted += SyncAttempt.objects.filter(id__lt=oldest_kept).delete()[0]
+    return deleted
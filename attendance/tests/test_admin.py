@@ -0,0 +1,107 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from attendance import admin as attendance_admin
+from attendance.models import Attendance, AttendanceSession, Lecturer, Student, SyncAttempt, SyncStatus, Unit
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class AttendanceAdminTests(TestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(username='root', password='secret')
+        self.client.force_login(self.admin_user)
+        user = User.objects.create_user(username='lec042', first_name='Ada', last_name='L')
+        lecturer = Lecturer.objects.create(user=user, staff_id='S042', department='CS')
+        self.units = [
+            Unit.objects.create(code=f'CS42{i}', name=f'Unit {i}', lecturer=lecturer) for i in range(2)
+        ]
+        self.sessions = [
+            AttendanceSession.objects.create(unit=unit, lecturer=lecturer, date='2025-03-03',
+                                             start_time='08:00', end_time='09:00', venue='Hall')
+            for unit in self.units
+        ]
+        self.url = reverse('admin:attendance_attendance_changelist')
+
+    def _attend(self, count, session):
+        for i in range(count):
+            student = Student.objects.create(name=f'Student {session.pk}-{i}',
+                                             admission_number=f'ADM/{session.pk}/{i}')
+            Attendance.objects.create(student=student, session=session)
+
+    def _changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx.captured_queries), resp
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self._attend(2, self.sessions[0])
+        self.client.get(self.url)  # session/auth warm-up
+        few, _ = self._changelist_queries(self.url)
+        self._attend(8, self.sessions[1])
+        many, resp = self._changelist_queries(self.url)
+        self.assertEqual(few, many)
+        self.assertContains(resp, 'CS421')
+
+    def test_large_table_changelists_skip_date_hierarchy_scans(self):
+        self._attend(3, self.sessions[0])
+        SyncAttempt.objects.create(attendance_id=1, target=SyncAttempt.TARGET_PORTAL, status=SyncStatus.FAILED)
+        for url in (self.url, reverse('admin:attendance_syncattempt_changelist')):
+            self.client.get(url)  # session/auth warm-up
+            # Session, user, the paginator count and one page of rows; no date-hierarchy DISTINCTs.
+            with self.assertNumQueries(4):
+                _, resp = self._changelist_queries(url)
+            self.assertIsNone(resp.context['cl'].date_hierarchy)
+
+    def test_unit_filter_takes_a_typed_code(self):
+        self._attend(2, self.sessions[0])
+        self._attend(3, self.sessions[1])
+        resp = self.client.get(self.url, {'unit_code': 'cs421'})
+        self.assertEqual(resp.context['cl'].result_count, 3)
+        self.assertContains(resp, 'name="unit_code" value="cs421"')
+        # The sidebar never lists units it was not asked about.
+        self.assertNotContains(resp, 'unit_code=CS420')
+
+    def test_student_unit_filter(self):
+        self._attend(2, self.sessions[0])
+        student = Student.objects.first()
+        student.units.add(self.units[1])
+        resp = self.client.get(reverse('admin:attendance_student_changelist'), {'unit_code': 'CS421'})
+        self.assertEqual(list(resp.context['cl'].result_list), [student])
+
+    def test_estimated_count_is_only_used_on_postgres(self):
+        self.assertIsNone(attendance_admin.estimated_row_count(Attendance.objects.all()))
+        self._attend(3, self.sessions[0])
+        paginator = attendance_admin.EstimatedCountPaginator(Attendance.objects.all(), 100)
+        self.assertEqual(paginator.count, 3)
+
+    @patch('attendance.admin._spawn_resync')
+    def test_resync_selected_queues_ids(self, spawn):
+        self._attend(3, self.sessions[0])
+        ids = sorted(Attendance.objects.values_list('pk', flat=True))
+        resp = self.client.post(self.url, {'action': 'resync_selected', '_selected_action': ids}, follow=True)
+        self.assertContains(resp, 'Resync of 3 attendance record(s) started')
+        self.assertEqual(sorted(spawn.call_args.args[0]), ids)
+
+    @override_settings(ADMIN_RESYNC_MAX=2)
+    @patch('attendance.admin._spawn_resync')
+    def test_resync_selected_refuses_too_many(self, spawn):
+        self._attend(3, self.sessions[0])
+        ids = list(Attendance.objects.values_list('pk', flat=True))
+        resp = self.client.post(self.url, {'action': 'resync_selected', '_selected_action': ids}, follow=True)
+        self.assertContains(resp, 'Select at most 2 records')
+        spawn.assert_not_called()
+
+    @patch('attendance.sync_service.get_dual_sync_service')
+    def test_resync_runs_dual_sync_per_record(self, get_service):
+        self._attend(3, self.sessions[0])
+        ids = list(Attendance.objects.values_list('pk', flat=True))
+        # Runs inline here, so keep the test's connection open.
+        with patch.object(attendance_admin, 'RESYNC_BATCH_SIZE', 2), patch('attendance.admin.close_old_connections'):
+            attendance_admin._resync_attendance(ids)
+        self.assertEqual(get_service.return_value.sync_attendance.call_count, 3)
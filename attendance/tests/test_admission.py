@@ -0,0 +1,47 @@
+import uuid
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+
+from attendance.admission import AdmissionController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class AdmissionControllerTests(TestCase):
+    def test_bucket_refills_at_rate(self):
+        clock = FakeClock()
+        controller = AdmissionController(rate=2, burst=3, clock=clock)
+        self.assertEqual([controller.acquire('s') for _ in range(3)], [0, 0, 0])
+        self.assertEqual(controller.acquire('s'), 1)
+        clock.now += 0.5
+        self.assertEqual(controller.acquire('s'), 0)
+        # Other sessions have their own bucket.
+        self.assertEqual(controller.acquire('other'), 0)
+
+    def test_least_recently_used_sessions_are_evicted(self):
+        controller = AdmissionController(rate=1, burst=1, max_keys=2, clock=FakeClock())
+        for key in ('a', 'b', 'c'):
+            controller.acquire(key)
+        self.assertEqual(list(controller._buckets), ['b', 'c'])
+
+    def test_zero_rate_disables(self):
+        controller = AdmissionController(rate=0, burst=0)
+        self.assertEqual(controller.acquire('s'), 0)
+
+    def test_excess_posts_get_retry_after_without_db_work(self):
+        controller = AdmissionController(rate=0.5, burst=1, clock=FakeClock())
+        url = reverse('student_attend', args=[uuid.uuid4()])
+        with patch('attendance.views.get_admission_controller', return_value=controller):
+            self.assertEqual(self.client.post(url, {}).status_code, 404)
+            with self.assertNumQueries(0):
+                resp = self.client.post(url, {})
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(resp['Retry-After'], '2')
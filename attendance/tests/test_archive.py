@@ -0,0 +1,93 @@
+import csv
+import io
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from attendance.archive import archived_counts
+from attendance.exports import attendance_rows, stream_csv
+from attendance.jsonl import iter_jsonl
+from attendance.models import Attendance, AttendanceSession, Lecturer, Student, Unit
+from attendance.reports import build_attendance_matrix, build_eligibility_report
+
+
+class ArchiveAttendanceTests(TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        override = override_settings(ATTENDANCE_ARCHIVE_ROOT=Path(self.archive_dir))
+        override.enable()
+        self.addCleanup(override.disable)
+
+        user = User.objects.create_user(username='archiver', password='secret')
+        lecturer = Lecturer.objects.create(user=user, staff_id='S030', department='Computer Science')
+        self.unit = Unit.objects.create(code='CS400', name='Databases', lecturer=lecturer)
+        self.student = Student.objects.create(admission_number='ADM/Z', name='Zed')
+        self.student.units.add(self.unit)
+        for n in (1, 2):
+            session = AttendanceSession.objects.create(
+                unit=self.unit, lecturer=lecturer, date=f'2025-02-0{n}', start_time='08:00',
+                end_time='09:00', venue='Hall', semester=1, session_number=n, is_active=False,
+            )
+            Attendance.objects.create(student=self.student, session=session)
+
+    def test_archive_moves_rows_and_keeps_them_readable(self):
+        call_command('archive_attendance', semester=1, before='2025-06-01', stdout=io.StringIO())
+        self.assertFalse(Attendance.objects.exists())
+
+        rows = list(csv.reader(io.StringIO(''.join(stream_csv(attendance_rows(self.unit, 1))))))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[1][0], 'ADM/Z')
+
+        matrix = build_attendance_matrix(self.unit, 1)
+        self.assertEqual(matrix.attended(0), 2)
+        report = build_eligibility_report(semester=1, threshold=75)
+        self.assertEqual(report.at_risk_count, 0)
+
+    def test_existing_archive_requires_resume(self):
+        call_command('archive_attendance', semester=1, before='2025-06-01', stdout=io.StringIO())
+        out = io.StringIO()
+        call_command('archive_attendance', semester=1, before='2025-06-01', resume=True, stdout=out)
+        self.assertIn('removed 0 remaining', out.getvalue())
+
+    def test_archive_is_listed_only_after_its_rows_are_deleted(self):
+        with patch('attendance.management.commands.archive_attendance.delete_archived', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('archive_attendance', semester=1, before='2025-06-01', stdout=io.StringIO())
+        # Rows are still in the table and the archive is not listed, so nothing is read twice.
+        self.assertEqual(len(list(attendance_rows(self.unit, 1))), 2)
+        self.assertEqual(build_attendance_matrix(self.unit, 1).attended(0), 2)
+
+        call_command('archive_attendance', semester=1, before='2025-06-01', resume=True, stdout=io.StringIO())
+        self.assertFalse(Attendance.objects.exists())
+        self.assertEqual(len(list(attendance_rows(self.unit, 1))), 2)
+
+    def test_archived_rows_follow_the_unit_after_a_code_change(self):
+        call_command('archive_attendance', semester=1, before='2025-06-01', stdout=io.StringIO())
+        self.unit.code = 'CS401'
+        self.unit.save()
+        self.assertEqual(build_attendance_matrix(self.unit, 1).attended(0), 2)
+        self.assertEqual(len(list(attendance_rows(self.unit, 1))), 2)
+        report = build_eligibility_report(semester=1, threshold=75)
+        self.assertEqual(report.at_risk_count, 0)
+
+    def test_unit_scoped_counts_skip_other_units_archive_files(self):
+        other = Unit.objects.create(code='CS402', name='Compilers', lecturer=self.unit.lecturer)
+        session = AttendanceSession.objects.create(
+            unit=other, lecturer=other.lecturer, date='2025-02-03', start_time='08:00',
+            end_time='09:00', venue='Hall', semester=1, session_number=1, is_active=False,
+        )
+        Attendance.objects.create(student=self.student, session=session)
+        for code in ('CS400', 'CS402'):
+            call_command('archive_attendance', semester=1, before='2025-06-01', unit=code, stdout=io.StringIO())
+
+        with patch('attendance.archive.iter_jsonl', wraps=iter_jsonl) as read:
+            counts = archived_counts(semester=1, unit_ids=[other.pk])
+        self.assertEqual(counts, {(self.student.pk, other.pk, 1): 1})
+        self.assertEqual([Path(c.args[0]).name for c in read.call_args_list],
+                         ['attendance_S1_before_2025-06-01_CS402.jsonl.gz'])
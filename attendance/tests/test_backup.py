@@ -0,0 +1,118 @@
+import gzip
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+
+from attendance.models import Attendance, AttendanceSession, Lecturer, Student, Unit
+
+
+class BackupRestoreTests(TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+        user = User.objects.create_user(username='backer', password='secret', first_name='Bea')
+        self.lecturer = Lecturer.objects.create(user=user, staff_id='S033', department='Computer Science')
+        self.unit = Unit.objects.create(code='CS330', name='Systems', lecturer=self.lecturer)
+        self.session = AttendanceSession.objects.create(
+            unit=self.unit, lecturer=self.lecturer, date='2025-03-03', start_time='10:00',
+            end_time='12:00', venue='Lab 1', semester=1, session_number=1,
+        )
+        self.students = [Student.objects.create(admission_number=f'ADM/{i}', name=f'Student {i}') for i in range(5)]
+        for student in self.students:
+            student.units.add(self.unit)
+            Attendance.objects.create(student=student, session=self.session)
+        self.old_ts = timezone.now() - timedelta(days=30)
+        Attendance.objects.update(timestamp=self.old_ts)
+
+    def _wipe(self):
+        User.objects.filter(username='backer').delete()
+        Student.objects.all().delete()
+
+    def test_round_trip_preserves_rows_and_timestamps(self):
+        path = self.tmp / 'full.jsonl.gz'
+        call_command('backup_attendance', output=str(path), chunk_size=2, stdout=io.StringIO())
+        self._wipe()
+        self.assertFalse(Attendance.objects.exists())
+
+        call_command('restore_attendance', str(path), batch_size=2, stdout=io.StringIO())
+        self.assertEqual(Attendance.objects.count(), 5)
+        self.assertEqual(self.unit.enrolled_students.count(), 5)
+        record = Attendance.objects.select_related('session__lecturer__user').first()
+        self.assertEqual(record.timestamp, self.old_ts)
+        self.assertEqual((record.unit_id, record.semester), (self.unit.pk, 1))
+        self.assertEqual(record.session.lecturer.user.first_name, 'Bea')
+
+        # Re-running is a no-op rather than an integrity error.
+        call_command('restore_attendance', str(path), stdout=io.StringIO())
+        self.assertEqual(Attendance.objects.count(), 5)
+
+    def test_password_hashes_are_left_out_unless_requested(self):
+        plain = self.tmp / 'plain.jsonl.gz'
+        with_passwords = self.tmp / 'with_passwords.jsonl.gz'
+        call_command('backup_attendance', output=str(plain), stdout=io.StringIO())
+        call_command('backup_attendance', output=str(with_passwords), include_passwords=True, stdout=io.StringIO())
+        self.assertNotIn('pbkdf2', gzip.decompress(plain.read_bytes()).decode())
+
+        self._wipe()
+        call_command('restore_attendance', str(plain), stdout=io.StringIO())
+        self.assertFalse(User.objects.get(username='backer').has_usable_password())
+
+        self._wipe()
+        call_command('restore_attendance', str(with_passwords), stdout=io.StringIO())
+        self.assertTrue(User.objects.get(username='backer').check_password('secret'))
+
+    def test_incremental_backup_only_has_recent_attendance(self):
+        full = self.tmp / 'full.jsonl.gz'
+        call_command('backup_attendance', output=str(full), stdout=io.StringIO())
+        since = timezone.now() - timedelta(days=1)
+        late = Student.objects.create(admission_number='ADM/LATE', name='Late')
+        Attendance.objects.create(student=late, session=self.session)
+
+        incremental = self.tmp / 'inc.jsonl.gz'
+        out = io.StringIO()
+        call_command('backup_attendance', output=str(incremental), since=since.isoformat(), stdout=out)
+        self.assertIn('attendance.attendance: 1', out.getvalue())
+
+        self._wipe()
+        call_command('restore_attendance', str(full), stdout=io.StringIO())
+        call_command('restore_attendance', str(incremental), stdout=io.StringIO())
+        self.assertEqual(Attendance.objects.count(), 6)
+
+    def test_incremental_restore_applies_edits(self):
+        full = self.tmp / 'full.jsonl.gz'
+        call_command('backup_attendance', output=str(full), stdout=io.StringIO())
+        since = timezone.now()
+        student = self.students[0]
+        student.name = 'Renamed Student'
+        student.save()
+        self.session.is_active = False
+        self.session.save()
+
+        incremental = self.tmp / 'inc.jsonl.gz'
+        out = io.StringIO()
+        call_command('backup_attendance', output=str(incremental), since=since.isoformat(), stdout=out)
+        self.assertIn('attendance.attendancesession: 1', out.getvalue())
+        self.assertIn('attendance.student: 1', out.getvalue())
+
+        self._wipe()
+        call_command('restore_attendance', str(full), stdout=io.StringIO())
+        self.assertEqual(Student.objects.get(pk=student.pk).name, 'Student 0')
+        call_command('restore_attendance', str(incremental), stdout=io.StringIO())
+        self.assertEqual(Student.objects.get(pk=student.pk).name, 'Renamed Student')
+        self.assertFalse(AttendanceSession.objects.get(pk=self.session.pk).is_active)
+        self.assertEqual(Attendance.objects.count(), 5)
+
+    def test_rejects_foreign_file(self):
+        bogus = self.tmp / 'bogus.jsonl'
+        bogus.write_text('{"hello": "world"}\n')
+        with self.assertRaises(CommandError):
+            call_command('restore_attendance', str(bogus), stdout=io.StringIO())
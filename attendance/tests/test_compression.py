@@ -0,0 +1,114 @@
+import gzip
+import io
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from attendance.management.commands.benchmark_compression import streamed_size
+from attendance.middleware import CompressionMiddleware, _brotli_stream, minify_html
+from attendance.models import AttendanceSession, Lecturer, Unit
+
+
+class MinifyHtmlTests(TestCase):
+    def test_collapses_whitespace_but_keeps_preserved_blocks(self):
+        html = '<div>\n    <p>Hello   world</p>\n\n    <pre>  keep\n    this</pre>\n<script>\n  var a  = 1;\n</script>\n</div>\n'
+        self.assertEqual(
+            minify_html(html),
+            '<div>\n<p>Hello world</p>\n<pre>  keep\n    this</pre>\n<script>\n  var a  = 1;\n</script>\n</div>\n',
+        )
+
+    def test_attribute_values_keep_their_whitespace(self):
+        html = '<input title="two  spaces"\n  value=\'a\n   b\' data-x="1 > 0   ok">  text   here\n\n  <!-- a   note -->\n'
+        self.assertEqual(
+            minify_html(html),
+            '<input title="two  spaces"\n  value=\'a\n   b\' data-x="1 > 0   ok"> text here\n<!-- a note -->\n',
+        )
+
+
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def _run(self, response, accept='gzip, deflate, br'):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda r: response)(request)
+
+    @patch('attendance.middleware.BROTLI_AVAILABLE', False)
+    def test_gzip_above_threshold_only(self):
+        body = '<p>attendance</p>' * 100
+        response = self._run(HttpResponse(body))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(), body)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        small = self._run(HttpResponse('<p>hi</p>' * 20))
+        self.assertFalse(small.has_header('Content-Encoding'))
+
+    @patch('attendance.middleware.BROTLI_AVAILABLE', False)
+    def test_streaming_text_and_binary_types(self):
+        csv = self._run(StreamingHttpResponse((f'row,{i}\n' for i in range(500)), content_type='text/csv'))
+        self.assertEqual(csv['Content-Encoding'], 'gzip')
+        self.assertTrue(gzip.decompress(b''.join(csv.streaming_content)).startswith(b'row,0\n'))
+
+        png = self._run(HttpResponse(b'\x89PNG' + b'\0' * 4000, content_type='image/png'))
+        self.assertFalse(png.has_header('Content-Encoding'))
+
+    def test_brotli_preferred_when_available(self):
+        brotli = self._brotli()
+        response = self._run(HttpResponse('<p>attendance</p>' * 100))
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), b'<p>attendance</p>' * 100)
+
+    def test_streamed_brotli_flushes_by_volume_not_per_chunk(self):
+        compressor = MagicMock()
+        compressor.process.return_value = b''
+        compressor.flush.return_value = b'F'
+        compressor.finish.return_value = b'E'
+        fake = MagicMock(Compressor=MagicMock(return_value=compressor))
+        rows = (f'{i:09d},student\n'.encode() for i in range(10000))  # 18 bytes each
+        with patch('attendance.middleware.brotli', fake):
+            out = b''.join(_brotli_stream(rows, quality=5, flush_bytes=16 * 1024))
+        self.assertEqual(compressor.process.call_count, 10000)
+        self.assertEqual(compressor.flush.call_count, 10000 * 18 // (16 * 1024))
+        self.assertTrue(out.endswith(b'E'))
+
+    def test_streamed_ratio_close_to_one_shot(self):
+        brotli = self._brotli()
+        body = ''.join(f'ADM/{i:05d},Student {i},CS{i % 40:03d},1,{i % 13 + 1}\n' for i in range(50000)).encode()
+        one_shot = len(brotli.compress(body, quality=5, mode=brotli.MODE_TEXT))
+        streamed = streamed_size(body, 'text/csv', 'br')
+        self.assertLess(streamed, one_shot * 1.1)
+
+    def _brotli(self):
+        from attendance import middleware
+        if not middleware.BROTLI_AVAILABLE:
+            self.skipTest('Brotli is not installed')
+        return middleware.brotli
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class StudentPathCompressionTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='squeeze', password='secret')
+        lecturer = Lecturer.objects.create(user=user, staff_id='S040', department='CS')
+        unit = Unit.objects.create(code='CS400', name='Compression', lecturer=lecturer)
+        self.session = AttendanceSession.objects.create(unit=unit, lecturer=lecturer, date='2025-03-03',
+                                                        start_time='08:00', end_time='09:00', venue='Hall')
+
+    def test_attend_page_is_minified_and_compressed(self):
+        url = reverse('student_attend', args=[self.session.id])
+        plain = self.client.get(url)
+        self.assertNotIn(b'\n    <', plain.content)
+        compressed = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertIn(compressed['Content-Encoding'], ('gzip', 'br'))
+        self.assertLess(len(compressed.content), len(plain.content) // 2)
+
+    def test_benchmark_command_reports_each_stage(self):
+        out = io.StringIO()
+        call_command('benchmark_compression', session_id=str(self.session.id), iterations=2, stdout=out)
+        self.assertIn('attend page (HTML)', out.getvalue())
+        self.assertIn('minify+gzip', out.getvalue())
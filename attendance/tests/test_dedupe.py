@@ -0,0 +1,84 @@
+import io
+from datetime import date, time, timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from attendance.dedupe import cleanup_duplicate_sessions, duplicate_sessions
+from attendance.models import Attendance, AttendanceSession, Lecturer, Student, Unit
+
+
+def _datetime_constraint():
+    return next(c for c in AttendanceSession._meta.constraints if c.name == 'unique_unit_semester_datetime')
+
+
+class DuplicateSessionCleanupTests(TransactionTestCase):
+    """Duplicates predate the unique (unit, semester, date, start_time) constraint, so it is lifted here."""
+
+    def setUp(self):
+        constraint = _datetime_constraint()
+        remaining = [c for c in AttendanceSession._meta.constraints if c is not constraint]
+        # SQLite rebuilds the table from _meta, so the constraint must be gone from it too.
+        with patch.object(AttendanceSession._meta, 'constraints', remaining), connection.schema_editor() as editor:
+            editor.remove_constraint(AttendanceSession, constraint)
+        self.addCleanup(self._restore_constraint)
+
+        # Rows are committed here, so keep the post-save sync threads from racing the test.
+        sync_thread = patch('attendance.signals.threading.Thread')
+        sync_thread.start()
+        self.addCleanup(sync_thread.stop)
+
+        user = User.objects.create_user(username='dedupe', password='secret')
+        lecturer = Lecturer.objects.create(user=user, staff_id='S047', department='CS')
+        unit = Unit.objects.create(code='CS470', name='Dupes', lecturer=lecturer)
+        now = timezone.now()
+
+        def session(hour, age, number=None):
+            s = AttendanceSession.objects.create(unit=unit, lecturer=lecturer, date=date(2025, 3, 3),
+                                                 start_time=time(hour), end_time=time(hour + 1), venue='Hall',
+                                                 session_number=number)
+            AttendanceSession.objects.filter(pk=s.pk).update(created_at=now - timedelta(hours=age))
+            return s
+
+        self.keep = session(8, 0, number=1)
+        self.old = session(8, 2)
+        self.older = session(8, 5)
+        self.single = session(10, 0, number=2)
+
+        students = [Student.objects.create(name=f'S{i}', admission_number=f'ADM/47/{i}') for i in range(4)]
+        Attendance.objects.create(student=students[0], session=self.keep)
+        Attendance.objects.create(student=students[0], session=self.old)    # already on the kept session
+        Attendance.objects.create(student=students[1], session=self.old)
+        Attendance.objects.create(student=students[1], session=self.older)  # moved from both duplicates
+        Attendance.objects.create(student=students[2], session=self.older)
+        Attendance.objects.create(student=students[3], session=self.single)
+
+    def _restore_constraint(self):
+        AttendanceSession.objects.all().delete()
+        with connection.schema_editor() as editor:
+            editor.add_constraint(AttendanceSession, _datetime_constraint())
+
+    def test_window_query_maps_duplicates_to_the_newest_session(self):
+        self.assertEqual(duplicate_sessions(), {self.old.pk: self.keep.pk, self.older.pk: self.keep.pk})
+
+    def test_dry_run_reports_without_changes(self):
+        out = io.StringIO()
+        call_command('cleanup_duplicates', '--dry-run', stdout=out)
+        self.assertIn('1 duplicate group(s): 2 session(s) would be deleted, 2 attendance record(s) would be moved',
+                      out.getvalue())
+        self.assertIn('2 would be merged', out.getvalue())
+        self.assertEqual(AttendanceSession.objects.count(), 4)
+        self.assertEqual(Attendance.objects.count(), 6)
+
+    def test_cleanup_moves_merges_and_deletes_in_batches(self):
+        result = cleanup_duplicate_sessions(batch_size=1)
+        self.assertEqual((result.groups, result.sessions, result.repointed, result.merged), (1, 2, 2, 2))
+        self.assertEqual(set(AttendanceSession.objects.values_list('pk', flat=True)), {self.keep.pk, self.single.pk})
+        kept = Attendance.objects.filter(session=self.keep).values_list('student__admission_number', flat=True)
+        self.assertEqual(sorted(kept), ['ADM/47/0', 'ADM/47/1', 'ADM/47/2'])
+        self.assertEqual(Attendance.objects.count(), 4)
+        self.assertEqual(cleanup_duplicate_sessions().sessions, 0)
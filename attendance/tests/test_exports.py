@@ -0,0 +1,50 @@
+import csv
+import io
+import zipfile
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from attendance.models import Attendance, AttendanceSession, Lecturer, Student, Unit
+
+
+class AttendanceExportTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='exporter', password='secret')
+        self.lecturer = Lecturer.objects.create(user=user, staff_id='S010', department='Computer Science')
+        self.unit = Unit.objects.create(code='CS200', name='Data Structures', lecturer=self.lecturer)
+        self.session = AttendanceSession.objects.create(
+            unit=self.unit, lecturer=self.lecturer, date='2025-12-15',
+            start_time='08:00', end_time='09:00', venue='Lab A', semester=1, session_number=1,
+        )
+        for i in range(3):
+            student = Student.objects.create(admission_number=f'ADM/{i:03d}', name=f'Student {i}')
+            Attendance.objects.create(student=student, session=self.session)
+        self.client.login(username='exporter', password='secret')
+        self.url = reverse('export_attendance', args=[self.unit.id])
+
+    def test_csv_export_streams_all_rows(self):
+        resp = self.client.get(self.url, {'semester': 1, 'format': 'csv'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        self.assertIn('attachment', resp['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(b''.join(resp.streaming_content).decode('utf-8'))))
+        self.assertEqual(rows[0][0], 'Admission Number')
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][:5], ['ADM/000', 'Student 0', 'CS200', '1', '1'])
+
+    def test_xlsx_export_is_a_valid_workbook(self):
+        resp = self.client.get(self.url, {'semester': 1, 'format': 'xlsx'})
+        self.assertEqual(resp.status_code, 200)
+        with zipfile.ZipFile(io.BytesIO(b''.join(resp.streaming_content))) as zf:
+            self.assertIsNone(zf.testzip())
+            sheet = zf.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertEqual(sheet.count('<row>'), 4)
+        self.assertIn('ADM/002', sheet)
+
+    def test_other_lecturers_cannot_export(self):
+        User.objects.create_user(username='other', password='secret')
+        self.client.login(username='other', password='secret')
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 302)
@@ -0,0 +1,72 @@
+import io
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings
+
+from attendance.firebase_service import get_firebase_service
+from attendance.firestore_fake import FakeFirestoreClient
+from attendance.jsonl import iter_jsonl
+from attendance.management.commands.firebase_cleanup import Command as CleanupCommand
+
+
+class FirebaseCleanupTests(SimpleTestCase):
+    def setUp(self):
+        self.fake = FakeFirestoreClient()
+        fb = get_firebase_service(client=self.fake)
+        self.addCleanup(fb.use_client, None)
+        self.base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.base_dir)
+        override = override_settings(BASE_DIR=Path(self.base_dir))
+        override.enable()
+        self.addCleanup(override.disable)
+
+        batch = self.fake.batch()
+        for s in range(3):
+            batch.set(self.fake.collection('sessions').document(f's{s}'), {'n': s})
+        batch.commit()
+        students = self.fake.collection('sessions').document('s0').collection('students')
+        for start in range(0, 1200, 400):
+            batch = self.fake.batch()
+            for i in range(start, start + 400):
+                batch.set(students.document(f'ADM{i}'), {'i': i})
+            batch.commit()
+        self.fake.collection('attendance_records').document('r1').set({'x': 1})
+        self.fake.round_trips.clear()
+
+    def test_all_streams_backup_and_deletes_in_batches(self):
+        call_command('firebase_cleanup', all=True, confirm=True, workers=4, stdout=io.StringIO())
+
+        self.assertEqual(list(self.fake.collection('sessions').stream()), [])
+        self.assertEqual(list(self.fake.collection('sessions').document('s0').collection('students').stream()), [])
+        self.assertEqual(list(self.fake.collection('attendance_records').stream()), [])
+        # 1201 docs for s0 -> 3 batches, one each for s1/s2, one for attendance_records
+        self.assertEqual(self.fake.round_trips['commit'], 6)
+        self.assertEqual(self.fake.round_trips['delete'], 0)
+
+        backup = next(Path(self.base_dir).glob('firebase_backup_*.jsonl.gz'))
+        self.assertEqual(sum(1 for _ in iter_jsonl(backup)), 3 + 1200 + 1)
+        self.assertFalse((Path(self.base_dir) / 'firebase_cleanup_checkpoint.json').exists())
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        original = CleanupCommand._delete_session
+
+        def flaky(cmd, sess_id, student_ids):
+            if sess_id == 's2':
+                raise RuntimeError('network down')
+            return original(cmd, sess_id, student_ids)
+
+        with patch.object(CleanupCommand, '_delete_session', flaky):
+            with self.assertRaises(CommandError):
+                call_command('firebase_cleanup', all=True, confirm=True, workers=1, stdout=io.StringIO())
+        self.assertTrue(self.fake.collection('sessions').document('s2').get().exists)
+        self.assertTrue((Path(self.base_dir) / 'firebase_cleanup_checkpoint.json').exists())
+
+        out = io.StringIO()
+        call_command('firebase_cleanup', resume=True, confirm=True, stdout=out)
+        self.assertIn('2 sessions already deleted', out.getvalue())
+        self.assertEqual(list(self.fake.collection('sessions').stream()), [])
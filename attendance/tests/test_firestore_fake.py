@@ -0,0 +1,78 @@
+import io
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from attendance.firebase_service import get_firebase_service
+from attendance.firestore_fake import FakeContentionError, FakeFirestoreClient
+
+
+class FakeFirestoreTestCase(TestCase):
+    def setUp(self):
+        self.fake = FakeFirestoreClient()
+        self.fb = get_firebase_service(client=self.fake)
+        self.addCleanup(self.fb.use_client, None)
+        cache.clear()
+
+
+class FakeFirestoreClientTests(FakeFirestoreTestCase):
+    def test_save_attendance_records_lecturer_usage(self):
+        payload = {'lecturer_id': 'L1', 'lecturer_name': 'Dr Ada', 'unit_code': 'CS101'}
+        self.assertTrue(self.fb.save_attendance('sess-1', payload)['success'])
+        self.assertTrue(self.fb.save_attendance('sess-2', payload)['success'])
+
+        doc = self.fake.collection('lecturer_usage').document('L1').get().to_dict()
+        self.assertEqual(doc['usage_count'], 2)
+        self.assertIsNotNone(doc['last_active'])
+        sessions = [d.id for d in self.fake.collection('lecturer_usage').document('L1').collection('sessions').stream()]
+        self.assertEqual(sessions, ['sess-1', 'sess-2'])
+
+    def test_contention_and_round_trip_accounting(self):
+        busy = FakeFirestoreClient(contention_rate=1.0)
+        with self.assertRaises(FakeContentionError):
+            busy.collection('c').document('d').set({'a': 1})
+        self.assertEqual(busy.round_trips['set'], 1)
+
+        batch = self.fake.batch()
+        for i in range(3):
+            batch.set(self.fake.collection('c').document(str(i)), {'i': i})
+        self.assertEqual(batch.commit(), 3)
+        self.assertEqual(self.fake.round_trips['commit'], 1)
+        self.assertEqual(len(list(self.fake.collection('c').stream())), 3)
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_lecturer_usage_admin_reads_fake(self):
+        self.fake.collection('lecturer_usage').document('L9').set({'lecturer_name': 'Dr Nine', 'usage_count': 9})
+        User.objects.create_user(username='staff', password='secret', is_staff=True)
+        self.client.login(username='staff', password='secret')
+        resp = self.client.get(reverse('lecturer_usage_admin'))
+        self.assertContains(resp, 'Dr Nine')
+
+    @patch('firebase_admin.auth.verify_id_token')
+    def test_firebase_login_writes_profile(self, mock_verify):
+        mock_verify.return_value = {'email': 'x@example.com', 'email_verified': True, 'uid': 'uid-x', 'name': 'X'}
+        resp = self.client.post(reverse('firebase_login'), data='{"idToken":"t"}', content_type='application/json')
+        self.assertTrue(resp.json()['success'])
+        profile = self.fake.collection('lecturer_profiles').document('uid-x').get()
+        self.assertEqual(profile.to_dict()['email'], 'x@example.com')
+
+    def test_firebase_cleanup_deletes_session(self):
+        backup_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, backup_dir)
+        session = self.fake.collection('sessions').document('s1')
+        session.set({'unit_code': 'CS101'})
+        session.collection('students').document('ADM1').set({'name': 'A'})
+
+        with override_settings(BASE_DIR=Path(backup_dir)):
+            call_command('firebase_cleanup', session_id='s1', confirm=True, stdout=io.StringIO())
+
+        self.assertFalse(self.fake.collection('sessions').document('s1').get().exists)
+        self.assertEqual(list(session.collection('students').stream()), [])
+        self.assertTrue(list(Path(backup_dir).glob('firebase_backup_*')))
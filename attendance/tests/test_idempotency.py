@@ -0,0 +1,74 @@
+import uuid
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from attendance.idempotency import REPLAY_HEADER, clean_idempotency_key
+from attendance.models import Attendance, AttendanceSession, Lecturer, Unit
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class IdempotentAttendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='idem', password='secret')
+        lecturer = Lecturer.objects.create(user=user, staff_id='S048', department='CS')
+        unit = Unit.objects.create(code='CS480', name='Retries', lecturer=lecturer)
+        self.session = AttendanceSession.objects.create(unit=unit, lecturer=lecturer, date='2025-03-03',
+                                                        start_time='08:00', end_time='09:00', venue='Hall')
+        self.url = reverse('student_attend', args=[self.session.id])
+
+    def _post(self, key, name='Flaky Network', admission_number='adm/48/1'):
+        return self.client.post(self.url, {
+            'student_name': name, 'admission_number': admission_number, 'idempotency_key': key,
+        })
+
+    def test_form_carries_a_fresh_key(self):
+        first = self.client.get(self.url).context['form']['idempotency_key'].value()
+        second = self.client.get(self.url).context['form']['idempotency_key'].value()
+        self.assertIsNotNone(clean_idempotency_key(first))
+        self.assertNotEqual(first, second)
+
+    @patch('threading.Thread')
+    def test_retry_replays_the_success_page_without_db_or_sync_work(self, thread):
+        key = uuid.uuid4().hex
+        first = self._post(key)
+        self.assertContains(first, 'Flaky Network')
+        jobs = thread.call_count
+        with self.assertNumQueries(0):
+            retry = self._post(key)
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(retry[REPLAY_HEADER], 'true')
+        self.assertEqual(thread.call_count, jobs)
+        self.assertEqual(Attendance.objects.filter(session=self.session).count(), 1)
+
+    @patch('threading.Thread')
+    def test_new_key_goes_through_the_normal_path(self, thread):
+        self._post(uuid.uuid4().hex)
+        again = self._post(uuid.uuid4().hex)
+        self.assertFalse(again.has_header(REPLAY_HEADER))
+        self.assertTemplateUsed(again, 'attendance/already_marked.html')
+
+    @patch('threading.Thread')
+    def test_reused_key_from_another_student_is_recorded(self, thread):
+        key = uuid.uuid4().hex
+        self._post(key)
+        other = self._post(key, name='Second Student', admission_number='ADM/48/2')
+        self.assertFalse(other.has_header(REPLAY_HEADER))
+        self.assertContains(other, 'Second Student')
+        self.assertEqual(
+            sorted(Attendance.objects.filter(session=self.session).values_list('student__admission_number', flat=True)),
+            ['ADM/48/1', 'ADM/48/2'],
+        )
+        # The first student's retry still replays their own page.
+        retry = self._post(key, admission_number=' ADM/48/1 ')
+        self.assertEqual(retry[REPLAY_HEADER], 'true')
+        self.assertContains(retry, 'Flaky Network')
+
+    def test_malformed_keys_are_ignored(self):
+        self.assertIsNone(clean_idempotency_key('short'))
+        self.assertIsNone(clean_idempotency_key('x' * 80))
+        self.assertIsNone(clean_idempotency_key('<script>alert(1)</script>'))
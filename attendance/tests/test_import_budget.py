@@ -0,0 +1,56 @@
+import base64
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from attendance import firebase_service
+
+# Modules that must only be imported on first use, never at startup.
+DEFERRED_MODULES = ('firebase_admin', 'google.cloud.firestore', 'grpc', 'requests', 'qrcode', 'PIL')
+# Cumulative import time allowed for attendance.views, in microseconds.
+VIEWS_IMPORT_BUDGET_US = 250_000
+
+STARTUP_SCRIPT = (
+    'import django; django.setup(); '
+    'from django.urls import resolve; resolve("/")'
+)
+
+
+def measure_startup_imports():
+    """Run a cold Django startup under `-X importtime`; return {module: cumulative microseconds}."""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='attendance_system.settings')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+        cwd=Path(settings.BASE_DIR), env=env, capture_output=True, text=True, check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            timings[name.strip()] = int(cumulative)
+    return timings
+
+
+class ColdStartImportTests(SimpleTestCase):
+    def test_startup_defers_heavy_imports(self):
+        timings = measure_startup_imports()
+        self.assertIn('attendance.views', timings)
+        loaded = [m for m in DEFERRED_MODULES if m in timings]
+        self.assertEqual(loaded, [], f'Imported at startup: {loaded}')
+        self.assertLess(timings['attendance.views'], VIEWS_IMPORT_BUDGET_US)
+
+    def test_credentials_read_from_env_without_files(self):
+        account = {'type': 'service_account', 'project_id': 'demo'}
+        encoded = base64.b64encode(json.dumps(account).encode()).decode()
+        with patch.dict(os.environ, {'FIREBASE_CREDENTIALS_JSON': encoded}):
+            self.assertEqual(firebase_service._credentials_from_env(), account)
+        with patch.dict(os.environ, {'FIREBASE_CREDENTIALS_JSON': '', 'FIREBASE_CREDENTIALS_JSON_BASE64': encoded}):
+            self.assertEqual(firebase_service._credentials_from_env(), account)
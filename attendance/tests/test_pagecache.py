@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from attendance.models import AttendanceSession, Lecturer, Unit
+from attendance.pagecache import RenderedPageCache, page_cache
+
+
+class FakeClock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RenderedPageCacheTests(TestCase):
+    def test_expiry_and_lru(self):
+        clock = FakeClock()
+        pages = RenderedPageCache(max_entries=2, clock=clock)
+        pages.set('a', b'A', ttl=10)
+        pages.set('b', b'B', ttl=10)
+        pages.get('a')
+        pages.set('c', b'C', ttl=10)
+        self.assertIsNone(pages.get('b'))
+        self.assertEqual(pages.get('a'), b'A')
+        clock.now = 11
+        self.assertIsNone(pages.get('a'))
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class PublicPageTests(TestCase):
+    def setUp(self):
+        page_cache.clear()
+        self.addCleanup(page_cache.clear)
+        user = User.objects.create_user(username='closer', password='secret')
+        lecturer = Lecturer.objects.create(user=user, staff_id='S041', department='CS')
+        unit = Unit.objects.create(code='CS410', name='Caching', lecturer=lecturer)
+        self.session = AttendanceSession.objects.create(unit=unit, lecturer=lecturer, date='2025-03-03',
+                                                        start_time='08:00', end_time='09:00', venue='Hall',
+                                                        is_active=False)
+        self.url = reverse('student_attend', args=[self.session.id])
+
+    def test_closed_session_served_from_cache_without_queries(self):
+        first = self.client.get(self.url)
+        self.assertContains(first, 'CS410')
+        self.assertIn('public', first['Cache-Control'])
+        self.assertIn('Cookie', first['Vary'])
+        with self.assertNumQueries(0):
+            again = self.client.get(self.url)
+        self.assertEqual(again.content, first.content)
+
+    def test_reopening_the_session_evicts_the_cached_page(self):
+        self.client.get(self.url)
+        self.session.is_active = True
+        self.session.save()
+        resp = self.client.get(self.url)
+        self.assertNotIn('public', resp.get('Cache-Control', ''))
+        self.assertContains(resp, 'Mark Attendance')
+
+    def test_logged_in_visitors_get_a_private_render(self):
+        self.client.get(reverse('home'))
+        self.client.login(username='closer', password='secret')
+        resp = self.client.get(reverse('home'))
+        self.assertIn(settings.SESSION_COOKIE_NAME, self.client.cookies)
+        self.assertNotIn('public', resp.get('Cache-Control', ''))
@@ -1,4 +1,7 @@
-from django.test import TestCase
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
 from attendance.models import Unit, AttendanceSession, Lecturer
@@ -43,3 +46,39 @@ class QRViewTests(TestCase):
         self.assertEqual(resp_download.status_code, 200)
         self.assertEqual(resp_download['Content-Type'], 'image/png')
         self.assertIn('attachment', resp_download.get('Content-Disposition', ''))
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class AsyncQRTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='asyncqr', password='secret')
+        self.lecturer = Lecturer.objects.create(user=user, staff_id='S044', department='CS')
+        self.unit = Unit.objects.create(code='CS440', name='Async', lecturer=self.lecturer)
+        self.client.login(username='asyncqr', password='secret')
+
+    @patch('attendance.views.render_session_qrs_async')
+    def test_create_session_redirects_without_rendering(self, render_async):
+        with patch('attendance.qr_generator.generate_session_qr') as generate:
+            resp = self.client.post(reverse('create_session'), {
+                'unit': self.unit.pk, 'lecturer_name': 'Dr. Async', 'class_year': 'Year 1', 'semester': 1,
+                'date': '2025-03-03', 'start_time': '08:00', 'end_time': '09:00', 'venue': 'Hall',
+            })
+        session = AttendanceSession.objects.get(unit=self.unit)
+        self.assertRedirects(resp, reverse('session_detail', args=[session.id]), fetch_redirect_response=False)
+        generate.assert_not_called()
+        self.assertFalse(session.qr_code)
+        self.assertEqual(render_async.call_args.args[0], [session.id])
+
+    def test_qr_is_rendered_once_on_demand_before_upload(self):
+        session = AttendanceSession.objects.create(unit=self.unit, lecturer=self.lecturer, date='2025-03-03',
+                                                   start_time='08:00', end_time='09:00', venue='Hall')
+        detail = self.client.get(reverse('session_detail', args=[session.id]))
+        self.assertContains(detail, reverse('download_qr', args=[session.id]))
+        url = reverse('download_qr', args=[session.id])
+        with patch('attendance.qr_generator.generate_session_qr', wraps=generate_session_qr) as generate:
+            first = self.client.get(url)
+            second = self.client.get(url)
+        self.assertEqual(first['Content-Type'], 'image/png')
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(generate.call_count, 1)
@@ -0,0 +1,132 @@
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from unittest.mock import patch
+
+from attendance.models import Attendance, AttendanceSession, Lecturer, Student, Unit
+from attendance.reports import build_attendance_matrix, build_eligibility_report, get_eligibility_report
+from attendance.schedule import build_schedule
+
+
+class AttendanceMatrixTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='matrix', password='secret')
+        self.lecturer = Lecturer.objects.create(user=user, staff_id='S020', department='Computer Science')
+        self.unit = Unit.objects.create(code='CS300', name='Algorithms', lecturer=self.lecturer)
+        self.sessions = [
+            AttendanceSession.objects.create(
+                unit=self.unit, lecturer=self.lecturer, date=f'2025-09-0{n}',
+                start_time='08:00', end_time='09:00', venue='Lab B', semester=1, session_number=n,
+            )
+            for n in (1, 2, 3)
+        ]
+        self.alice = Student.objects.create(admission_number='ADM/A', name='Alice')
+        self.bob = Student.objects.create(admission_number='ADM/B', name='Bob')
+        self.alice.units.add(self.unit)
+        self.bob.units.add(self.unit)
+        for session in self.sessions:
+            Attendance.objects.create(student=self.alice, session=session)
+        Attendance.objects.create(student=self.bob, session=self.sessions[1])
+
+    def test_matrix_built_from_grouped_queries(self):
+        with self.assertNumQueries(2):
+            matrix = build_attendance_matrix(self.unit, 1)
+        rows = list(matrix.rows())
+        self.assertEqual(matrix.held_sessions, [1, 2, 3])
+        self.assertEqual([r['admission_number'] for r in rows], ['ADM/A', 'ADM/B'])
+        self.assertEqual(rows[0]['cells'][:4], ['P', 'P', 'P', ''])
+        self.assertEqual(rows[1]['cells'][:3], ['A', 'P', 'A'])
+        self.assertEqual(rows[0]['percentage'], 100.0)
+        self.assertEqual(rows[1]['percentage'], 33.3)
+        self.assertEqual(matrix.session_totals()[:3], [1, 2, 1])
+
+    def test_attendance_carries_unit_and_semester(self):
+        record = Attendance.objects.get(student=self.bob)
+        self.assertEqual((record.unit_id, record.semester), (self.unit.id, 1))
+        session = self.sessions[1]
+        session.semester = 2
+        session.save()
+        record.refresh_from_db()
+        self.assertEqual(record.semester, 2)
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_matrix_view_renders(self):
+        self.client.login(username='matrix', password='secret')
+        resp = self.client.get(reverse('unit_attendance_matrix', args=[self.unit.id]), {'semester': 1})
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, 'ADM/B')
+
+
+class EligibilityReportTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='elig', password='secret', is_staff=True)
+        lecturer = Lecturer.objects.create(user=user, staff_id='S021', department='Computer Science')
+        self.unit = Unit.objects.create(code='CS310', name='Networks', lecturer=lecturer)
+        sessions = [
+            AttendanceSession.objects.create(
+                unit=self.unit, lecturer=lecturer, date=f'2025-09-0{n}',
+                start_time='10:00', end_time='11:00', venue='Room 5', semester=1, session_number=n,
+            )
+            for n in (1, 2, 3, 4)
+        ]
+        self.regular = Student.objects.create(admission_number='ADM/R', name='Regular')
+        self.absent = Student.objects.create(admission_number='ADM/X', name='Absent')
+        self.regular.units.add(self.unit)
+        self.absent.units.add(self.unit)
+        for session in sessions:
+            Attendance.objects.create(student=self.regular, session=session)
+        self.sessions = sessions
+
+    def test_flags_students_below_threshold(self):
+        with self.assertNumQueries(4):
+            report = build_eligibility_report(semester=1, threshold=75)
+        rows = {r['admission_number']: r for r in report.rows()}
+        self.assertTrue(rows['ADM/R']['eligible'])
+        self.assertFalse(rows['ADM/X']['eligible'])
+        self.assertEqual(rows['ADM/X']['held'], 4)
+        self.assertEqual([r['admission_number'] for r in report.rows(at_risk_only=True)], ['ADM/X'])
+
+    def test_cached_report_refreshes_after_new_attendance(self):
+        with patch('attendance.reports.build_eligibility_report', wraps=build_eligibility_report) as build:
+            self.assertEqual(get_eligibility_report(semester=1, threshold=50).at_risk_count, 1)
+            get_eligibility_report(semester=1, threshold=50)
+            self.assertEqual(build.call_count, 1)
+            for session in self.sessions[:2]:
+                Attendance.objects.create(student=self.absent, session=session)
+            self.assertEqual(get_eligibility_report(semester=1, threshold=50).at_risk_count, 0)
+            self.assertEqual(build.call_count, 2)
+
+    def test_check_in_only_recomputes_its_own_unit(self):
+        other = Unit.objects.create(code='CS311', name='Security', lecturer=self.unit.lecturer)
+        session = AttendanceSession.objects.create(
+            unit=other, lecturer=other.lecturer, date='2025-09-01', start_time='10:00', end_time='11:00',
+            venue='Room 6', semester=1, session_number=1,
+        )
+        self.absent.units.add(other)
+        get_eligibility_report(semester=1, threshold=50)
+        with patch('attendance.reports.build_eligibility_report', wraps=build_eligibility_report) as build:
+            Attendance.objects.create(student=self.absent, session=session)
+            report = get_eligibility_report(semester=1, threshold=50)
+        self.assertEqual(build.call_args.kwargs['unit_ids'], [other.pk])
+        self.assertEqual(list(report.rows()), list(build_eligibility_report(semester=1, threshold=50).rows()))
+        self.assertEqual([r['unit_code'] for r in report.rows(at_risk_only=True)], ['CS310'])
+
+    def test_bulk_created_sessions_refresh_held_counts(self):
+        self.assertEqual(get_eligibility_report(semester=1, threshold=50).at_risk_count, 1)
+        dates = [date(2025, 10, d) for d in range(1, 6)]
+        build_schedule(self.unit, self.unit.lecturer, 1, dates, time(10), time(11), venue='Room 5')
+        rows = {r['admission_number']: r for r in get_eligibility_report(semester=1, threshold=50).rows()}
+        self.assertEqual(rows['ADM/R']['held'], 9)
+        self.assertFalse(rows['ADM/R']['eligible'])
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_report_view_and_csv(self):
+        self.client.login(username='elig', password='secret')
+        resp = self.client.get(reverse('eligibility_report'), {'semester': 1})
+        self.assertContains(resp, 'ADM/X')
+        self.assertNotContains(resp, 'ADM/R')
+        resp = self.client.get(reverse('eligibility_report'), {'semester': 1, 'show': 'all', 'format': 'csv'})
+        body = b''.join(resp.streaming_content).decode('utf-8')
+        self.assertIn('ADM/R', body)
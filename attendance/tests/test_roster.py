@@ -0,0 +1,74 @@
+import io
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from attendance.models import Lecturer, Student, Unit
+from attendance.roster import import_roster, read_roster
+
+ROSTER = (
+    'Admission_Number,Name,Email,Unit_Code\n'
+    'adm/1, Ann   One ,ann@example.com,CS370\n'
+    'ADM/2,Ben Two,,CS371\n'
+    'ADM/3,Cy Three,,NOPE\n'
+    ',Nobody,,CS370\n'
+    'ADM/1,Ann One,ann@new.example.com,CS370\n'
+)
+
+
+class RosterImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='roster', password='secret')
+        lecturer = Lecturer.objects.create(user=self.user, staff_id='S037', department='CS')
+        self.unit = Unit.objects.create(code='CS370', name='Roster', lecturer=lecturer)
+        self.other = Unit.objects.create(code='CS371', name='Other', lecturer=lecturer)
+        Student.objects.create(admission_number='ADM/2', name='Old Name')
+
+    def test_upserts_and_enrolls_in_bulk(self):
+        with self.assertNumQueries(4):
+            result = import_roster(read_roster(io.StringIO(ROSTER)), batch_size=10, push_to_portal=False)
+        self.assertEqual(result.students, 3)
+        self.assertEqual(len(result.errors), 2)
+
+        ann = Student.objects.get(admission_number='ADM/1')
+        self.assertEqual((ann.name, ann.email), ('Ann One', 'ann@new.example.com'))
+        self.assertEqual(list(ann.units.all()), [self.unit])
+        ben = Student.objects.get(admission_number='ADM/2')
+        self.assertEqual((ben.name, list(ben.units.all())), ('Ben Two', [self.other]))
+        self.assertFalse(Student.objects.get(admission_number='ADM/3').units.exists())
+
+        # Re-importing is idempotent.
+        import_roster(read_roster(io.StringIO(ROSTER)), push_to_portal=False)
+        self.assertEqual(Student.objects.count(), 3)
+        self.assertEqual(Student.units.through.objects.count(), 2)
+
+    def test_command_pushes_to_portal_in_chunks(self):
+        tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        path = tmp / 'roster.csv'
+        path.write_text('admission_number,name\n' + ''.join(f'ADM/{i},Student {i}\n' for i in range(1200)))
+
+        portal = MagicMock(enabled=True)
+        portal.sync_student_bulk.side_effect = lambda chunk: {'success': True, 'synced_count': len(chunk)}
+        with patch('attendance.sync_service.PortalSyncService', return_value=portal):
+            out = io.StringIO()
+            call_command('import_roster', str(path), unit='CS370', stdout=out)
+        self.assertEqual([len(c.args[0]) for c in portal.sync_student_bulk.call_args_list], [500, 500, 200])
+        self.assertIn('Imported 1200 students, 1200 enrollments; 1200 pushed', out.getvalue())
+        self.assertEqual(self.unit.enrolled_students.count(), 1200)
+
+    def test_dashboard_upload_enrolls_into_unit(self):
+        self.client.login(username='roster', password='secret')
+        upload = SimpleUploadedFile('roster.csv', b'admission_number,name\nADM/9,Nine\n', content_type='text/csv')
+        with patch('attendance.views.push_roster_to_portal') as push:
+            resp = self.client.post(reverse('import_roster', args=[self.unit.id]), {'roster': upload})
+        self.assertRedirects(resp, reverse('dashboard'), fetch_redirect_response=False)
+        self.assertTrue(self.unit.enrolled_students.filter(admission_number='ADM/9').exists())
+        push.assert_called_once_with(['ADM/9'])
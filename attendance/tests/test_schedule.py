@@ -0,0 +1,74 @@
+import shutil
+import tempfile
+from datetime import date, time
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from attendance.models import AttendanceSession, Lecturer, Unit
+from attendance.qr_tasks import render_session_qrs
+from attendance.schedule import build_schedule, schedule_dates
+
+
+def _lecturer(username):
+    user = User.objects.create_user(username=username, password='secret')
+    lecturer = Lecturer.objects.create(user=user, staff_id=username.upper(), department='CS')
+    return user, lecturer, Unit.objects.create(code='CS430', name='Scheduling', lecturer=lecturer)
+
+
+class ScheduleBuilderTests(TestCase):
+    def setUp(self):
+        self.user, self.lecturer, self.unit = _lecturer('sched')
+
+    def test_schedule_dates_follow_weekly_pattern(self):
+        days = list(schedule_dates(date(2025, 3, 3), date(2025, 3, 16), [0, 3]))
+        self.assertEqual(days, [date(2025, 3, 3), date(2025, 3, 6), date(2025, 3, 10), date(2025, 3, 13)])
+
+    def test_numbers_fill_gaps_skip_taken_slots_and_stop_at_13(self):
+        AttendanceSession.objects.create(unit=self.unit, lecturer=self.lecturer, session_number=2,
+                                         date=date(2025, 3, 3), start_time=time(8), end_time=time(10), venue='A')
+        dates = list(schedule_dates(date(2025, 3, 3), date(2025, 6, 30), [0]))
+        with self.assertNumQueries(4):  # read existing, savepoint, insert, release
+            result = build_schedule(self.unit, self.lecturer, 1, dates, time(8), time(10), venue='Hall')
+        self.assertEqual(result.existing, [date(2025, 3, 3)])
+        self.assertEqual(len(result.sessions), 12)
+        self.assertEqual(len(result.overflow), len(dates) - 13)
+        numbers = sorted(AttendanceSession.objects.filter(unit=self.unit).values_list('session_number', flat=True))
+        self.assertEqual(numbers, list(range(1, 14)))
+        first = AttendanceSession.objects.get(unit=self.unit, date=date(2025, 3, 10))
+        self.assertEqual((first.session_number, first.venue), (1, 'Hall'))
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    @patch('attendance.views.render_session_qrs_async')
+    def test_view_creates_sessions_and_queues_qr_codes(self, render_async):
+        self.client.login(username='sched', password='secret')
+        resp = self.client.post(reverse('create_schedule'), {
+            'unit': self.unit.pk, 'lecturer_name': 'Dr. Sched', 'class_year': 'Year 2', 'semester': 2,
+            'start_date': '2025-03-03', 'end_date': '2025-03-14', 'weekdays': ['1', '3'],
+            'start_time': '14:00', 'end_time': '16:00', 'venue': 'Lab B',
+        })
+        self.assertRedirects(resp, reverse('dashboard'), fetch_redirect_response=False)
+        sessions = AttendanceSession.objects.filter(unit=self.unit, semester=2)
+        self.assertEqual(sessions.count(), 4)
+        self.assertEqual(set(render_async.call_args.args[0]), set(sessions.values_list('id', flat=True)))
+
+
+class ParallelQrRenderTests(TransactionTestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user, self.lecturer, self.unit = _lecturer('qrs')
+
+    def test_renders_every_session(self):
+        dates = list(schedule_dates(date(2025, 3, 3), date(2025, 3, 17), [0, 2]))
+        result = build_schedule(self.unit, self.lecturer, 1, dates, time(8), time(10), venue='Hall')
+        rendered = render_session_qrs([s.id for s in result.sessions], 'https://attend.example', workers=3)
+        self.assertEqual(rendered, len(result.sessions))
+        for session in AttendanceSession.objects.all():
+            self.assertTrue(session.qr_code.name.startswith('qr_codes/qr_'))
+            self.assertGreater(session.qr_code.size, 0)
@@ -0,0 +1,49 @@
+import time
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from attendance.models import Lecturer, Unit
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db')
+class ThrottledSessionMiddlewareTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='poller', password='secret')
+        lecturer = Lecturer.objects.create(user=user, staff_id='S038', department='CS')
+        self.unit = Unit.objects.create(code='CS380', name='Sessions', lecturer=lecturer)
+        self.client.login(username='poller', password='secret')
+        self.url = reverse('export_attendance', args=[self.unit.id])
+        # client.login() bypasses middleware, so the first request stamps the refresh time.
+        self._session_writes()
+
+    def _session_writes(self, now=None):
+        with CaptureQueriesContext(connection) as ctx:
+            if now is None:
+                response = self.client.get(self.url)
+            else:
+                with patch('attendance.middleware.time.time', return_value=now):
+                    response = self.client.get(self.url)
+            b''.join(response.streaming_content)
+        writes = [q['sql'] for q in ctx.captured_queries if 'django_session' in q['sql'] and not q['sql'].startswith('SELECT')]
+        return writes, response
+
+    def test_authenticated_requests_do_not_rewrite_the_session(self):
+        for _ in range(3):
+            writes, response = self._session_writes()
+            self.assertEqual(writes, [])
+            self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_session_is_renewed_once_below_threshold(self):
+        later = time.time() + settings.SESSION_COOKIE_AGE - settings.SESSION_REFRESH_THRESHOLD + 60
+        writes, response = self._session_writes(now=later)
+        self.assertEqual(len(writes), 1)
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+        writes, _ = self._session_writes(now=later + 60)
+        self.assertEqual(writes, [])
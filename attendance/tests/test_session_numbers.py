@@ -0,0 +1,107 @@
+import threading
+from datetime import date, time
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from attendance import schedule
+from attendance.models import AttendanceSession, Lecturer, Unit
+from attendance.schedule import (
+    DuplicateSessionError, SemesterFullError, build_schedule, save_numbered_session, schedule_dates,
+)
+
+
+def _unit(username):
+    user = User.objects.create_user(username=username, password='secret')
+    lecturer = Lecturer.objects.create(user=user, staff_id=username.upper(), department='CS')
+    return lecturer, Unit.objects.create(code='CS460', name='Numbers', lecturer=lecturer)
+
+
+class SessionNumberAllocationTests(TestCase):
+    def setUp(self):
+        self.lecturer, self.unit = _unit('numbers')
+
+    def _session(self, day, hour=8, **fields):
+        return AttendanceSession(unit=self.unit, lecturer=self.lecturer, date=day, start_time=time(hour),
+                                 end_time=time(hour + 1), venue='Hall', **fields)
+
+    def test_retries_when_a_concurrent_create_takes_the_number(self):
+        real = schedule.next_session_number
+        calls = []
+
+        def racing(unit_id, semester):
+            number = real(unit_id, semester)
+            if not calls:
+                # Another request commits the same number between our read and insert.
+                self._session(date(2025, 3, 4), session_number=number).save()
+            calls.append(number)
+            return number
+
+        with patch('attendance.schedule.next_session_number', side_effect=racing):
+            session = save_numbered_session(self._session(date(2025, 3, 3)))
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(session.session_number, 2)
+        self.assertEqual(AttendanceSession.objects.filter(unit=self.unit).count(), 2)
+
+    def test_duplicate_time_and_full_semester_are_reported(self):
+        save_numbered_session(self._session(date(2025, 3, 3)))
+        with self.assertRaises(DuplicateSessionError):
+            save_numbered_session(self._session(date(2025, 3, 3)))
+        for n in range(2, 14):
+            self._session(date(2025, 4, n), session_number=n).save()
+        with self.assertRaises(SemesterFullError):
+            save_numbered_session(self._session(date(2025, 5, 1)))
+
+    def test_schedule_is_replanned_after_a_collision(self):
+        # Number 1 was committed by another request after our first (stale) read.
+        self._session(date(2025, 2, 1), session_number=1).save()
+        real = schedule.plan_schedule
+        calls = []
+
+        def stale_first_plan(*args, **kwargs):
+            result = real(*args, **kwargs)
+            if not calls:
+                for number, session in enumerate(result.sessions, start=1):
+                    session.session_number = number
+            calls.append(result)
+            return result
+
+        dates = list(schedule_dates(date(2025, 3, 3), date(2025, 3, 17), [0]))
+        with patch('attendance.schedule.plan_schedule', side_effect=stale_first_plan):
+            result = build_schedule(self.unit, self.lecturer, 1, dates, time(8), time(10), venue='Hall')
+        self.assertEqual(len(calls), 2)
+        self.assertEqual([s.session_number for s in result.sessions], [2, 3, 4])
+        self.assertEqual(AttendanceSession.objects.filter(unit=self.unit).count(), 4)
+
+
+class ConcurrentSessionCreateTests(TransactionTestCase):
+    def test_parallel_creates_all_succeed_with_distinct_numbers(self):
+        # Each thread opens its own connection, which an in-memory SQLite test database cannot share.
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('Needs a test database that several connections can open.')
+        lecturer, unit = _unit('parallel')
+        barrier = threading.Barrier(8)
+        errors = []
+
+        def create(hour):
+            try:
+                barrier.wait()
+                save_numbered_session(AttendanceSession(
+                    unit=unit, lecturer=lecturer, date=date(2025, 3, 3), start_time=time(hour),
+                    end_time=time(hour, 30), venue='Hall',
+                ))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=create, args=(8 + i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        numbers = sorted(AttendanceSession.objects.filter(unit=unit).values_list('session_number', flat=True))
+        self.assertEqual(numbers, list(range(1, 9)))
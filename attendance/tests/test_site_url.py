@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from attendance.models import Lecturer, Unit
+from attendance.site_url import configured_base_url, public_base_url
+
+
+class PublicBaseUrlTests(TestCase):
+    def setUp(self):
+        configured_base_url.cache_clear()
+        self.addCleanup(configured_base_url.cache_clear)
+
+    @override_settings(SITE_BASE_URL='https://attend.example.ac.ke/')
+    def test_configured_url_is_resolved_once(self):
+        with patch('attendance.site_url._lan_ip') as lan_ip:
+            self.assertEqual(public_base_url(), 'https://attend.example.ac.ke')
+            self.assertEqual(public_base_url(RequestFactory().get('/')), 'https://attend.example.ac.ke')
+        lan_ip.assert_not_called()
+        self.assertEqual(configured_base_url.cache_info().misses, 1)
+
+    @override_settings(SITE_BASE_URL='http://127.0.0.1:8000', DEBUG=True)
+    @patch('attendance.site_url._lan_ip', return_value='192.168.1.20')
+    def test_loopback_becomes_lan_address_in_debug(self, lan_ip):
+        self.assertEqual(public_base_url(), 'http://192.168.1.20:8000')
+        public_base_url()
+        lan_ip.assert_called_once()
+
+    @override_settings(SITE_BASE_URL='http://127.0.0.1:8000', DEBUG=False, ALLOWED_HOSTS=['attend.example.org'])
+    def test_loopback_outside_debug_uses_the_request_host(self):
+        request = RequestFactory().get('/', HTTP_HOST='attend.example.org')
+        self.assertEqual(public_base_url(request), 'http://attend.example.org')
+        self.assertEqual(public_base_url(), 'http://127.0.0.1:8000')
+
+    def test_settings_change_clears_the_cache(self):
+        with override_settings(SITE_BASE_URL='https://one.example'):
+            self.assertEqual(public_base_url(), 'https://one.example')
+        with override_settings(SITE_BASE_URL='https://two.example'):
+            self.assertEqual(public_base_url(), 'https://two.example')
+
+
+@override_settings(SITE_BASE_URL='https://attend.example.ac.ke')
+class CreateSessionBaseUrlTests(TestCase):
+    @patch('attendance.views.render_session_qrs_async')
+    @patch('subprocess.run')
+    def test_create_session_never_spawns_a_process(self, run, render_async):
+        user = User.objects.create_user(username='baseurl', password='secret')
+        lecturer = Lecturer.objects.create(user=user, staff_id='S045', department='CS')
+        unit = Unit.objects.create(code='CS450', name='URLs', lecturer=lecturer)
+        self.client.login(username='baseurl', password='secret')
+        self.client.post(reverse('create_session'), {
+            'unit': unit.pk, 'lecturer_name': 'Dr. URL', 'class_year': 'Year 1', 'semester': 1,
+            'date': '2025-03-03', 'start_time': '08:00', 'end_time': '09:00', 'venue': 'Hall',
+        })
+        run.assert_not_called()
+        self.assertEqual(render_async.call_args.args[1], 'https://attend.example.ac.ke')
@@ -0,0 +1,48 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from attendance.models import AttendanceSession, Lecturer, Unit
+from attendance.storage import minify_css, minify_js
+
+
+class MinifierTests(TestCase):
+    def test_minify_css(self):
+        css = '/* card */\n.card > a,\n.card b {\n    color: red;\n    margin: 0 auto;\n}\n'
+        self.assertEqual(minify_css(css), '.card>a,.card b{color:red;margin:0 auto}\n')
+
+    def test_minify_js_keeps_line_breaks(self):
+        js = '// setup\nconst a = 1\n\n    const b = "x // y"\n'
+        self.assertEqual(minify_js(js), 'const a = 1\nconst b = "x // y"\n')
+
+
+class StaticBundleTests(TestCase):
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_attend_page_links_bundles_instead_of_inlining(self):
+        user = User.objects.create_user(username='static', password='secret')
+        lecturer = Lecturer.objects.create(user=user, staff_id='S039', department='CS')
+        unit = Unit.objects.create(code='CS390', name='Static', lecturer=lecturer)
+        session = AttendanceSession.objects.create(unit=unit, lecturer=lecturer, date='2025-03-03',
+                                                   start_time='08:00', end_time='09:00', venue='Hall')
+        resp = self.client.get(reverse('student_attend', args=[session.id]))
+        self.assertContains(resp, '/static/attendance/css/attend.css')
+        self.assertContains(resp, '/static/attendance/js/attend.js')
+        self.assertNotContains(resp, '<style>')
+
+    def test_collectstatic_minifies_hashes_and_compresses(self):
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root)
+        with override_settings(STATIC_ROOT=root,
+                               STATICFILES_STORAGE='attendance.storage.MinifiedManifestStaticFilesStorage'):
+            call_command('collectstatic', interactive=False, verbosity=0)
+        manifest = json.loads((root / 'staticfiles.json').read_text())['paths']
+        hashed = root / manifest['attendance/css/attend.css']
+        self.assertNotEqual(hashed.name, 'attend.css')
+        self.assertNotIn('\n    ', hashed.read_text())
+        self.assertTrue(hashed.with_name(hashed.name + '.gz').exists())
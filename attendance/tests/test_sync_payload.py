@@ -0,0 +1,65 @@
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from attendance.models import AttendanceSession, Lecturer, Student, Unit
+from attendance.sync_payload import session_snapshot
+from attendance.sync_service import DualSyncService
+
+
+class SessionSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='snap', first_name='Ada', last_name='Lovelace')
+        self.lecturer = Lecturer.objects.create(user=user, staff_id='S049', department='CS')
+        self.unit = Unit.objects.create(code='CS490', name='Payloads', lecturer=self.lecturer)
+        self.session = AttendanceSession.objects.create(unit=self.unit, lecturer=self.lecturer, date='2025-03-03',
+                                                        start_time='08:00', end_time='09:00', venue='Hall')
+
+    def test_snapshot_is_built_once_and_read_only(self):
+        with self.assertNumQueries(1):
+            snapshot = session_snapshot(self.session.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(session_snapshot(self.session.pk), snapshot)
+        self.assertEqual(snapshot['lecturer_name'], self.lecturer.user.get_full_name())
+        self.assertEqual(snapshot['lecturer_id'], 'S049')
+        self.assertEqual(snapshot['time_slot'], '08:00:00 - 09:00:00')
+        with self.assertRaises(TypeError):
+            snapshot['venue'] = 'Elsewhere'
+
+    def test_session_and_unit_edits_drop_the_snapshot(self):
+        session_snapshot(self.session.pk)
+        self.session.venue = 'Lab C'
+        self.session.save()
+        self.assertEqual(session_snapshot(self.session.pk)['venue'], 'Lab C')
+        self.unit.name = 'Renamed'
+        self.unit.save()
+        self.assertEqual(session_snapshot(self.session.pk)['unit_name'], 'Renamed')
+
+    @patch('attendance.sync_service.requests.post')
+    def test_dual_sync_only_looks_up_student_fields_per_record(self, post):
+        post.return_value.json.return_value = {'success': True, 'id': 'portal-1'}
+        service = DualSyncService()
+        service.firebase = MagicMock()
+        service.firebase.save_attendance.return_value = {'success': True, 'document_id': 'S049'}
+        service.portal.enabled = True
+
+        students = [Student.objects.create(name=f'Student {i}', admission_number=f'ADM/49/{i}') for i in range(2)]
+        service.sync_attendance(students[0], AttendanceSession.objects.get(pk=self.session.pk))
+        with CaptureQueriesContext(connection) as ctx:
+            result = service.sync_attendance(students[1], AttendanceSession.objects.get(pk=self.session.pk))
+        self.assertTrue(result['success'])
+        tables = ' '.join(q['sql'] for q in ctx.captured_queries)
+        self.assertNotIn('auth_user', tables)
+        self.assertNotIn('attendance_unit', tables)
+
+        fb_payload = service.firebase.save_attendance.call_args.args[1]
+        self.assertEqual(fb_payload['admission_number'], 'ADM/49/1')
+        self.assertEqual(fb_payload['unit_code'], 'CS490')
+        portal_payload = post.call_args.kwargs['json']['attendance']
+        self.assertEqual(portal_payload['lecturer_name'], 'Ada Lovelace')
+        self.assertEqual(portal_payload['venue'], 'Hall')
@@ -0,0 +1,89 @@
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from attendance.backup import _upgrade_row
+from attendance.models import Attendance, AttendanceSession, Lecturer, Student, SyncAttempt, SyncStatus, Unit
+from attendance.sync_service import DualSyncService
+from attendance.sync_status import PRUNE_LOCK_KEY, prune_sync_attempts, record_sync_result, status_from_result
+
+SYNCED = {'success': True, 'document_id': 'doc-1'}
+SKIPPED = {'success': False, 'skipped': True, 'error': 'not configured'}
+FAILED = {'success': False, 'error': 'timeout'}
+
+
+class SyncStatusTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='sync050')
+        lecturer = Lecturer.objects.create(user=user, staff_id='S050', department='CS')
+        unit = Unit.objects.create(code='CS500', name='Sync', lecturer=lecturer)
+        self.session = AttendanceSession.objects.create(unit=unit, lecturer=lecturer, date='2025-03-03',
+                                                        start_time='08:00', end_time='09:00')
+        self.student = Student.objects.create(name='Student', admission_number='ADM/50/1')
+        self.attendance = Attendance.objects.create(student=self.student, session=self.session)
+
+    def test_status_from_result(self):
+        self.assertEqual(status_from_result(SYNCED), SyncStatus.SYNCED)
+        self.assertEqual(status_from_result(SKIPPED), SyncStatus.SKIPPED)
+        self.assertEqual(status_from_result(FAILED), SyncStatus.FAILED)
+        self.assertEqual(status_from_result({'success': True}), SyncStatus.FAILED)
+
+    def test_success_is_one_update_and_no_log_rows(self):
+        with self.assertNumQueries(1):
+            record_sync_result(self.attendance.pk, SYNCED, SKIPPED)
+        self.attendance.refresh_from_db()
+        self.assertEqual(self.attendance.firebase_status, SyncStatus.SYNCED)
+        self.assertEqual(self.attendance.portal_status, SyncStatus.SKIPPED)
+        self.assertTrue(self.attendance.synced_to_firebase)
+        self.assertFalse(self.attendance.synced_to_portal)
+        self.assertEqual(self.attendance.sync_attempts, 1)
+        self.assertIsNotNone(self.attendance.last_sync_at)
+        self.assertFalse(SyncAttempt.objects.exists())
+
+    def test_failures_are_logged_and_attempts_counted(self):
+        cache.add(PRUNE_LOCK_KEY, True)
+        record_sync_result(self.attendance.pk, FAILED, SYNCED)
+        record_sync_result(self.attendance.pk, FAILED, {'success': False, 'error': 'x' * 900})
+        self.attendance.refresh_from_db()
+        self.assertEqual(self.attendance.sync_attempts, 2)
+        self.assertEqual(self.attendance.portal_status, SyncStatus.FAILED)
+        attempts = SyncAttempt.objects.filter(attendance_id=self.attendance.pk)
+        self.assertEqual(attempts.filter(target=SyncAttempt.TARGET_FIREBASE, error='timeout').count(), 2)
+        self.assertEqual(len(attempts.get(target=SyncAttempt.TARGET_PORTAL).error), 500)
+
+    def test_prune_by_age_and_row_cap(self):
+        SyncAttempt.objects.bulk_create(
+            SyncAttempt(attendance_id=self.attendance.pk, target=SyncAttempt.TARGET_PORTAL,
+                        status=SyncStatus.FAILED, error=str(i))
+            for i in range(6)
+        )
+        SyncAttempt.objects.filter(error='0').update(created_at=timezone.now() - timedelta(days=30))
+        self.assertEqual(prune_sync_attempts(retention_days=14, max_rows=3), 3)
+        self.assertEqual(list(SyncAttempt.objects.values_list('error', flat=True)), ['5', '4', '3'])
+
+    @override_settings(SYNC_ATTEMPT_MAX_ROWS=1)
+    def test_logging_prunes_at_most_once_per_interval(self):
+        record_sync_result(self.attendance.pk, FAILED, FAILED)
+        self.assertEqual(SyncAttempt.objects.count(), 1)
+        record_sync_result(self.attendance.pk, FAILED, FAILED)
+        self.assertEqual(SyncAttempt.objects.count(), 3)
+
+    def test_dual_sync_records_status(self):
+        service = DualSyncService()
+        service.firebase = MagicMock()
+        service.firebase.save_attendance.return_value = SYNCED
+        service.portal.enabled = False
+        service.sync_attendance(self.student, self.session)
+        self.attendance.refresh_from_db()
+        self.assertEqual(self.attendance.firebase_status, SyncStatus.SYNCED)
+        self.assertEqual(self.attendance.portal_status, SyncStatus.SKIPPED)
+
+    def test_legacy_backup_columns_are_translated(self):
+        row = _upgrade_row(Attendance, {'id': 1, 'synced_to_firebase': True, 'synced_to_portal': False,
+                                        'firebase_doc_id': 'x', 'portal_response': {}})
+        self.assertEqual(row, {'id': 1, 'firebase_status': SyncStatus.SYNCED, 'portal_status': SyncStatus.PENDING})
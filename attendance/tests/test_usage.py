@@ -0,0 +1,63 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from attendance import usage
+from attendance.firebase_service import get_firebase_service
+from attendance.firestore_fake import FakeFirestoreClient
+from attendance.models import AttendanceSession, Lecturer, Unit
+
+
+class LecturerUsageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.fake = FakeFirestoreClient()
+        fb = get_firebase_service(client=self.fake)
+        self.addCleanup(fb.use_client, None)
+        batch = self.fake.batch()
+        for i in range(7):
+            batch.set(self.fake.collection('lecturer_usage').document(f'L{i}'), {'lecturer_name': f'Dr {i}', 'usage_count': i})
+        batch.commit()
+        self.fake.round_trips.clear()
+
+    def test_reads_are_paginated_and_sorted(self):
+        docs = usage.fetch_firestore_usage(self.fake, page_size=3)
+        self.assertEqual([d['usage_count'] for d in docs], [6, 5, 4, 3, 2, 1, 0])
+        self.assertEqual(self.fake.round_trips['stream'], 3)
+
+    def test_stale_entry_is_served_while_one_refresh_runs(self):
+        first = usage.get_lecturer_usage()
+        self.assertEqual(len(first['docs']), 7)
+        self.assertFalse(first['stale'])
+        reads = self.fake.round_trips['stream']
+
+        self.assertEqual(usage.get_lecturer_usage()['docs'], first['docs'])
+        self.assertEqual(self.fake.round_trips['stream'], reads)
+
+        self.fake.collection('lecturer_usage').document('L9').set({'lecturer_name': 'Dr 9', 'usage_count': 9})
+        later = first['fetched_at'] + usage.usage_fresh_seconds() + 1
+        with patch('attendance.usage.time.time', return_value=later), \
+                patch.object(usage, '_spawn_refresh') as spawn:
+            stale = usage.get_lecturer_usage()
+            usage.get_lecturer_usage()
+        self.assertTrue(stale['stale'])
+        self.assertEqual(len(stale['docs']), 7)
+        spawn.assert_called_once()
+
+        usage._refresh_in_background()
+        self.assertEqual(usage.get_lecturer_usage()['docs'][0]['lecturer_id'], 'L9')
+        self.assertIsNone(cache.get(usage.USAGE_LOCK_KEY))
+
+    def test_local_usage_is_one_cached_query(self):
+        user = User.objects.create_user(username='busy', first_name='Busy', last_name='Lecturer')
+        lecturer = Lecturer.objects.create(user=user, staff_id='S035', department='CS')
+        unit = Unit.objects.create(code='CS350', name='Usage', lecturer=lecturer)
+        AttendanceSession.objects.create(unit=unit, lecturer=lecturer, date='2025-03-03', start_time='08:00',
+                                         end_time='09:00', venue='Hall')
+        with self.assertNumQueries(1):
+            self.assertEqual(usage.get_local_usage(), [('Busy Lecturer', 1)])
+        with self.assertNumQueries(0):
+            usage.get_local_usage()
@@ -18,12 +18,18 @@ urlpatterns = [
     # Lecturer dashboard
     path('dashboard/', views.lecturer_dashboard, name='dashboard'),
     path('session/create/', views.create_session, name='create_session'),
+    path('session/schedule/', views.create_schedule, name='create_schedule'),
     path('session/<uuid:session_id>/', views.session_detail, name='session_detail'),
     path('session/<uuid:session_id>/toggle/', views.toggle_session, name='toggle_session'),
     path('session/<uuid:session_id>/download-qr/', views.download_qr, name='download_qr'),
     path('unit/create-ajax/', views.create_unit_ajax, name='create_unit_ajax'),
     path('unit/create/', views.create_unit, name='create_unit'),
+    path('unit/<int:unit_id>/export/', views.export_attendance, name='export_attendance'),
+    path('unit/<int:unit_id>/matrix/', views.unit_attendance_matrix, name='unit_attendance_matrix'),
+    path('unit/<int:unit_id>/roster/', views.import_roster_upload, name='import_roster'),
     
+    path('reports/eligibility/', views.eligibility_report, name='eligibility_report'),
+
     # API
     path('api/status/', views.api_status, name='api_status'),
     
@@ -0,0 +1,124 @@
+"""
+Cached lecturer usage statistics for the staff usage page.
+
+Firestore `lecturer_usage` documents are read in pages (order_by document id,
+`limit` + `start_after`) and cached with stale-while-revalidate: a fresh
+entry is served as is, a stale one is served immediately while a single
+background thread re-reads Firestore. Local per-lecturer session counts come
+from one aggregate query, cached briefly.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .firebase_service import get_firebase_service
+from .models import Lecturer
+
+logger = logging.getLogger(__name__)
+
+USAGE_CACHE_KEY = 'lecturer_usage:firestore'
+USAGE_LOCK_KEY = 'lecturer_usage:firestore:refreshing'
+LOCAL_USAGE_CACHE_KEY = 'lecturer_usage:local'
+USAGE_READ_PAGE_SIZE = 300
+# Stale entries are still served for this long while a refresh runs.
+USAGE_STALE_SECONDS = 24 * 60 * 60
+USAGE_LOCK_SECONDS = 120
+
+
+def usage_fresh_seconds():
+    return getattr(settings, 'LECTURER_USAGE_CACHE_SECONDS', 60)
+
+
+def fetch_firestore_usage(db, page_size=USAGE_READ_PAGE_SIZE):
+    """Read every `lecturer_usage` doc in pages; returns rows sorted by usage, busiest first."""
+    collection = db.collection('lecturer_usage')
+    docs = []
+    last = None
+    while True:
+        query = collection.order_by('__name__').limit(page_size)
+        if last is not None:
+            query = query.start_after(last)
+        page = list(query.stream())
+        for d in page:
+            payload = d.to_dict() or {}
+            docs.append({
+                'lecturer_id': d.id,
+                'lecturer_name': payload.get('lecturer_name'),
+                'usage_count': payload.get('usage_count', 0),
+                'last_active': payload.get('last_active'),
+            })
+        if len(page) < page_size:
+            break
+        last = page[-1]
+    docs.sort(key=lambda doc: doc['usage_count'] or 0, reverse=True)
+    return docs
+
+
+def refresh_lecturer_usage():
+    """Re-read Firestore and replace the cached entry. Keeps the old rows if the read fails."""
+    fb = get_firebase_service()
+    entry = {'docs': [], 'error': None, 'fetched_at': time.time()}
+    if fb.is_connected:
+        try:
+            entry['docs'] = fetch_firestore_usage(fb.db)
+        except Exception as e:
+            logger.warning('Could not read lecturer_usage from Firestore', exc_info=True)
+            previous = cache.get(USAGE_CACHE_KEY)
+            entry['docs'] = previous['docs'] if previous else []
+            entry['error'] = str(e)
+    cache.set(USAGE_CACHE_KEY, entry, USAGE_STALE_SECONDS)
+    return entry
+
+
+def _refresh_in_background():
+    try:
+        refresh_lecturer_usage()
+    finally:
+        cache.delete(USAGE_LOCK_KEY)
+
+
+def _spawn_refresh():
+    t = threading.Thread(target=_refresh_in_background, daemon=True)
+    t.start()
+    return t
+
+
+def get_lecturer_usage():
+    """
+    Cached Firestore usage rows: {'docs', 'error', 'fetched_at', 'stale'}.
+
+    Only the first request after a cold cache waits for Firestore. Later
+    requests get the cached rows; once they are older than
+    LECTURER_USAGE_CACHE_SECONDS one request (guarded by `cache.add`) starts a
+    background refresh and everyone keeps getting the stale rows until it lands.
+    """
+    entry = cache.get(USAGE_CACHE_KEY)
+    if entry is None:
+        entry = refresh_lecturer_usage()
+        return dict(entry, stale=False)
+    stale = time.time() - entry['fetched_at'] > usage_fresh_seconds()
+    if stale and cache.add(USAGE_LOCK_KEY, True, USAGE_LOCK_SECONDS):
+        _spawn_refresh()
+    return dict(entry, stale=stale)
+
+
+def get_local_usage():
+    """[(lecturer name, session count)] for lecturers with sessions, busiest first, from one query."""
+    rows = cache.get(LOCAL_USAGE_CACHE_KEY)
+    if rows is None:
+        qs = (
+            Lecturer.objects.annotate(session_count=Count('sessions'))
+            .filter(session_count__gt=0)
+            .order_by('-session_count', 'user__last_name')
+            .values_list('user__first_name', 'user__last_name', 'user__username', 'session_count')
+        )
+        rows = [
+            (f'{first} {last}'.strip() or username, count)
+            for first, last, username, count in qs
+        ]
+        cache.set(LOCAL_USAGE_CACHE_KEY, rows, usage_fresh_seconds())
+    return rows
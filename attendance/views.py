@@ -2,7 +2,7 @@
 Views for Digital Attendance System.
 """
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login, authenticate, logout
 from django.contrib import messages
@@ -11,8 +11,10 @@ from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 from django.conf import settings
 from django.db import DatabaseError
+from django.core.paginator import Paginator
 import json
 import threading
+from datetime import datetime, timezone as dt_timezone
 from django.core.cache import cache
 
 import logging
@@ -25,32 +27,45 @@ def healthz(request):
 
 
 def _session_qr_png_bytes(request, session):
-    """Build PNG bytes for a session QR (uses public SITE_BASE_URL when set)."""
-    base = (getattr(settings, 'SITE_BASE_URL', '') or '').strip().rstrip('/')
-    if not base:
-        base = request.build_absolute_uri('/')[:-1]
-    qr_file = generate_session_qr(session, base)
-    qr_file.seek(0)
-    return qr_file.read()
+    """Build PNG bytes for a session QR pointing at the public base URL."""
+    return session_qr_png(session, public_base_url(request))
 
 from .models import Lecturer, Unit, AttendanceSession, Student, Attendance
-from .forms import AttendanceSessionForm, StudentAttendanceForm, UnitForm
+from .forms import AttendanceSessionForm, SessionScheduleForm, StudentAttendanceForm, UnitForm
+from .admission import get_admission_controller
+from .idempotency import clean_idempotency_key, remember_response, replay_response
 from .firebase_service import get_firebase_service
-from .sync_service import get_dual_sync_service
-from .qr_generator import generate_session_qr
+from .exports import EXPORT_FORMATS, attendance_rows, export_filename, stream_csv, stream_export
+from .pagecache import cached_public_page, closed_session_key, is_public_request, render_public_page
+from .qr_tasks import qr_cache_key, render_session_qrs_async, session_qr_png
+from .roster import RosterError, import_roster, push_roster_to_portal, read_roster
+from .schedule import (
+    DuplicateSessionError, SemesterFullError, build_schedule, save_numbered_session, schedule_dates,
+)
+from .site_url import public_base_url
+from .usage import get_lecturer_usage, get_local_usage
+from .reports import (
+    ELIGIBILITY_HEADER, SESSION_NUMBERS, build_attendance_matrix, default_threshold,
+    eligibility_csv_row, get_eligibility_report,
+)
 
 # Firebase Auth token-exchange and signup UI
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.contrib.auth import login as django_login
 from django.contrib.auth.models import User
-# Firebase auth is optional at runtime; don't crash app import if unavailable.
-try:
-    import firebase_admin
-    from firebase_admin import auth as fb_auth
-except Exception:
-    firebase_admin = None
-    fb_auth = None
+
+# firebase_admin, sync_service (requests) and qr_generator (qrcode, PIL) are
+# imported inside the views that use them: importing them here would add
+# several hundred milliseconds to every serverless cold start.
+def _firebase_auth():
+    """Return `firebase_admin.auth`, or None when Firebase auth is not installed."""
+    try:
+        from firebase_admin import auth
+    except Exception:
+        return None
+    return auth
+
 import json
 from django.http import JsonResponse
 
@@ -59,8 +74,14 @@ from django.http import JsonResponse
 
 
 def home(request):
-    """Landing page."""
-    return render(request, 'attendance/home.html')
+    """Landing page. Anonymous visitors get a shared, cacheable rendering."""
+    if not is_public_request(request):
+        return render(request, 'attendance/home.html')
+    max_age = getattr(settings, 'HOME_PAGE_MAX_AGE', 300)
+    return (
+        cached_public_page(request, 'home', max_age)
+        or render_public_page(request, 'home', 'attendance/home.html', {}, max_age)
+    )
 
 
 def student_attend(request, session_id):
@@ -68,10 +89,41 @@ def student_attend(request, session_id):
     Student attendance page - accessed via QR code scan.
     Shows session info and form to input student details.
     """
-    session = get_object_or_404(AttendanceSession, id=session_id)
+    idempotency_key = None
+    if request.method == 'POST':
+        # A retried submission that already succeeded gets its stored page back.
+        idempotency_key = clean_idempotency_key(request.POST.get('idempotency_key'))
+        replay = replay_response(session_id, idempotency_key, request.POST.get('admission_number'))
+        if replay is not None:
+            return replay
+
+        # Shed scan bursts before touching the database; the page retries after Retry-After.
+        retry_after = get_admission_controller().acquire(str(session_id))
+        if retry_after:
+            response = HttpResponse(
+                f'Too many students are submitting right now. Please retry in {retry_after} seconds.',
+                status=429, content_type='text/plain; charset=utf-8',
+            )
+            response['Retry-After'] = str(retry_after)
+            return response
+
+    # Stale QR scans of a closed session are answered from the page cache without a query.
+    public = is_public_request(request)
+    closed_max_age = getattr(settings, 'CLOSED_SESSION_PAGE_MAX_AGE', 60)
+    if public:
+        cached = cached_public_page(request, closed_session_key(session_id), closed_max_age)
+        if cached is not None:
+            return cached
+
+    session = get_object_or_404(AttendanceSession.objects.select_related('unit', 'lecturer__user'), id=session_id)
     
     # Check if session is still active
     if not session.is_active:
+        if public:
+            return render_public_page(
+                request, closed_session_key(session_id), 'attendance/session_closed.html',
+                {'session': session}, closed_max_age,
+            )
         return render(request, 'attendance/session_closed.html', {
             'session': session
         })
@@ -134,11 +186,13 @@ def student_attend(request, session_id):
                     pass
             threading.Thread(target=_bg_sync, args=(attendance.id,), daemon=True).start()
 
-            return render(request, 'attendance/success.html', {
+            response = render(request, 'attendance/success.html', {
                 'session': session,
                 'student_name': student_name,
                 'attendance_percentage': attendance_percentage,
             })
+            remember_response(session.id, idempotency_key, admission_number, response)
+            return response
     else:
         form = StudentAttendanceForm()
     
@@ -179,34 +233,16 @@ def lecturer_usage_admin(request):
         messages.error(request, 'Permission denied')
         return redirect('dashboard')
 
-    fb = get_firebase_service()
-    fb_error = None
-    lecturer_docs = []
-
-    if fb.is_connected:
-        try:
-            docs = fb.db.collection('lecturer_usage').stream()
-            for d in docs:
-                payload = d.to_dict() or {}
-                lecturer_docs.append({
-                    'lecturer_id': d.id,
-                    'lecturer_name': payload.get('lecturer_name'),
-                    'usage_count': payload.get('usage_count', 0),
-                    'last_active': payload.get('last_active'),
-                })
-        except Exception as e:
-            fb_error = str(e)
-
-    # Local DB fallback: lecturers with at least one session
-    from django.db.models import Count
-    local_lecturers = Lecturer.objects.annotate(session_count=Count('sessions')).filter(session_count__gt=0)
-    local_count = local_lecturers.count()
+    usage = get_lecturer_usage()
+    local_usage = get_local_usage()
 
     return render(request, 'admin/lecturer_usage.html', {
-        'lecturer_docs': lecturer_docs,
-        'fb_error': fb_error,
-        'local_count': local_count,
-        'local_lecturers': local_lecturers,
+        'lecturer_docs': Paginator(usage['docs'], 50).get_page(request.GET.get('page')),
+        'fb_error': usage['error'],
+        'fb_stale': usage['stale'],
+        'fb_fetched_at': datetime.fromtimestamp(usage['fetched_at'], tz=dt_timezone.utc),
+        'local_count': len(local_usage),
+        'local_lecturers': Paginator(local_usage, 50).get_page(request.GET.get('local_page')),
     })
 
 
@@ -226,6 +262,7 @@ def firebase_login(request):
     if not id_token:
         return JsonResponse({'success': False, 'error': 'idToken required'}, status=400)
 
+    fb_auth = _firebase_auth()
     if fb_auth is None:
         return JsonResponse({'success': False, 'error': 'Firebase auth is not configured on server'}, status=503)
 
@@ -259,23 +296,19 @@ def firebase_login(request):
     # Log the user in (Django session)
     django_login(request, user)
 
-    # Optionally write minimal profile back to Firestore
+    # Optionally write minimal profile back to Firestore; never fail login over it
     try:
         fb = get_firebase_service()
         if fb.is_connected:
-            try:
-                # Lazy import to avoid circular deps
-                from firebase_admin import firestore as fb_fs
-                fb.db.collection('lecturer_profiles').document(uid).set({
-                    'email': email,
-                    'name': decoded.get('name', ''),
-                    'created_at': fb_fs.SERVER_TIMESTAMP if hasattr(fb_fs, 'SERVER_TIMESTAMP') else None,
-                }, merge=True)
-            except Exception:
-                pass
+            fb.db.collection('lecturer_profiles').document(uid).set({
+                'email': email,
+                'name': decoded.get('name', ''),
+                'created_at': fb.firestore.SERVER_TIMESTAMP,
+            }, merge=True)
     except Exception:
-        # Don't fail login on token verification errors
-        return JsonResponse({'success': False, 'error': 'token verification failed'}, status=400)
+        logger.warning('Could not write lecturer profile for %s to Firestore', uid, exc_info=True)
+
+    return JsonResponse({'success': True, 'created': created, 'username': user.username})
 
 
 def firebase_signup_page(request):
@@ -314,91 +347,25 @@ def create_session(request):
                 session = form.save(commit=False)
                 session.lecturer = lecturer
                 
-                # Check if a duplicate session already exists (same unit, semester, date, time)
-                existing_same_time = AttendanceSession.objects.filter(
-                    unit=session.unit,
-                    semester=session.semester,
-                    date=session.date,
-                    start_time=session.start_time
-                ).exists()
-                if existing_same_time:
-                    messages.error(request, 'A session for this unit and semester at the same date/time already exists.')
+                # Numbers are allocated against the unique constraint, so a
+                # concurrent create for the same unit just retries.
+                try:
+                    save_numbered_session(session)
+                except DuplicateSessionError as e:
+                    messages.error(request, str(e))
                     form.add_error(None, 'Duplicate session time detected.')
                     return render(request, 'attendance/create_session.html', {'form': form})
-                
-                # Assign the next available session_number (1..13) for this unit and semester
-                used_numbers = set(
-                    AttendanceSession.objects.filter(
-                        unit=session.unit,
-                        semester=session.semester
-                    ).exclude(session_number__isnull=True).values_list('session_number', flat=True)
-                )
-                next_num = None
-                for n in range(1, 14):
-                    if n not in used_numbers:
-                        next_num = n
-                        break
-                
-                if not next_num:
-                    messages.error(request, f'This unit already has 13 sessions for Semester {session.semester}. Cannot add more.')
+                except SemesterFullError as e:
+                    messages.error(request, f'{e} Cannot add more.')
                     form.add_error(None, 'Maximum sessions (13) reached for this semester.')
                     return render(request, 'attendance/create_session.html', {'form': form})
-                
-                session.session_number = next_num
-                session.save()
-                
-                # Generate QR code
-                # Build a base URL that is reachable from other devices on the same network.
-                # Detect the actual LAN IP from the request if available
-                base_url = request.build_absolute_uri('/')[:-1]
-                try:
-                    host = request.get_host().split(':')[0]
-                except Exception:
-                    host = ''
-
-                # If running on localhost or 0.0.0.0, detect the actual LAN IP
-                if host in ('127.0.0.1', 'localhost', '0.0.0.0') or host == '' or settings.DEBUG:
-                    try:
-                        import socket
-                        import subprocess
-                        
-                        # First, try to get the LAN IP by parsing ipconfig output (Windows)
-                        local_ip = None
-                        try:
-                            result = subprocess.run(['ipconfig'], capture_output=True, text=True, timeout=5)
-                            # Look for Wi-Fi adapter's IPv4 Address
-                            for line in result.stdout.split('\n'):
-                                if 'IPv4 Address' in line and '192.168' in line:
-                                    parts = line.split(':')
-                                    if len(parts) > 1:
-                                        local_ip = parts[1].strip()
-                                        break
-                        except Exception:
-                            pass
-                        
-                        # Fallback: use socket method
-                        if not local_ip:
-                            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                            try:
-                                # Connect to a remote host (doesn't need to be reachable)
-                                s.connect(('1.1.1.1', 80))
-                                local_ip = s.getsockname()[0]
-                            finally:
-                                s.close()
-                        
-                        if local_ip and local_ip != '127.0.0.1':
-                            port = request.get_port()
-                            base_url = f"http://{local_ip}:{port}"
-                    except Exception:
-                        # If all detection fails, use the original URL
-                        base_url = request.build_absolute_uri('/')[:-1]
-
-                # Generate and save QR code
-                qr_file = generate_session_qr(session, base_url)
-                session.qr_code.save(qr_file.name, qr_file)
-                
+
+                # Render and upload the QR code in the background; session_detail
+                # serves it from the render cache until the upload lands.
+                render_session_qrs_async([session.id], public_base_url(request))
+
                 # Add success message and redirect to session detail
-                messages.success(request, 'Session created successfully! QR code generated.')
+                messages.success(request, 'Session created successfully! QR code is being generated.')
                 return redirect('session_detail', session_id=session.id)
             
             except Exception as e:
@@ -418,6 +385,49 @@ def create_session(request):
     })
 
 
+@login_required
+def create_schedule(request):
+    """Create a unit's sessions for the semester from a weekly pattern."""
+    try:
+        lecturer = request.user.lecturer
+    except Lecturer.DoesNotExist:
+        messages.error(request, 'You are not registered as a lecturer.')
+        return redirect('home')
+
+    form = SessionScheduleForm(request.POST or None)
+    form.fields['unit'].queryset = Unit.objects.filter(lecturer=lecturer)
+    if request.method == 'POST' and form.is_valid():
+        data = form.cleaned_data
+        dates = schedule_dates(data['start_date'], data['end_date'], data['weekdays'])
+        try:
+            result = build_schedule(
+                data['unit'], lecturer, data['semester'], dates, data['start_time'], data['end_time'],
+                venue=data['venue'], lecturer_name=data['lecturer_name'], class_year=data['class_year'],
+            )
+        except DatabaseError:
+            logger.exception('Schedule creation failed for unit %s', data['unit'].pk)
+            messages.error(request, 'Could not create the schedule. Please try again.')
+            return render(request, 'attendance/create_schedule.html', {'form': form})
+
+        if result.sessions:
+            render_session_qrs_async([s.id for s in result.sessions], public_base_url(request))
+            messages.success(request, f'Created {len(result.sessions)} session(s). QR codes are being generated.')
+        else:
+            messages.warning(request, 'No new sessions were created.')
+        if result.existing:
+            messages.info(request, f'{len(result.existing)} date(s) already had a session at that time and were skipped.')
+        if result.overflow:
+            messages.warning(
+                request,
+                f'{len(result.overflow)} date(s) were left out: Semester {data["semester"]} already has 13 sessions.',
+            )
+        return redirect('dashboard')
+    elif request.method == 'POST':
+        messages.error(request, 'Please correct the errors below.')
+
+    return render(request, 'attendance/create_schedule.html', {'form': form})
+
+
 @login_required
 def session_detail(request, session_id):
     """View session details and QR code."""
@@ -481,6 +491,7 @@ def session_detail(request, session_id):
     attendance_count = len(attendance_records)
     return render(request, 'attendance/session_detail.html', {
         'session': session,
+        'attend_url': f'{public_base_url(request)}/attend/{session.id}/',
         'attendance_records': attendance_records,
         'attendance_count': attendance_count,
     })
@@ -577,10 +588,11 @@ def lecturer_logout(request):
 @login_required
 def download_qr(request, session_id):
     """Download QR code image."""
-    session = get_object_or_404(AttendanceSession, id=session_id)
+    session = get_object_or_404(AttendanceSession.objects.select_related('unit'), id=session_id)
 
-    img_bytes = None
-    if session.qr_code:
+    # A freshly rendered code is in the cache even before its upload finishes.
+    img_bytes = cache.get(qr_cache_key(session.id))
+    if not img_bytes and session.qr_code:
         try:
             img_bytes = session.qr_code.read()
         except (FileNotFoundError, OSError, ValueError):
@@ -609,6 +621,128 @@ def download_qr(request, session_id):
     return redirect('session_detail', session_id=session.id)
 
 
+def _requested_semester(request):
+    """Read `?semester=` from the query string, defaulting to semester 1."""
+    try:
+        semester = int(request.GET.get('semester', 1))
+    except (TypeError, ValueError):
+        return 1
+    return semester if semester in dict(AttendanceSession.SEMESTER_CHOICES) else 1
+
+
+@login_required
+def unit_attendance_matrix(request, unit_id):
+    """Students x session-number attendance grid for a unit and semester."""
+    unit = get_object_or_404(Unit.objects.select_related('lecturer__user'), id=unit_id)
+
+    if not request.user.is_superuser and unit.lecturer.user != request.user:
+        messages.error(request, 'You do not have permission to view this unit.')
+        return redirect('dashboard')
+
+    semester = _requested_semester(request)
+    matrix = build_attendance_matrix(unit, semester)
+    return render(request, 'attendance/unit_matrix.html', {
+        'unit': unit,
+        'semester': semester,
+        'matrix': matrix,
+        'rows': list(matrix.rows()),
+        'student_count': len(matrix),
+        'session_numbers': SESSION_NUMBERS,
+        'session_totals': matrix.session_totals(),
+    })
+
+
+@login_required
+def eligibility_report(request):
+    """Exam eligibility report: students below the attendance threshold per unit and semester."""
+    lecturer_id = None
+    if not request.user.is_staff:
+        try:
+            lecturer_id = request.user.lecturer.id
+        except Lecturer.DoesNotExist:
+            messages.error(request, 'You are not registered as a lecturer.')
+            return redirect('home')
+
+    semester = None if request.GET.get('semester', 'all') == 'all' else _requested_semester(request)
+    try:
+        threshold = min(max(int(request.GET.get('threshold', default_threshold())), 0), 100)
+    except (TypeError, ValueError):
+        threshold = default_threshold()
+    show_all = request.GET.get('show') == 'all'
+
+    report = get_eligibility_report(semester=semester, threshold=threshold)
+    rows = report.rows(at_risk_only=not show_all, lecturer_id=lecturer_id)
+
+    if request.GET.get('format') == 'csv':
+        response = StreamingHttpResponse(
+            stream_csv((eligibility_csv_row(r) for r in rows), header=ELIGIBILITY_HEADER),
+            content_type='text/csv; charset=utf-8',
+        )
+        response['Content-Disposition'] = f'attachment; filename="eligibility_S{semester or "all"}_{threshold}.csv"'
+        return response
+
+    page = Paginator(list(rows), 100).get_page(request.GET.get('page'))
+    return render(request, 'attendance/eligibility_report.html', {
+        'page': page,
+        'semester': semester,
+        'threshold': threshold,
+        'show_all': show_all,
+    })
+
+
+@login_required
+def export_attendance(request, unit_id):
+    """Stream a unit's attendance for one semester as CSV or XLSX."""
+    unit = get_object_or_404(Unit.objects.select_related('lecturer__user'), id=unit_id)
+
+    if not request.user.is_superuser and unit.lecturer.user != request.user:
+        messages.error(request, 'You do not have permission to export this unit.')
+        return redirect('dashboard')
+
+    fmt = request.GET.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        fmt = 'csv'
+    semester = _requested_semester(request)
+
+    content_type, _ = EXPORT_FORMATS[fmt]
+    response = StreamingHttpResponse(
+        stream_export(attendance_rows(unit, semester), fmt),
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(unit, semester, fmt)}"'
+    return response
+
+
+@login_required
+@require_POST
+def import_roster_upload(request, unit_id):
+    """Upsert and enroll a CSV roster of students into a unit, then push it to the portal in the background."""
+    unit = get_object_or_404(Unit.objects.select_related('lecturer__user'), id=unit_id)
+
+    if not request.user.is_superuser and unit.lecturer.user != request.user:
+        messages.error(request, 'You do not have permission to import students into this unit.')
+        return redirect('dashboard')
+
+    upload = request.FILES.get('roster')
+    if upload is None:
+        messages.error(request, 'Choose a roster CSV file to import.')
+        return redirect('dashboard')
+
+    try:
+        result = import_roster(read_roster(upload.file), unit=unit, push_to_portal=False)
+    except (RosterError, UnicodeDecodeError) as e:
+        messages.error(request, f'Could not read roster: {e}')
+        return redirect('dashboard')
+
+    if result.admission_numbers:
+        threading.Thread(target=push_roster_to_portal, args=(result.admission_numbers,), daemon=True).start()
+
+    messages.success(request, f'Imported {result.students} students into {unit.code}.')
+    if result.errors:
+        messages.warning(request, f'{len(result.errors)} rows were skipped (e.g. line {result.errors[0][0]}: {result.errors[0][1]})')
+    return redirect('dashboard')
+
+
 # API endpoint for checking Firebase status
 def api_status(request):
     """Check system status."""
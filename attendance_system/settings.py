@@ -44,7 +44,10 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # Compression wraps minification, so responses are minified first, then compressed.
+    'attendance.middleware.CompressionMiddleware',
+    'attendance.middleware.HtmlMinifyMiddleware',
+    'attendance.middleware.ThrottledSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -107,7 +110,11 @@ else:
 # Increase session age to 30 days (2592000 seconds) so sessions don't expire during lecturer operations
 SESSION_COOKIE_AGE = 2592000  # 30 days
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False  # Keep session open until explicitly logged out
-SESSION_SAVE_EVERY_REQUEST = True  # Update session expiry on every request
+# Rolling expiry without a session write per request: ThrottledSessionMiddleware
+# renews the session only once less than SESSION_REFRESH_THRESHOLD seconds remain
+# (by default, at most once a day per active user).
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_THRESHOLD = SESSION_COOKIE_AGE - 86400
 
 
 # Database: prefer `DATABASE_URL`, fallback to local SQLite.
@@ -119,6 +126,9 @@ def _sqlite_default():
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # A file (not in-memory) test database lets concurrency tests use
+            # several connections at once.
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
 
@@ -174,7 +184,9 @@ if os.getenv('VERCEL') == '1':
     WHITENOISE_USE_FINDERS = True
     WHITENOISE_AUTOREFRESH = True
 else:
-    STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+    # Minifies, content-hashes and pre-compresses (gzip, plus brotli when installed)
+    # our bundles; WhiteNoise serves hashed files with far-future, immutable caching.
+    STATICFILES_STORAGE = 'attendance.storage.MinifiedManifestStaticFilesStorage'
 
 # Media files (QR codes, uploads). Vercel/AWS Lambda style hosts use a read-only
 # app dir; only /tmp is writable — default MEDIA_ROOT there avoids Errno 30.
@@ -205,30 +217,11 @@ elif os.getenv('VERCEL') == '1':
 else:
     FIREBASE_CREDENTIALS_PATH = BASE_DIR / 'firebase-credentials.json'
 
-# Support providing the entire service account JSON via env var:
+# The service account can also be provided entirely via env var:
 # - FIREBASE_CREDENTIALS_JSON: raw JSON string
 # - FIREBASE_CREDENTIALS_JSON_BASE64: base64-encoded JSON string
-firebase_json = os.getenv('FIREBASE_CREDENTIALS_JSON')
-if not firebase_json:
-    firebase_b64 = os.getenv('FIREBASE_CREDENTIALS_JSON_BASE64')
-    if firebase_b64:
-        try:
-            import base64
-            firebase_json = base64.b64decode(firebase_b64).decode('utf-8')
-        except Exception:
-            firebase_json = None
-
-if firebase_json:
-    try:
-        import json
-        # Validate JSON before writing
-        json.loads(firebase_json)
-        # Write to file only if new or different to avoid unnecessary writes
-        if not FIREBASE_CREDENTIALS_PATH.exists() or FIREBASE_CREDENTIALS_PATH.read_text() != firebase_json:
-            FIREBASE_CREDENTIALS_PATH.write_text(firebase_json)
-    except Exception:
-        # Invalid JSON: do not overwrite existing file
-        pass
+# attendance.firebase_service reads these into memory on first use; nothing is
+# written to disk at startup.
 
 # Optional: Firebase Realtime Database URL (only for RTDB). Leave blank for Firestore.
 FIREBASE_DATABASE_URL = os.getenv('FIREBASE_DATABASE_URL', '')
@@ -261,3 +254,55 @@ if os.getenv('USE_GCS', 'False') == 'True':
 # Set via env var `SITE_BASE_URL` in production, otherwise default to localhost.
 SITE_BASE_URL = os.getenv('SITE_BASE_URL', 'http://127.0.0.1:8000')
 
+# Minimum attendance (percent of sessions held) for exam eligibility reports.
+ATTENDANCE_ELIGIBILITY_THRESHOLD = int(os.getenv('ATTENDANCE_ELIGIBILITY_THRESHOLD', '75'))
+
+# Where `archive_attendance` writes closed semesters' attendance (compressed JSONL).
+ATTENDANCE_ARCHIVE_ROOT = Path(os.getenv('ATTENDANCE_ARCHIVE_ROOT', str(BASE_DIR / 'backups' / 'archive')))
+
+# Where `backup_attendance` writes full and incremental database backups (git-ignored;
+# point this outside the project in production).
+ATTENDANCE_BACKUP_ROOT = Path(os.getenv('ATTENDANCE_BACKUP_ROOT', str(BASE_DIR / 'backups')))
+
+# Seconds the staff lecturer-usage page serves cached Firestore stats before refreshing them in the background.
+LECTURER_USAGE_CACHE_SECONDS = int(os.getenv('LECTURER_USAGE_CACHE_SECONDS', '60'))
+
+# Admission control for student attendance submissions, per session: tokens per
+# second and bucket size. Excess submissions get 429 + Retry-After and the attend
+# page retries automatically. Set the rate to 0 to disable.
+ATTEND_ADMISSION_RATE = float(os.getenv('ATTEND_ADMISSION_RATE', '10'))
+ATTEND_ADMISSION_BURST = int(os.getenv('ATTEND_ADMISSION_BURST', '30'))
+
+# Response compression (brotli when the Brotli package is installed, else gzip)
+# and whitespace minification of rendered HTML. See `manage.py benchmark_compression`.
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv('RESPONSE_COMPRESSION_MIN_SIZE', '512'))
+RESPONSE_BROTLI_QUALITY = int(os.getenv('RESPONSE_BROTLI_QUALITY', '5'))
+HTML_MINIFY = os.getenv('HTML_MINIFY', 'True') == 'True'
+
+# Browser/edge cache lifetime (seconds) of public pages rendered for anonymous visitors.
+HOME_PAGE_MAX_AGE = int(os.getenv('HOME_PAGE_MAX_AGE', '300'))
+CLOSED_SESSION_PAGE_MAX_AGE = int(os.getenv('CLOSED_SESSION_PAGE_MAX_AGE', '60'))
+
+# Admin changelists: above this many rows (PostgreSQL planner estimate) unfiltered
+# pages show an estimated total instead of running COUNT(*); and the most records
+# the "resync selected" action will queue at once.
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.getenv('ADMIN_ESTIMATED_COUNT_THRESHOLD', '100000'))
+ADMIN_RESYNC_MAX = int(os.getenv('ADMIN_RESYNC_MAX', '5000'))
+
+# Threads used to render and upload session QR codes in the background, and how
+# long rendered PNGs stay in the cache for the QR view to serve.
+QR_RENDER_WORKERS = int(os.getenv('QR_RENDER_WORKERS', '4'))
+QR_RENDER_CACHE_SECONDS = int(os.getenv('QR_RENDER_CACHE_SECONDS', '3600'))
+
+# How long a completed attendance submission can be replayed to a retry that
+# carries the same idempotency key.
+ATTEND_IDEMPOTENCY_SECONDS = int(os.getenv('ATTEND_IDEMPOTENCY_SECONDS', '600'))
+
+# Lifetime of cached per-session sync payload snapshots (dropped early when the
+# session or its unit is edited).
+SYNC_SNAPSHOT_SECONDS = int(os.getenv('SYNC_SNAPSHOT_SECONDS', '3600'))
+
+# Failed sync attempts are logged to SyncAttempt; rows older than the retention
+# window, or beyond the newest SYNC_ATTEMPT_MAX_ROWS, are pruned.
+SYNC_ATTEMPT_RETENTION_DAYS = int(os.getenv('SYNC_ATTEMPT_RETENTION_DAYS', '14'))
+SYNC_ATTEMPT_MAX_ROWS = int(os.getenv('SYNC_ATTEMPT_MAX_ROWS', '50000'))
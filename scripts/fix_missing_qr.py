@@ -5,9 +5,10 @@ django.setup()
 
 from attendance.models import AttendanceSession
 from attendance.qr_generator import generate_session_qr
+from attendance.site_url import public_base_url
 from django.conf import settings
 
-base_url = getattr(settings, 'SITE_BASE_URL', 'http://127.0.0.1:8000')
+base_url = public_base_url()
 
 sessions = AttendanceSession.objects.exclude(qr_code__isnull=True)
 missing = []
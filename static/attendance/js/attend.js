@@ -0,0 +1,68 @@
+// Auto-focus on first input
+document.getElementById('id_student_name').focus();
+
+const form = document.querySelector('form');
+const btn = document.querySelector('.submit-btn');
+
+function showBusy(label) {
+    btn.innerHTML = `
+        <svg class="spinner" width="20" height="20" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+            <circle cx="12" cy="12" r="10"/>
+        </svg>
+        ${label}
+    `;
+    btn.style.pointerEvents = 'none';
+}
+
+// When many students scan at once the server answers 429 with Retry-After;
+// wait that long (plus jitter so retries spread out) and submit again.
+function retryLater(data, seconds) {
+    let remaining = Math.ceil(seconds + Math.random() * 2);
+    const tick = function() {
+        if (remaining <= 0) {
+            submitAttendance(data);
+            return;
+        }
+        showBusy(`Busy, retrying in ${remaining}s...`);
+        remaining -= 1;
+        setTimeout(tick, 1000);
+    };
+    tick();
+}
+
+// Network failures are retried with the same form data; its idempotency key
+// makes the server replay the result if the first attempt did get through.
+let networkRetries = 0;
+
+function submitAttendance(data) {
+    showBusy('Processing...');
+    fetch(window.location.href, {method: 'POST', body: data, credentials: 'same-origin'})
+        .then(function(resp) {
+            if (resp.status === 429) {
+                retryLater(data, parseInt(resp.headers.get('Retry-After'), 10) || 2);
+                return;
+            }
+            return resp.text().then(function(html) {
+                document.open();
+                document.write(html);
+                document.close();
+            });
+        })
+        .catch(function() {
+            if (networkRetries < 3) {
+                networkRetries += 1;
+                retryLater(data, networkRetries);
+                return;
+            }
+            form.submit();
+        });
+}
+
+form.addEventListener('submit', function(e) {
+    if (!window.fetch || !window.FormData) {
+        showBusy('Processing...');
+        return;
+    }
+    e.preventDefault();
+    submitAttendance(new FormData(form));
+});
@@ -0,0 +1,25 @@
+(function() {
+    const key = 'theme_preference';
+    const body = document.body;
+    const btn = document.getElementById('themeToggle');
+    const icon = btn ? btn.querySelector('i') : null;
+    const apply = (theme) => {
+        body.setAttribute('data-theme', theme);
+        if (icon) {
+            icon.classList.toggle('fa-moon', theme !== 'dark');
+            icon.classList.toggle('fa-sun', theme === 'dark');
+        }
+    };
+    let theme = 'light';
+    try {
+        theme = localStorage.getItem(key) || (window.matchMedia('(prefers-color-scheme: dark)').matches ? 'dark' : 'light');
+    } catch (e) {}
+    apply(theme);
+    if (btn) {
+        btn.addEventListener('click', function() {
+            const next = body.getAttribute('data-theme') === 'dark' ? 'light' : 'dark';
+            apply(next);
+            try { localStorage.setItem(key, next); } catch (e) {}
+        });
+    }
+})();
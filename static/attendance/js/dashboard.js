@@ -0,0 +1,154 @@
+(function(){
+  function getCookie(name) {
+    const v = document.cookie.match('(^|;)\s*' + name + '\s*=\s*([^;]+)');
+    return v ? v.pop() : '';
+  }
+  const openBtn = document.getElementById('open-new-unit');
+  const modal = document.getElementById('newUnitModal');
+  const cancel = document.getElementById('new-unit-cancel');
+  const form = document.getElementById('new-unit-form');
+  const errorsEl = document.getElementById('new-unit-errors');
+  const codeInput = document.getElementById('unit_code');
+  const nameInput = document.getElementById('unit_name');
+  const descInput = document.getElementById('unit_description');
+
+  // Open modal on button click
+  if(openBtn) {
+    openBtn.addEventListener('click', (e) => {
+      e.preventDefault();
+      modal.style.display = 'flex';
+      // Focus first field
+      setTimeout(() => codeInput && codeInput.focus(), 100);
+    });
+  }
+
+  // Close modal
+  if(cancel) {
+    cancel.addEventListener('click', () => {
+      modal.style.display = 'none';
+      errorsEl.innerHTML = '';
+      form.reset();
+    });
+  }
+
+  // Close modal on outside click
+  if(modal) {
+    modal.addEventListener('click', (e) => {
+      if(e.target === modal) {
+        modal.style.display = 'none';
+        errorsEl.innerHTML = '';
+      }
+    });
+  }
+
+  // Form submission
+  if(form) {
+    form.addEventListener('submit', async (e) => {
+      e.preventDefault();
+      errorsEl.innerHTML = '';
+
+      const formData = new FormData(form);
+      const csrfToken = getCookie('csrftoken');
+
+      try {
+        const resp = await fetch('/unit/create-ajax/', {
+          method: 'POST',
+          body: formData,
+          headers: {
+            'X-CSRFToken': csrfToken,
+            'X-Requested-With': 'XMLHttpRequest'
+          },
+          credentials: 'same-origin'
+        });
+
+        const json = await resp.json();
+
+        if(json.success) {
+          // Add unit to list
+          const unitsList = document.querySelector('.units-list');
+          if(unitsList) {
+            const tag = document.createElement('span');
+            tag.className = 'unit-tag';
+            tag.textContent = json.unit.code + ' - ' + json.unit.name;
+            unitsList.prepend(tag);
+          }
+          // Close modal and reset form
+          modal.style.display = 'none';
+          form.reset();
+          if(window.showNotification) {
+            showNotification('Unit created successfully!', 'success');
+          }
+        } else {
+          let html = '';
+          if(json.error === 'not_a_lecturer') {
+            html = '<div style="color:#ff0055;font-weight:900;font-size:1.15rem;">You are not registered as a lecturer. Please contact admin.</div>';
+          } else if(json.errors) {
+            for(const key in json.errors) {
+              const msgs = json.errors[key];
+              if(Array.isArray(msgs)) {
+                html += '<div><strong>' + key + ':</strong> ' + msgs.join(', ') + '</div>';
+              } else {
+                html += '<div><strong>' + key + ':</strong> ' + msgs + '</div>';
+              }
+            }
+          } else if(json.error) {
+            html = '<div>Error: ' + json.error + '</div>';
+          } else {
+            html = '<div>An error occurred. Please try again.</div>';
+          }
+          errorsEl.innerHTML = html;
+        }
+      } catch(err) {
+        console.error('Network error:', err);
+        errorsEl.textContent = 'Network error. Please check your connection.';
+      }
+    });
+  }
+})();
+
+(function(){
+  const openBtn = document.querySelector('.btn-primary.btn-view');
+  const modal = document.getElementById('newSessionModal');
+  const cancel = document.getElementById('new-session-cancel');
+  const form = document.getElementById('new-session-form');
+  const errorsEl = document.getElementById('new-session-errors');
+
+  openBtn && openBtn.addEventListener('click', (e)=>{
+    if(openBtn.textContent.includes('Create Session')){
+      e.preventDefault();
+      modal.style.display = 'flex';
+    }
+  });
+  cancel && cancel.addEventListener('click', ()=>{ modal.style.display='none'; errorsEl.innerHTML=''; form.reset(); });
+
+  form && form.addEventListener('submit', (e)=>{
+    e.preventDefault();
+    errorsEl.innerHTML='';
+    const data = new FormData(form);
+    fetch('/session/create/', {
+      method: 'POST',
+      body: data,
+      headers: {
+        'X-Requested-With': 'XMLHttpRequest',
+        'X-CSRFToken': document.cookie.match('(^|;)\s*csrftoken\s*=\s*([^;]+)')?.pop() || ''
+      }
+    }).then(r=>r.json().then(j=>({ok:r.ok, status:r.status, json:j}))).then(res=>{
+      if(res.ok && res.json.success){
+        modal.style.display='none';
+        form.reset();
+        // Optionally, reload or update session list
+        location.reload();
+      } else {
+        if(res.json && res.json.errors){
+          let html='';
+          for(const k in res.json.errors){ html += `<div><strong>${k}:</strong> ${res.json.errors[k].join(', ')}</div>` }
+          errorsEl.innerHTML = html;
+        } else if(res.json && res.json.error){
+          errorsEl.textContent = res.json.error;
+        } else {
+          errorsEl.textContent = 'An error occurred';
+        }
+      }
+    }).catch(err=>{ errorsEl.textContent='Network error'; });
+  });
+})();
@@ -0,0 +1,28 @@
+// Auto-refresh attendance data every 3 seconds
+const sessionId = document.currentScript.dataset.sessionId;
+let refreshInterval;
+
+function refreshAttendance() {
+    fetch(`/api/status/?session_id=${sessionId}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.attendance_count !== undefined) {
+                document.getElementById('attendance-count').textContent = data.attendance_count;
+            }
+            // Visual feedback that we're updating
+            const indicator = document.getElementById('refresh-status');
+            if (indicator) {
+                indicator.classList.add('updating');
+                setTimeout(() => indicator.classList.remove('updating'), 200);
+            }
+        })
+        .catch(error => console.log('Auto-refresh paused'));
+}
+
+// Start auto-refresh
+refreshInterval = setInterval(refreshAttendance, 3000);
+
+// Cleanup on page unload
+window.addEventListener('beforeunload', () => {
+    if (refreshInterval) clearInterval(refreshInterval);
+});
@@ -0,0 +1,18 @@
+// Create confetti effect
+const confettiContainer = document.getElementById('confetti');
+const colors = ['#00fff2', '#ff00ff', '#7b2cbf', '#00ff88', '#ffaa00'];
+
+for (let i = 0; i < 50; i++) {
+    const confetti = document.createElement('div');
+    confetti.className = 'confetti-piece';
+    confetti.style.left = Math.random() * 100 + '%';
+    confetti.style.background = colors[Math.floor(Math.random() * colors.length)];
+    confetti.style.animationDelay = Math.random() * 2 + 's';
+    confetti.style.transform = `rotate(${Math.random() * 360}deg)`;
+    confettiContainer.appendChild(confetti);
+}
+
+// Remove confetti after animation
+setTimeout(() => {
+    confettiContainer.remove();
+}, 6000);